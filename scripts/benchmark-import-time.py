@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Benchmark API cold start: time to import the server module in a fresh interpreter
+
+Usage:
+    python scripts/benchmark-import-time.py [--module src.api.server] [--repeat 10] [--root PATH]
+
+--root points at another checkout (e.g. a git worktree of an older commit) to compare.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+def time_import(module, root):
+    """Wall time in milliseconds to start Python and import module from root."""
+    env = dict(os.environ, PYTHONPATH=str(root))
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', f'import {module}'], cwd=root, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--module', default='src.api.server', help='Module to import')
+    parser.add_argument('--repeat', type=int, default=10, help='Number of cold imports')
+    parser.add_argument('--root', default=str(Path(__file__).parent.parent), help='Repository root to import from')
+    args = parser.parse_args()
+
+    # Warm the OS file cache so the first sample isn't an outlier
+    time_import(args.module, args.root)
+    samples = [time_import(args.module, args.root) for _ in range(args.repeat)]
+    baseline = [time_import('sys', args.root) for _ in range(args.repeat)]
+
+    print(f"import {args.module}: median {statistics.median(samples):7.1f} ms   min {min(samples):7.1f} ms")
+    print(f"bare interpreter:       median {statistics.median(baseline):7.1f} ms")
+
+if __name__ == '__main__':
+    main()
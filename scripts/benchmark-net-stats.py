@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark connection counting: /proc/net summary vs psutil.net_connections()
+
+Usage:
+    python scripts/benchmark-net-stats.py [--sockets N] [--repeat N]
+"""
+import argparse
+import socket
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import psutil
+
+from src.checker.net_stats import connection_summary, proc_net_available
+
+def open_sockets(count):
+    """Open listening sockets and loopback connections to give the tables some rows."""
+    sockets = []
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(count)
+    sockets.append(listener)
+    for _ in range(count // 2):
+        client = socket.create_connection(listener.getsockname())
+        server, _ = listener.accept()
+        sockets.extend([client, server])
+    return sockets
+
+def timed(func, repeat):
+    """Best wall time of func over repeat runs, in milliseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sockets', type=int, default=2000, help='Extra loopback sockets to open')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per implementation')
+    args = parser.parse_args()
+
+    if not proc_net_available():
+        print("/proc/net is not available on this platform")
+        sys.exit(1)
+
+    sockets = open_sockets(args.sockets)
+    try:
+        legacy_ms = timed(lambda: len(psutil.net_connections()), args.repeat)
+        procfs_ms = timed(connection_summary, args.repeat)
+        total = connection_summary()['total']
+    finally:
+        for s in sockets:
+            s.close()
+
+    print(f"Sockets counted:            {total}")
+    print(f"psutil.net_connections():   {legacy_ms:8.2f} ms")
+    print(f"/proc/net summary:          {procfs_ms:8.2f} ms")
+    print(f"Speedup:                    {legacy_ms / procfs_ms:8.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Load test: health/status latency while expensive checks are in flight
+
+Usage:
+    python scripts/load-test-api.py [--url http://localhost:8000] [--checks 4] [--probes 50]
+
+Start the API server first (python -m src.api.server).
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+
+import requests
+
+def measure(url, count, interval=0.05):
+    """Latencies in milliseconds of `count` sequential GETs to url."""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        requests.get(url, timeout=30)
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(interval)
+    return latencies
+
+def summarize(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<28} median {statistics.median(latencies):8.2f} ms   p95 {p95:8.2f} ms   max {latencies[-1]:8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8000', help='API base URL')
+    parser.add_argument('--checks', type=int, default=4, help='Concurrent full checks to keep in flight')
+    parser.add_argument('--probes', type=int, default=50, help='Health/status requests per phase')
+    args = parser.parse_args()
+
+    api = f"{args.url}/api/v1"
+    try:
+        requests.get(f"{api}/health", timeout=5)
+    except requests.RequestException as e:
+        print(f"API not reachable at {args.url}: {e}")
+        sys.exit(1)
+
+    summarize("health (idle)", measure(f"{api}/health", args.probes))
+    summarize("status (idle)", measure(f"{api}/status", args.probes))
+
+    stop = threading.Event()
+    completed = []
+
+    def run_checks():
+        while not stop.is_set():
+            requests.post(f"{api}/check", json={"refresh": True}, timeout=120)
+            completed.append(1)
+
+    workers = [threading.Thread(target=run_checks, daemon=True) for _ in range(args.checks)]
+    for worker in workers:
+        worker.start()
+    time.sleep(0.5)
+
+    summarize(f"health ({args.checks} checks busy)", measure(f"{api}/health", args.probes))
+    summarize(f"status ({args.checks} checks busy)", measure(f"{api}/status", args.probes))
+
+    stop.set()
+    for worker in workers:
+        worker.join()
+    print(f"Checks completed during load phase: {len(completed)}")
+
+if __name__ == '__main__':
+    main()
@@ -2,10 +2,9 @@
 Development Information Provider
 Provides system specs and development environment information
 """
-from typing import Dict, Any
-from src.core.logger import setup_logger
-from src.core.platform import PlatformDetector
+from typing import Dict, Any, Optional
 from src.checker.environment_checker import EnvironmentChecker
+from src.core.result_cache import ResultSnapshot
 
 class DevelopmentInfoProvider:
     """Provides development-focused computer information"""
@@ -15,13 +14,23 @@ class DevelopmentInfoProvider:
         self.logger = logger
         self.checker = EnvironmentChecker(platform_info, logger)
     
-    def get_development_info(self) -> Dict[str, Any]:
+    def get_development_info(self, use_cache: bool = True, refresh: bool = False,
+                             snapshot: Optional[ResultSnapshot] = None) -> Dict[str, Any]:
         """Get comprehensive development information"""
         
-        # Get system information
-        system_info = self.checker.check_system()
-        resources = self.checker.check_resources()
-        dev_tools = self.checker.check_development_tools()
+        # Get system information; shares cached sections with /api/v1/check
+        results = self.checker.check_all(
+            concurrent=True,
+            sections=['system', 'resources', 'development'],
+            use_cache=use_cache,
+            refresh=refresh,
+            snapshot=snapshot,
+        )
+        system_info = results['system']
+        resources = results['resources']
+        dev_tools = results['development']
+        if dev_tools.get('partial'):
+            dev_tools = {}
         
         # Format for development use
         dev_info = {
@@ -37,6 +46,8 @@ class DevelopmentInfoProvider:
                 "cpu": {
                     "cores": resources.get('cpu_count', 0),
                     "usage_percent": resources.get('cpu_percent', 0),
+                    "load": resources.get('cpu_load', {}),
+                    "per_core_percent": resources.get('cpu_percent_per_core', []),
                     "processor": self.platform_info.get('processor', 'unknown'),
                 },
                 "memory": {
@@ -65,7 +76,9 @@ class DevelopmentInfoProvider:
                 "development_ready": self._assess_dev_readiness(dev_tools),
                 "missing_tools": self._get_missing_tools(dev_tools),
                 "recommendations": self._get_recommendations(dev_tools, resources)
-            }
+            },
+            "cache_age": results.get('cache_age', {}),
+            "fact_age": self.checker.facts.freshness(['hostname', 'cpu', 'memory', 'disk', 'dev_tools'])
         }
         
         return dev_info
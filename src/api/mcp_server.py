@@ -2,26 +2,45 @@
 MCP (Model Context Protocol) Server Implementation
 JSON-RPC 2.0 server for agent-to-agent communication
 """
+import asyncio
 import json
-from typing import Any, Dict, Optional, List
-from fastapi import FastAPI, HTTPException
+import time
+from typing import Any, Dict, Optional, List, Union
+from fastapi import Body, FastAPI, HTTPException
 from fastapi.responses import JSONResponse
 
-from src.core.logger import setup_logger
-from src.core.platform import PlatformDetector
-from src.checker.environment_checker import EnvironmentChecker
-from src.setup.setup_manager import SetupManager
-from src.update.update_manager import UpdateManager
-from src.troubleshooting.problem_solver import ProblemSolver
-from src.api.dev_info import DevelopmentInfoProvider
+from src.checker.environment_checker import EnvironmentChecker, SectionSelectionError
+from src.core.config import get_setting
+from src.core.metrics import get_metrics
+from src.core.runtime import get_runtime
+from src.core.result_cache import ResultSnapshot, cache_ttl
+from src.core.executors import run_in_lane
+from src.troubleshooting.diagnoses import get_diagnosis_store
 
-logger = setup_logger()
-platform_detector = PlatformDetector()
-platform_info = platform_detector.detect()
+# Shared with the REST layer; built lazily on first use
+runtime = get_runtime()
+
+class InvalidParams(Exception):
+    """Raised by a method for bad client params; answered with -32602 instead of -32603."""
 
 class MCPServer:
     """MCP Server implementing JSON-RPC 2.0"""
     
+    # Methods that only read in-memory state or queue jobs run on the cheap executor lane
+    CHEAP_METHODS = {
+        "mcp.list_capabilities", "mcp.get_status",
+        "mcp.setup_system", "mcp.check_updates", "mcp.fix_issues",
+        "mcp.job_status", "mcp.cancel_job", "mcp.list_jobs",
+    }
+    
+    # Methods that read the environment and accept a batch-wide snapshot
+    SNAPSHOT_METHODS = {"mcp.get_dev_info", "mcp.check_environment", "mcp.diagnose_issues"}
+    
+    # Read-only methods; identical calls within one batch run once
+    DEDUP_METHODS = SNAPSHOT_METHODS | {
+        "mcp.list_capabilities", "mcp.get_status", "mcp.job_status", "mcp.list_jobs",
+    }
+    
     def __init__(self):
         self.methods = {
             "mcp.get_dev_info": self.get_dev_info,
@@ -32,10 +51,15 @@ class MCPServer:
             "mcp.fix_issues": self.fix_issues,
             "mcp.list_capabilities": self.list_capabilities,
             "mcp.get_status": self.get_status,
+            "mcp.job_status": self.job_status,
+            "mcp.cancel_job": self.cancel_job,
+            "mcp.list_jobs": self.list_jobs,
         }
     
-    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+    def handle_request(self, request: Dict[str, Any], snapshot: Optional[ResultSnapshot] = None) -> Dict[str, Any]:
         """Handle JSON-RPC 2.0 request"""
+        if not isinstance(request, dict):
+            return self._error_response(None, -32600, "Invalid Request", "request must be an object")
         try:
             # Validate JSON-RPC 2.0 format
             if request.get("jsonrpc") != "2.0":
@@ -57,7 +81,14 @@ class MCPServer:
                 return self._error_response(request_id, -32601, "Method not found", f"Method '{method}' not found")
             
             # Call the method
-            result = self.methods[method](params)
+            start = time.perf_counter()
+            try:
+                if method in self.SNAPSHOT_METHODS:
+                    result = self.methods[method](params, snapshot=snapshot)
+                else:
+                    result = self.methods[method](params)
+            finally:
+                get_metrics().mcp_duration.observe(time.perf_counter() - start, method=method)
             
             return {
                 "jsonrpc": "2.0",
@@ -65,8 +96,10 @@ class MCPServer:
                 "id": request_id
             }
             
+        except (InvalidParams, SectionSelectionError) as e:
+            return self._error_response(request.get("id"), -32602, "Invalid params", str(e))
         except Exception as e:
-            logger.error(f"Error handling MCP request: {e}", exc_info=True)
+            runtime.logger.error(f"Error handling MCP request: {e}", exc_info=True)
             return self._error_response(
                 request.get("id"),
                 -32603,
@@ -74,6 +107,60 @@ class MCPServer:
                 str(e)
             )
     
+    def lane_for(self, request: Any) -> str:
+        """Executor lane a request should run on."""
+        method = request.get("method") if isinstance(request, dict) else None
+        return "cheap" if method in self.CHEAP_METHODS else "expensive"
+    
+    def dedup_key(self, request: Any) -> Optional[tuple]:
+        """Key identifying equivalent read-only calls in a batch, or None if the call must run on its own."""
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0":
+            return None
+        method = request.get("method")
+        if method not in self.DEDUP_METHODS:
+            return None
+        try:
+            return method, json.dumps(request.get("params", {}), sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+    
+    async def handle_batch(self, batch: List[Any]) -> Any:
+        """Handle a JSON-RPC 2.0 batch.
+        
+        Members run concurrently, at most performance.mcp_batch_concurrency at
+        a time, and share one ResultSnapshot so environment probes happen once
+        per batch. Identical read-only calls run once and the result is copied
+        to each member under its own id. Responses keep the batch order.
+        """
+        if not batch:
+            return self._error_response(None, -32600, "Invalid Request", "batch must not be empty")
+        
+        snapshot = ResultSnapshot()
+        limit = asyncio.Semaphore(max(int(get_setting('performance.mcp_batch_concurrency', 4)), 1))
+        
+        async def run(request):
+            async with limit:
+                return await run_in_lane(self.lane_for(request), self.handle_request, request, snapshot)
+        
+        shared: Dict[tuple, asyncio.Future] = {}
+        pending = []
+        for request in batch:
+            key = self.dedup_key(request)
+            if key is None:
+                pending.append((request, asyncio.ensure_future(run(request)), False))
+            else:
+                if key not in shared:
+                    shared[key] = asyncio.ensure_future(run(request))
+                pending.append((request, shared[key], True))
+        
+        responses = []
+        for request, future, deduplicated in pending:
+            response = await future
+            if deduplicated:
+                response = dict(response, id=request.get("id"))
+            responses.append(response)
+        return responses
+    
     def _error_response(self, request_id: Optional[Any], code: int, message: str, data: Any = None) -> Dict[str, Any]:
         """Create error response"""
         error = {
@@ -90,34 +177,60 @@ class MCPServer:
         }
         return response
     
-    def get_dev_info(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    def get_dev_info(self, params: Dict[str, Any], snapshot: Optional[ResultSnapshot] = None) -> Dict[str, Any]:
         """Get development information: system specs and development tools"""
-        provider = DevelopmentInfoProvider(platform_info, logger)
-        return provider.get_development_info()
+        return runtime.dev_info.get_development_info(refresh=params.get("refresh", False), snapshot=snapshot)
     
-    def check_environment(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    def check_environment(self, params: Dict[str, Any], snapshot: Optional[ResultSnapshot] = None) -> Dict[str, Any]:
         """Check environment"""
-        checker = EnvironmentChecker(platform_info, logger)
-        results = checker.check_all()
+        sections = params["sections"] if params.get("sections") is not None else EnvironmentChecker.sections_from_flags(
+            include_software=params.get("include_software", True),
+            include_network=params.get("include_network", True),
+            include_security=params.get("include_security", True),
+        )
+        results = runtime.checker.check_all(
+            concurrent=True,
+            since=params.get("since"),
+            sections=sections,
+            use_cache=True,
+            refresh=params.get("refresh", False),
+            snapshot=snapshot,
+        )
         return results
     
     def setup_system(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Setup system"""
+        """Setup system (background job)"""
         config_path = params.get("config_path", "config/default.yaml")
-        manager = SetupManager(platform_info, logger)
-        manager.setup_from_config(config_path)
-        return {"status": "success", "message": "Setup initiated"}
+        
+        def run(job):
+            from src.setup.setup_manager import SetupManager
+            manager = SetupManager(runtime.platform_info, runtime.logger)
+            manager.setup_from_config(config_path, progress=job.set_progress, should_stop=job.should_stop)
+            return {"message": "Setup completed"}
+        
+        job = runtime.job_manager.submit('setup', run, params={"config_path": config_path})
+        return job.to_dict(include_logs=False)
     
     def check_updates(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Check updates"""
-        update_manager = UpdateManager(platform_info, logger)
-        update_manager.check_and_update()
-        return {"status": "success", "message": "Update check completed"}
+        """Check updates (background job)"""
+        def run(job):
+            from src.update.update_manager import UpdateManager
+            update_manager = UpdateManager(runtime.platform_info, runtime.logger)
+            update_manager.check_and_update(progress=job.set_progress, should_stop=job.should_stop)
+            return {"message": "Update check completed"}
+        
+        job = runtime.job_manager.submit('update', run, params=params)
+        return job.to_dict(include_logs=False)
     
-    def diagnose_issues(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    def diagnose_issues(self, params: Dict[str, Any], snapshot: Optional[ResultSnapshot] = None) -> Dict[str, Any]:
         """Diagnose issues"""
-        solver = ProblemSolver(platform_info, logger)
-        issues = solver.detect_issues()
+        def cached():
+            return runtime.result_cache.get_or_compute(
+                'diagnose', runtime.solver.diagnose, ttl=cache_ttl('diagnose'), refresh=params.get("refresh", False)
+            )
+        
+        diagnosis, age = snapshot.get_or_compute('diagnose', cached) if snapshot is not None else cached()
+        issues = list(diagnosis.issues)
         
         categories = params.get("categories")
         if categories:
@@ -125,25 +238,60 @@ class MCPServer:
         
         return {
             "issues": issues,
-            "count": len(issues)
+            "count": len(issues),
+            "diagnosis_id": diagnosis.id,
+            "version": diagnosis.version,
+            "cache_age": round(age, 3)
         }
     
     def fix_issues(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Fix issues"""
-        solver = ProblemSolver(platform_info, logger)
-        issues = solver.detect_issues()
-        
+        """Fix issues (background job)"""
         issue_ids = params.get("issue_ids")
-        if issue_ids:
-            issues = [i for i in issues if i.get('id') in issue_ids]
-        
         auto_fix = params.get("auto_fix", True)
-        if auto_fix:
-            solver.fix_issues(issues)
+        diagnosis = None
+        if params.get("diagnosis_id"):
+            diagnosis = get_diagnosis_store().get(params["diagnosis_id"])
+            if diagnosis is None:
+                raise InvalidParams(f"Diagnosis '{params['diagnosis_id']}' not found")
+        
+        def run(job):
+            solver = runtime.solver
+            target = diagnosis
+            if target is None:
+                # Reuse the latest diagnosis while it is fresh instead of detecting again
+                target, _ = runtime.result_cache.get_or_compute('diagnose', solver.diagnose, ttl=cache_ttl('diagnose'))
+            return solver.fix_diagnosis(
+                target,
+                issue_ids=issue_ids,
+                revalidate=params.get("revalidate", False),
+                auto_fix=auto_fix,
+                progress=job.set_progress,
+                should_stop=job.should_stop,
+            )
         
+        job = runtime.job_manager.submit('fix', run, params=params)
+        return job.to_dict(include_logs=False)
+    
+    def job_status(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Get a background job's status, progress and logs"""
+        job = runtime.job_manager.get(params.get("job_id", ""))
+        if job is None:
+            raise InvalidParams(f"Job '{params.get('job_id')}' not found")
+        return job.to_dict()
+    
+    def cancel_job(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Cancel a queued or running background job"""
+        job = runtime.job_manager.cancel(params.get("job_id", ""))
+        if job is None:
+            raise InvalidParams(f"Job '{params.get('job_id')}' not found")
+        return job.to_dict(include_logs=False)
+    
+    def list_jobs(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """List background jobs, newest first"""
+        jobs = runtime.job_manager.list_jobs(status=params.get("status"))
         return {
-            "status": "success",
-            "issues_fixed": len(issues)
+            "jobs": [job.to_dict(include_logs=False) for job in jobs],
+            "count": len(jobs)
         }
     
     def list_capabilities(self, params: Dict[str, Any]) -> Dict[str, Any]:
@@ -153,7 +301,9 @@ class MCPServer:
                 {
                     "name": "get_dev_info",
                     "description": "Get development information: system specs and development tools",
-                    "parameters": {}
+                    "parameters": {
+                        "refresh": "bool"
+                    }
                 },
                 {
                     "name": "check_environment",
@@ -162,7 +312,10 @@ class MCPServer:
                         "verbose": "bool",
                         "include_software": "bool",
                         "include_network": "bool",
-                        "include_security": "bool"
+                        "include_security": "bool",
+                        "since": "string",
+                        "sections": "list",
+                        "refresh": "bool"
                     }
                 },
                 {
@@ -184,7 +337,8 @@ class MCPServer:
                     "name": "diagnose_issues",
                     "description": "Detect system issues",
                     "parameters": {
-                        "categories": "list"
+                        "categories": "list",
+                        "refresh": "bool"
                     }
                 },
                 {
@@ -192,7 +346,30 @@ class MCPServer:
                     "description": "Fix detected issues",
                     "parameters": {
                         "auto_fix": "bool",
-                        "issue_ids": "list"
+                        "issue_ids": "list",
+                        "diagnosis_id": "string",
+                        "revalidate": "bool"
+                    }
+                },
+                {
+                    "name": "job_status",
+                    "description": "Get status, progress and logs of a setup/update/fix job",
+                    "parameters": {
+                        "job_id": "string"
+                    }
+                },
+                {
+                    "name": "cancel_job",
+                    "description": "Cancel a queued or running job",
+                    "parameters": {
+                        "job_id": "string"
+                    }
+                },
+                {
+                    "name": "list_jobs",
+                    "description": "List background jobs",
+                    "parameters": {
+                        "status": "string"
                     }
                 }
             ]
@@ -202,8 +379,8 @@ class MCPServer:
         """Get status"""
         return {
             "status": "active",
-            "platform": platform_info['os'],
-            "version": platform_info.get('version', 'unknown')
+            "platform": runtime.platform_info['os'],
+            "version": runtime.platform_info.get('version', 'unknown')
         }
 
 # Create MCP server instance
@@ -214,18 +391,17 @@ def register_mcp_routes(app: FastAPI):
     """Register MCP routes with FastAPI app"""
     
     @app.post("/mcp")
-    async def mcp_endpoint(request: Dict[str, Any]):
+    async def mcp_endpoint(request: Union[Dict[str, Any], List[Any]] = Body(...)):
         """MCP JSON-RPC 2.0 endpoint"""
         try:
-            # Handle batch requests
+            # Requests run on executor lanes so the event loop stays responsive
             if isinstance(request, list):
-                responses = [mcp_server.handle_request(req) for req in request]
-                return JSONResponse(content=responses)
+                return JSONResponse(content=await mcp_server.handle_batch(request))
             else:
-                response = mcp_server.handle_request(request)
+                response = await run_in_lane(mcp_server.lane_for(request), mcp_server.handle_request, request)
                 return JSONResponse(content=response)
         except Exception as e:
-            logger.error(f"Error in MCP endpoint: {e}", exc_info=True)
+            runtime.logger.error(f"Error in MCP endpoint: {e}", exc_info=True)
             return JSONResponse(
                 content={
                     "jsonrpc": "2.0",
@@ -1,19 +1,46 @@
+import asyncio
 import os
-from fastapi import FastAPI, HTTPException, Depends, Security
+import json
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Security, Request
+from fastapi.responses import Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, APIKeyHeader
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
-from src.core.logger import setup_logger
-from src.core.platform import PlatformDetector
-from src.checker.environment_checker import EnvironmentChecker
-from src.setup.setup_manager import SetupManager
-from src.update.update_manager import UpdateManager
-from src.troubleshooting.problem_solver import ProblemSolver
+from src.checker.environment_checker import EnvironmentChecker, SectionSelectionError
 from src.api.mcp_server import register_mcp_routes
-from src.api.dev_info import DevelopmentInfoProvider
+from src.core.runtime import get_runtime
+from src.core.result_cache import cache_ttl
+from src.core.executors import get_executor, run_in_lane, shutdown_executors
+from src.core.jobs import shutdown_job_manager
+from src.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, install_subprocess_counter
+from src.troubleshooting.diagnoses import get_diagnosis_store
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background samplers with the server and stop them on shutdown."""
+    # Detect the platform once per worker, off the import path
+    await run_in_lane('cheap', lambda: runtime.platform_info)
+    install_subprocess_counter()
+    resource_history = runtime.resource_history
+    # One polling loop: the CPU and host samplers take their readings from the recorder
+    cpu_sampler = runtime.cpu_sampler
+    cpu_sampler.start(source=resource_history)
+    host_sampler = runtime.host_sampler
+    host_sampler.start(source=resource_history)
+    # Threshold rules see every sample, so sustain/hysteresis work on a steady stream
+    resource_history.add_listener(runtime.rule_engine.observe)
+    resource_history.start()
+    yield
+    resource_history.stop()
+    host_sampler.stop()
+    cpu_sampler.stop()
+    shutdown_job_manager()
+    shutdown_executors()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -21,7 +48,8 @@ app = FastAPI(
     description="Agent-to-Agent API for Local Computer Assistant",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -33,6 +61,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Observe each request's latency, labelled by route template rather than raw path."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        runtime.metrics.request_duration.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
+
 # Register MCP routes
 register_mcp_routes(app)
 
@@ -40,10 +86,8 @@ register_mcp_routes(app)
 security = HTTPBearer()
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
-# Global state
-logger = setup_logger()
-platform_detector = PlatformDetector()
-platform_info = platform_detector.detect()
+# Global state; platform info, logger and services are built lazily on first use
+runtime = get_runtime()
 
 # Request/Response Models
 class CheckRequest(BaseModel):
@@ -51,6 +95,9 @@ class CheckRequest(BaseModel):
     include_software: bool = True
     include_network: bool = True
     include_security: bool = True
+    since: Optional[str] = None  # Software snapshot id; return only the inventory delta
+    sections: Optional[List[str]] = None  # Explicit section selection; overrides include_*
+    refresh: bool = False  # Bypass cached section results
 
 class SetupRequest(BaseModel):
     config_path: str = "config/default.yaml"
@@ -61,10 +108,13 @@ class UpdateRequest(BaseModel):
 
 class DiagnoseRequest(BaseModel):
     categories: Optional[List[str]] = None
+    refresh: bool = False  # Bypass the cached diagnosis
 
 class FixRequest(BaseModel):
     auto_fix: bool = True
     issue_ids: Optional[List[str]] = None
+    diagnosis_id: Optional[str] = None  # Fix issues from this diagnosis; default: the latest cached one
+    revalidate: bool = False  # Re-check the targeted issues and skip the resolved ones
 
 class APIResponse(BaseModel):
     status: str
@@ -105,10 +155,82 @@ async def health_check():
     """Health check endpoint"""
     return APIResponse(
         status="success",
-        data={"status": "healthy", "platform": platform_info['os']},
+        data={"status": "healthy", "platform": runtime.platform_info['os']},
         message="Service is operational"
     )
 
+@app.get("/metrics")
+async def metrics():
+    """OpenMetrics exposition of host gauges (from the background samplers) and assistant metrics.
+    
+    Reads only in-memory state, so it is safe to scrape every few seconds.
+    """
+    return Response(content=runtime.metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/api/v1/metrics/history", response_model=APIResponse)
+async def metrics_history(metric: Optional[str] = None, window: str = "1h", step: Optional[str] = None):
+    """Downsampled resource history (min/max/avg per step).
+    
+    ``window`` and ``step`` are seconds or durations such as ``15m``, ``6h``,
+    ``2d``. Without ``metric``, lists the recorded metrics and retention.
+    """
+    history = runtime.resource_history
+    if metric is None:
+        return APIResponse(status="success", data=history.info(), message="Resource history metrics")
+    try:
+        data = await run_in_lane('cheap', history.query, metric, window=window, step=step)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return APIResponse(
+        status="success",
+        data=data,
+        message=f"{len(data['points'])} points for {metric}"
+    )
+
+@app.get("/api/v1/disk/usage", response_model=APIResponse)
+async def disk_usage(path: Optional[str] = None, top: int = 20, refresh: bool = False):
+    """Largest directories and files under ``path`` (the data behind cleanup_disk).
+    
+    Stays on the path's filesystem. Directories whose mtime hasn't changed
+    since the last scan are not listed again unless ``refresh`` is set.
+    """
+    path = path or os.path.abspath(os.sep)
+    if not 1 <= top <= 1000:
+        raise HTTPException(status_code=400, detail="top must be between 1 and 1000")
+    try:
+        data = await run_in_lane(
+            'expensive',
+            runtime.dir_scanner.scan, path, top=top, refresh=refresh
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Path not found: {path}")
+    except (ValueError, OSError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return APIResponse(
+        status="success",
+        data=data,
+        message=f"Scanned {data['files']} files in {data['elapsed']:.2f}s"
+    )
+
+@app.get("/api/v1/processes", response_model=APIResponse)
+async def top_processes(sort: str = "memory", top: int = 10, refresh: bool = False):
+    """Processes using the most memory (``sort=memory``) or CPU (``sort=cpu``).
+    
+    CPU percent is measured since the previous sample. Samples younger than
+    performance.process_sampler.max_age_seconds are reused unless ``refresh``.
+    """
+    if not 1 <= top <= 100:
+        raise HTTPException(status_code=400, detail="top must be between 1 and 100")
+    try:
+        data = await run_in_lane('expensive', runtime.process_sampler.top, top, sort=sort, refresh=refresh)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return APIResponse(
+        status="success",
+        data=data,
+        message=f"Top {len(data['processes'])} of {data['process_count']} processes by {sort}"
+    )
+
 @app.get("/api/v1/capabilities", response_model=APIResponse)
 async def get_capabilities():
     """Get list of assistant capabilities"""
@@ -116,7 +238,7 @@ async def get_capabilities():
         Capability(
             name="check_environment",
             description="Check and analyze computer environment",
-            parameters={"verbose": "bool", "include_software": "bool"}
+            parameters={"verbose": "bool", "include_software": "bool", "sections": "list"}
         ),
         Capability(
             name="setup_system",
@@ -136,7 +258,7 @@ async def get_capabilities():
         Capability(
             name="fix_issues",
             description="Fix detected issues",
-            parameters={"auto_fix": "bool", "issue_ids": "list"}
+            parameters={"auto_fix": "bool", "issue_ids": "list", "diagnosis_id": "string", "revalidate": "bool"}
         ),
     ]
     
@@ -169,67 +291,150 @@ async def get_agent_info():
 async def check_environment(request: CheckRequest = CheckRequest()):
     """Check computer environment"""
     try:
-        checker = EnvironmentChecker(platform_info, logger)
-        results = checker.check_all()
-        
-        # Filter results based on request
-        filtered_results = {}
-        if request.include_software:
-            filtered_results['software'] = results.get('software', {})
-        if request.include_network:
-            filtered_results['network'] = results.get('network', {})
-        if request.include_security:
-            filtered_results['security'] = results.get('security', {})
-        
-        filtered_results['system'] = results.get('system', {})
-        filtered_results['resources'] = results.get('resources', {})
-        filtered_results['development'] = results.get('development', {})
+        # Only the requested sections are computed
+        sections = request.sections if request.sections is not None else EnvironmentChecker.sections_from_flags(
+            include_software=request.include_software,
+            include_network=request.include_network,
+            include_security=request.include_security,
+        )
+        results = await run_in_lane(
+            'expensive',
+            runtime.checker.check_all,
+            concurrent=True,
+            since=request.since,
+            sections=sections,
+            use_cache=True,
+            refresh=request.refresh,
+        )
         
         return APIResponse(
             status="success",
-            data=filtered_results,
+            data=results,
             message="Environment check completed"
         )
+    except SectionSelectionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error in check: {e}", exc_info=True)
+        runtime.logger.error(f"Error in check: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+def _format_sse(record: Dict[str, Any], event_id: int) -> str:
+    return f"event: {record['type']}\nid: {event_id}\ndata: {json.dumps(record, default=str)}\n\n"
+
+def _format_ndjson(record: Dict[str, Any], event_id: int) -> str:
+    return json.dumps(record, default=str) + "\n"
+
+async def _stream_check(sections: List[str], since: Optional[str], refresh: bool, sse: bool) -> StreamingResponse:
+    """Stream check records as they finish, stepping the blocking generator on the expensive lane."""
+    try:
+        EnvironmentChecker.select_sections(sections)
+    except SectionSelectionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    records = runtime.checker.iter_check(since=since, sections=sections, use_cache=True, refresh=refresh)
+    formatter = _format_sse if sse else _format_ndjson
+    
+    async def body():
+        done = object()
+        event_id = 0
+        executor = get_executor('expensive')
+        step = None
+        try:
+            while True:
+                step = executor.submit(next, records, done)
+                record = await asyncio.wrap_future(step)
+                if record is done:
+                    break
+                event_id += 1
+                yield formatter(record, event_id)
+        finally:
+            # Client went away mid-stream: stop the check (cancels queued sections).
+            # A generator can't be closed while a step is executing, so wait for it
+            if step is None or step.done():
+                executor.submit(records.close)
+            else:
+                step.add_done_callback(lambda _: executor.submit(records.close))
+    
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _wants_sse(request: Request, default: bool) -> bool:
+    accept = request.headers.get("accept", "")
+    if "text/event-stream" in accept:
+        return True
+    if "application/x-ndjson" in accept:
+        return False
+    return default
+
+@app.get("/api/v1/check/stream")
+async def stream_check_events(http_request: Request, sections: Optional[str] = None,
+                              since: Optional[str] = None, refresh: bool = False):
+    """Stream check sections as Server-Sent Events (EventSource-compatible).
+    
+    Emits one ``section`` event per section as it finishes, then a ``summary``
+    event. ``sections`` is comma-separated; all sections run when omitted.
+    """
+    selected = [s.strip() for s in sections.split(',') if s.strip()] if sections else None
+    return await _stream_check(selected, since, refresh, sse=_wants_sse(http_request, default=True))
+
+@app.post("/api/v1/check/stream")
+async def stream_check(http_request: Request, request: CheckRequest = CheckRequest()):
+    """Stream check sections as NDJSON, one record per line as each finishes, then a summary.
+    
+    Send ``Accept: text/event-stream`` to get Server-Sent Events instead.
+    """
+    sections = request.sections if request.sections is not None else EnvironmentChecker.sections_from_flags(
+        include_software=request.include_software,
+        include_network=request.include_network,
+        include_security=request.include_security,
+    )
+    return await _stream_check(sections, request.since, request.refresh, sse=_wants_sse(http_request, default=False))
+
 @app.post("/api/v1/setup", response_model=APIResponse)
 async def setup_system(request: SetupRequest):
-    """Setup system from configuration"""
-    try:
-        manager = SetupManager(platform_info, logger)
-        manager.setup_from_config(request.config_path)
-        
-        return APIResponse(
-            status="success",
-            message="System setup initiated"
-        )
-    except Exception as e:
-        logger.error(f"Error in setup: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+    """Setup system from configuration (runs as a background job)"""
+    def run(job):
+        from src.setup.setup_manager import SetupManager
+        manager = SetupManager(runtime.platform_info, runtime.logger)
+        manager.setup_from_config(request.config_path, progress=job.set_progress, should_stop=job.should_stop)
+        return {"message": "System setup completed"}
+    
+    job = runtime.job_manager.submit('setup', run, params=request.dict())
+    return APIResponse(
+        status="accepted",
+        data=job.to_dict(include_logs=False),
+        message=f"System setup job {job.id} submitted"
+    )
 
 @app.post("/api/v1/update", response_model=APIResponse)
 async def check_updates(request: UpdateRequest = UpdateRequest()):
-    """Check for updates"""
-    try:
-        update_manager = UpdateManager(platform_info, logger)
-        update_manager.check_and_update()
-        
-        return APIResponse(
-            status="success",
-            message="Update check completed"
-        )
-    except Exception as e:
-        logger.error(f"Error in update: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+    """Check for updates (runs as a background job)"""
+    def run(job):
+        from src.update.update_manager import UpdateManager
+        update_manager = UpdateManager(runtime.platform_info, runtime.logger)
+        update_manager.check_and_update(progress=job.set_progress, should_stop=job.should_stop)
+        return {"message": "Update check completed"}
+    
+    job = runtime.job_manager.submit('update', run, params=request.dict())
+    return APIResponse(
+        status="accepted",
+        data=job.to_dict(include_logs=False),
+        message=f"Update job {job.id} submitted"
+    )
 
 @app.post("/api/v1/diagnose", response_model=APIResponse)
 async def diagnose_issues(request: DiagnoseRequest = DiagnoseRequest()):
     """Diagnose system issues"""
     try:
-        solver = ProblemSolver(platform_info, logger)
-        issues = solver.detect_issues()
+        diagnosis, age = await run_in_lane(
+            'expensive',
+            runtime.result_cache.get_or_compute,
+            'diagnose', runtime.solver.diagnose, ttl=cache_ttl('diagnose'), refresh=request.refresh
+        )
+        issues = list(diagnosis.issues)
         
         # Filter by categories if specified
         if request.categories:
@@ -237,35 +442,83 @@ async def diagnose_issues(request: DiagnoseRequest = DiagnoseRequest()):
         
         return APIResponse(
             status="success",
-            data={"issues": issues, "count": len(issues)},
+            data={
+                "issues": issues,
+                "count": len(issues),
+                "diagnosis_id": diagnosis.id,
+                "version": diagnosis.version,
+                "cache_age": round(age, 3),
+            },
             message=f"Found {len(issues)} issues"
         )
     except Exception as e:
-        logger.error(f"Error in diagnose: {e}", exc_info=True)
+        runtime.logger.error(f"Error in diagnose: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/v1/fix", response_model=APIResponse)
 async def fix_issues(request: FixRequest = FixRequest()):
-    """Fix detected issues"""
-    try:
-        solver = ProblemSolver(platform_info, logger)
-        issues = solver.detect_issues()
-        
-        # Filter by issue_ids if specified
-        if request.issue_ids:
-            issues = [i for i in issues if i.get('id') in request.issue_ids]
-        
-        if request.auto_fix:
-            solver.fix_issues(issues)
-        
-        return APIResponse(
-            status="success",
-            data={"issues_fixed": len(issues)},
-            message=f"Fixed {len(issues)} issues"
+    """Fix detected issues (runs as a background job)"""
+    diagnosis = None
+    if request.diagnosis_id:
+        diagnosis = get_diagnosis_store().get(request.diagnosis_id)
+        if diagnosis is None:
+            raise HTTPException(status_code=404, detail=f"Diagnosis '{request.diagnosis_id}' not found")
+    
+    def run(job):
+        solver = runtime.solver
+        target = diagnosis
+        if target is None:
+            # Reuse the latest diagnosis while it is fresh instead of detecting again
+            target, _ = runtime.result_cache.get_or_compute('diagnose', solver.diagnose, ttl=cache_ttl('diagnose'))
+        return solver.fix_diagnosis(
+            target,
+            issue_ids=request.issue_ids,
+            revalidate=request.revalidate,
+            auto_fix=request.auto_fix,
+            progress=job.set_progress,
+            should_stop=job.should_stop,
         )
-    except Exception as e:
-        logger.error(f"Error in fix: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+    
+    job = runtime.job_manager.submit('fix', run, params=request.dict())
+    return APIResponse(
+        status="accepted",
+        data=job.to_dict(include_logs=False),
+        message=f"Fix job {job.id} submitted"
+    )
+
+@app.get("/api/v1/jobs", response_model=APIResponse)
+async def list_jobs(status: Optional[str] = None):
+    """List background jobs, newest first"""
+    jobs = runtime.job_manager.list_jobs(status=status)
+    return APIResponse(
+        status="success",
+        data={"jobs": [job.to_dict(include_logs=False) for job in jobs], "count": len(jobs)},
+        message=f"Found {len(jobs)} jobs"
+    )
+
+@app.get("/api/v1/jobs/{job_id}", response_model=APIResponse)
+async def get_job(job_id: str):
+    """Get a job's status, progress and log lines"""
+    job = runtime.job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return APIResponse(
+        status="success",
+        data=job.to_dict(),
+        message=f"Job is {job.status}"
+    )
+
+@app.post("/api/v1/jobs/{job_id}/cancel", response_model=APIResponse)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    job = runtime.job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return APIResponse(
+        status="success",
+        data=job.to_dict(include_logs=False),
+        message=f"Cancellation requested for job {job.id}"
+    )
 
 @app.get("/api/v1/status", response_model=APIResponse)
 async def get_status():
@@ -273,19 +526,18 @@ async def get_status():
     return APIResponse(
         status="success",
         data={
-            "platform": platform_info['os'],
-            "version": platform_info.get('version', 'unknown'),
+            "platform": runtime.platform_info['os'],
+            "version": runtime.platform_info.get('version', 'unknown'),
             "status": "active"
         },
         message="Assistant is active"
     )
 
 @app.get("/api/v1/dev-info", response_model=APIResponse)
-async def get_development_info():
+async def get_development_info(refresh: bool = False):
     """Get development information: system specs and development tools"""
     try:
-        provider = DevelopmentInfoProvider(platform_info, logger)
-        dev_info = provider.get_development_info()
+        dev_info = await run_in_lane('expensive', runtime.dev_info.get_development_info, refresh=refresh)
         
         return APIResponse(
             status="success",
@@ -293,17 +545,18 @@ async def get_development_info():
             message="Development information retrieved successfully"
         )
     except Exception as e:
-        logger.error(f"Error getting dev info: {e}", exc_info=True)
+        runtime.logger.error(f"Error getting dev info: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 def main():
     """Run the API server"""
     import uvicorn
+    # The reloader re-imports the app in a child process; opt in for development
     uvicorn.run(
         "src.api.server:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=os.getenv("API_RELOAD", "").lower() in ("1", "true", "yes"),
         log_level="info"
     )
 
@@ -0,0 +1,131 @@
+"""
+Connectivity Probe
+Checks several TCP targets concurrently and reports the first that answers, with per-target latency
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from src.core.config import get_setting
+from src.core.result_cache import cache_ttl, get_result_cache
+from src.checker.tool_probe import run_coroutine_sync
+
+# Public DNS resolvers on three networks; any one answering means we're online
+DEFAULT_TARGETS = ['8.8.8.8:53', '1.1.1.1:53', '9.9.9.9:53']
+
+Target = Tuple[str, int]
+
+def parse_target(spec: Union[str, Dict[str, Any]]) -> Target:
+    """``(host, port)`` from ``"host:port"``, ``"[v6]:port"`` or ``{'host': ..., 'port': ...}``."""
+    if isinstance(spec, dict):
+        return str(spec['host']), int(spec['port'])
+    host, sep, port = str(spec).rpartition(':')
+    if not sep or not host or not port.isdigit():
+        raise ValueError(f"Invalid connectivity target {spec!r}, expected host:port")
+    return host.strip('[]'), int(port)
+
+def format_target(target: Target) -> str:
+    host, port = target
+    return f"[{host}]:{port}" if ':' in host else f"{host}:{port}"
+
+class ConnectivityProbe:
+    """Open TCP connections to every target at once and stop at the first success.
+
+    The remaining attempts are cancelled, and every socket that did connect
+    is closed before returning. With no network at all, a refused or
+    unreachable target fails immediately; only silently dropped traffic costs
+    the full ``timeout``. Results are cached for ``ttl`` seconds so diagnose
+    and fix runs close together share one probe.
+    """
+
+    def __init__(self, targets: Optional[List[Union[str, Dict[str, Any]]]] = None,
+                 timeout: float = 2.0, ttl: float = 15.0):
+        self.targets = [parse_target(spec) for spec in (targets or DEFAULT_TARGETS)]
+        if not self.targets:
+            raise ValueError("At least one connectivity target is required")
+        self.timeout = timeout
+        self.ttl = ttl
+
+    def check(self, refresh: bool = False) -> Dict[str, Any]:
+        """Cached probe result; see ``probe`` for the shape. Adds ``cache_age``."""
+        result, age = get_result_cache().get_or_compute(
+            ('connectivity', tuple(self.targets), self.timeout),
+            lambda: run_coroutine_sync(self.probe()),
+            ttl=self.ttl,
+            refresh=refresh,
+        )
+        return dict(result, cache_age=round(age, 3))
+
+    async def probe(self) -> Dict[str, Any]:
+        """Probe all targets concurrently, uncached.
+
+        Returns ``online``, the ``target`` that answered and its
+        ``latency_ms``, the total ``elapsed_ms`` and one entry per target in
+        ``targets`` with its ``status`` (``ok``, ``timeout``, ``refused``,
+        ``error`` or ``cancelled`` once another target answered).
+        """
+        start = time.perf_counter()
+        tasks = {asyncio.ensure_future(self._probe_one(target)): target for target in self.targets}
+        outcomes: Dict[Target, Dict[str, Any]] = {}
+        winner: Optional[Target] = None
+
+        pending = set(tasks)
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                target = tasks[task]
+                outcomes[target] = task.result()
+                if winner is None and outcomes[target]['status'] == 'ok':
+                    winner = target
+        for task in pending:
+            task.cancel()
+        # Let cancelled attempts unwind so their transports are closed
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        results = []
+        for target in self.targets:
+            outcome = outcomes.get(target, {'status': 'cancelled', 'latency_ms': None})
+            results.append(dict(outcome, target=format_target(target)))
+        return {
+            'online': winner is not None,
+            'target': format_target(winner) if winner else None,
+            'latency_ms': outcomes[winner]['latency_ms'] if winner else None,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+            'targets': results,
+        }
+
+    async def _probe_one(self, target: Target) -> Dict[str, Any]:
+        """Connect to one target and close the connection straight away."""
+        host, port = target
+        start = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return {'status': 'timeout', 'latency_ms': None}
+        except ConnectionRefusedError:
+            return {'status': 'refused', 'latency_ms': round((time.perf_counter() - start) * 1000, 1)}
+        except OSError as e:
+            return {'status': 'error', 'latency_ms': None, 'error': str(e)}
+        latency = round((time.perf_counter() - start) * 1000, 1)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return {'status': 'ok', 'latency_ms': latency}
+
+_probe: Optional[ConnectivityProbe] = None
+_probe_lock = threading.Lock()
+
+def get_connectivity_probe() -> ConnectivityProbe:
+    """Return the process-wide probe, configured from settings.connectivity."""
+    global _probe
+    with _probe_lock:
+        if _probe is None:
+            _probe = ConnectivityProbe(
+                targets=get_setting('settings.connectivity.targets', DEFAULT_TARGETS),
+                timeout=float(get_setting('settings.connectivity.timeout_seconds', 2.0)),
+                ttl=cache_ttl('connectivity'),
+            )
+        return _probe
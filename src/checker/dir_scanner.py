@@ -0,0 +1,309 @@
+"""
+Directory Scanner
+Sizes a directory tree with os.scandir on a thread pool, reporting the largest directories and files
+"""
+import heapq
+import os
+import queue
+import stat
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.config import get_setting
+
+# Files smaller than this are counted but never listed among the largest
+MIN_LISTED_FILE_BYTES = 1024 * 1024
+
+class _DirEntry:
+    """What one directory contributes on its own, cached against its mtime."""
+
+    __slots__ = ('mtime_ns', 'bytes', 'files', 'subdirs', 'large_files', 'truncated_at', 'linked', 'errors',
+                 'checked_at')
+
+    def __init__(self, mtime_ns: int):
+        self.mtime_ns = mtime_ns
+        self.bytes = 0  # Files directly inside, excluding multiply-linked ones
+        self.files = 0
+        self.subdirs: List[Tuple[str, int, int]] = []  # (path, st_dev, st_mtime_ns)
+        self.large_files: List[Tuple[int, str, Optional[Tuple[int, int]]]] = []  # (bytes, path, inode if linked)
+        self.truncated_at: Optional[int] = None  # The top large_files was cut to, if it dropped any
+        self.linked: List[Tuple[int, int, int]] = []  # (st_dev, st_ino, bytes) of files with st_nlink > 1
+        self.errors = 0
+        self.checked_at = 0.0
+
+def _disk_bytes(st: os.stat_result) -> int:
+    """Space a file occupies: allocated blocks where the platform reports them, else its size."""
+    blocks = getattr(st, 'st_blocks', None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+class DirectoryScanner:
+    """Walk a tree concurrently and total its size per directory.
+
+    Worker threads list one directory at a time and queue the subdirectories
+    they find. ``os.scandir`` returns entry types without extra syscalls, so
+    only files and directories are stat()ed and symlinks are not followed.
+    Hard links are counted once per inode. The largest directories and files
+    are kept in bounded heaps, and memory grows with the number of
+    directories, not files.
+
+    A directory's own listing is cached keyed on its mtime, which changes
+    whenever an entry is added, removed or renamed. A re-scan stat()s every
+    directory but only re-lists the ones that changed. Files growing in
+    place don't touch their directory's mtime, so cached entries are also
+    re-listed once older than ``cache_max_age`` seconds.
+
+    The cache holds at most ``max_cached_dirs`` entries, evicting the least
+    recently used. A complete scan drops cached directories under its root
+    that it no longer found, so deleted trees don't linger.
+    """
+
+    def __init__(self, workers: int = 8, cache_max_age: float = 3600.0, max_cached_dirs: int = 2_000_000,
+                 timeout: Optional[float] = None):
+        self.workers = max(int(workers), 1)
+        self.timeout = timeout
+        self.cache_max_age = cache_max_age
+        self.max_cached_dirs = max_cached_dirs
+        self._cache: 'OrderedDict[str, _DirEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def scan(self, root: str, top: int = 20, one_file_system: bool = True,
+             timeout: Optional[float] = None, refresh: bool = False) -> Dict[str, Any]:
+        """Size ``root`` and return totals plus the ``top`` largest directories and files.
+
+        ``one_file_system`` stays on the root's device (like ``du -x``), which
+        also keeps /proc and other mounts out. After ``timeout`` seconds
+        (default: the scanner's), no new directories are started and the
+        result is marked ``partial``.
+        """
+        start = time.perf_counter()
+        timeout = self.timeout if timeout is None else timeout
+        root = os.path.abspath(root)
+        root_stat = os.stat(root)
+        if not stat.S_ISDIR(root_stat.st_mode):
+            raise ValueError(f"Not a directory: {root}")
+        deadline = start + timeout if timeout else None
+        now = time.time()
+
+        nodes: Dict[str, Tuple[Optional[str], _DirEntry]] = {}  # path -> (parent, entry)
+        counters = {'cached': 0, 'listed': 0, 'outstanding': 1, 'partial': False}
+        lock = threading.Lock()
+        work: 'queue.SimpleQueue[Optional[Tuple[str, Optional[str], int]]]' = queue.SimpleQueue()
+
+        # Workers pull directories and queue the subdirectories they find
+        # themselves, so the calling thread isn't woken once per directory
+        def worker():
+            while True:
+                item = work.get()
+                if item is None:
+                    return
+                path, parent, mtime_ns = item
+                children = []
+                try:
+                    entry, cached = self._list(path, mtime_ns, top, now, refresh)
+                    expired = deadline is not None and time.perf_counter() > deadline
+                    if not expired:
+                        # A cached listing's subdirectories may have changed since; stat them again
+                        subdirs = self._restat(entry.subdirs) if cached else entry.subdirs
+                        children = [(subdir, path, sub_mtime) for subdir, dev, sub_mtime in subdirs
+                                    if not one_file_system or dev == root_stat.st_dev]
+                except Exception:
+                    entry, cached, expired = _DirEntry(mtime_ns), False, False
+                    entry.errors += 1
+                with lock:
+                    nodes[path] = (parent, entry)
+                    counters['cached' if cached else 'listed'] += 1
+                    counters['partial'] = counters['partial'] or (expired and bool(entry.subdirs))
+                    counters['outstanding'] += len(children) - 1
+                    finished = counters['outstanding'] == 0
+                for child in children:
+                    work.put(child)
+                if finished:
+                    for _ in range(self.workers):
+                        work.put(None)
+
+        work.put((root, None, root_stat.st_mtime_ns))
+        threads = [threading.Thread(target=worker, name=f'dir-scan-{i}', daemon=True) for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if not counters['partial']:
+            self._prune(root, nodes)
+
+        return dict(
+            self._summarize(root, nodes, top, _disk_bytes(root_stat)),
+            cached_directories=counters['cached'],
+            listed_directories=counters['listed'],
+            partial=counters['partial'],
+            elapsed=round(time.perf_counter() - start, 3),
+        )
+
+    @staticmethod
+    def _restat(subdirs: List[Tuple[str, int, int]]) -> List[Tuple[str, int, int]]:
+        current = []
+        for path, _, _ in subdirs:
+            try:
+                st = os.lstat(path)
+            except OSError:
+                continue
+            current.append((path, st.st_dev, st.st_mtime_ns))
+        return current
+
+    def _prune(self, root: str, visited: Dict[str, Any]):
+        """Drop cached directories under ``root`` that a complete scan didn't reach."""
+        prefix = root if root.endswith(os.sep) else root + os.sep
+        with self._lock:
+            gone = [path for path in self._cache
+                    if path not in visited and (path == root or path.startswith(prefix))]
+            for path in gone:
+                del self._cache[path]
+
+    def _list(self, path: str, mtime_ns: int, top: int, now: float, refresh: bool) -> Tuple[_DirEntry, bool]:
+        """This directory's own entry, from cache when its mtime is unchanged."""
+        if not refresh:
+            with self._lock:
+                cached = self._cache.get(path)
+                if (cached is not None and cached.mtime_ns == mtime_ns
+                        and now - cached.checked_at <= self.cache_max_age
+                        and (cached.truncated_at is None or cached.truncated_at >= top)):
+                    self._cache.move_to_end(path)
+                    return cached, True
+
+        entry = _DirEntry(mtime_ns)
+        large: List[Tuple[int, str, Optional[Tuple[int, int]]]] = []
+        listed = 0
+        try:
+            with os.scandir(path) as it:
+                for item in it:
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            st = item.stat(follow_symlinks=False)
+                            entry.subdirs.append((item.path, st.st_dev, st.st_mtime_ns))
+                            entry.bytes += _disk_bytes(st)
+                        elif item.is_file(follow_symlinks=False):
+                            st = item.stat(follow_symlinks=False)
+                            size = _disk_bytes(st)
+                            entry.files += 1
+                            if st.st_nlink > 1:
+                                entry.linked.append((st.st_dev, st.st_ino, size))
+                            else:
+                                entry.bytes += size
+                            if size >= MIN_LISTED_FILE_BYTES:
+                                listed += 1
+                                candidate = (size, item.path, (st.st_dev, st.st_ino) if st.st_nlink > 1 else None)
+                                if len(large) < top:
+                                    heapq.heappush(large, candidate)
+                                elif size > large[0][0]:
+                                    heapq.heapreplace(large, candidate)
+                    except OSError:
+                        entry.errors += 1
+        except OSError:
+            entry.errors += 1
+        entry.large_files = sorted(large, reverse=True)
+        entry.truncated_at = top if listed > top else None
+        entry.checked_at = now
+
+        with self._lock:
+            self._cache[path] = entry
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.max_cached_dirs:
+                self._cache.popitem(last=False)
+        return entry, False
+
+    @staticmethod
+    def _summarize(root: str, nodes: Dict[str, Tuple[Optional[str], _DirEntry]], top: int,
+                   root_bytes: int) -> Dict[str, Any]:
+        """Roll own sizes up into per-directory totals and pick the largest."""
+        seen_inodes = set()
+        listed_inodes = set()
+        hardlinks_skipped = 0
+        totals: Dict[str, int] = {}
+        files = errors = 0
+        file_heap: List[Tuple[int, str]] = []
+        for path, (_, entry) in nodes.items():
+            size = entry.bytes
+            for dev, ino, linked_size in entry.linked:
+                if (dev, ino) in seen_inodes:
+                    hardlinks_skipped += 1
+                else:
+                    seen_inodes.add((dev, ino))
+                    size += linked_size
+            totals[path] = size
+            files += entry.files
+            errors += entry.errors
+            for file_bytes, file_path, inode in entry.large_files:
+                # List each hard-linked file once, under the first name found
+                if inode is not None:
+                    if inode in listed_inodes:
+                        continue
+                    listed_inodes.add(inode)
+                item = (file_bytes, file_path)
+                if len(file_heap) < top:
+                    heapq.heappush(file_heap, item)
+                elif item[0] > file_heap[0][0]:
+                    heapq.heapreplace(file_heap, item)
+
+        # Children before parents: deeper paths have more separators
+        for path in sorted(nodes, key=lambda p: p.count(os.sep), reverse=True):
+            parent = nodes[path][0]
+            if parent is not None:
+                totals[parent] += totals[path]
+
+        top_dirs = heapq.nlargest(top, ((size, path) for path, size in totals.items() if path != root))
+        return {
+            'root': root,
+            'total_bytes': totals.get(root, 0) + root_bytes,
+            'files': files,
+            'directories': len(nodes),
+            'hardlinks_skipped': hardlinks_skipped,
+            'errors': errors,
+            'top_directories': [{'path': path, 'bytes': size} for size, path in top_dirs],
+            'top_files': [{'path': path, 'bytes': size} for size, path in sorted(file_heap, reverse=True)],
+        }
+
+def format_bytes(size: int) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size} B"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+def print_scan(result: Dict[str, Any]):
+    """Print a scan result as a report."""
+    from colorama import Fore, Style
+
+    print(f"\n{Fore.CYAN}{'='*60}")
+    print(f"{Fore.CYAN}DISK USAGE: {result['root']}")
+    print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}\n")
+    print(f"  Total: {format_bytes(result['total_bytes'])} in {result['files']} files, "
+          f"{result['directories']} directories ({result['elapsed']:.2f}s)")
+    if result['partial']:
+        print(f"  {Fore.YELLOW}Partial: the scan hit its time limit{Style.RESET_ALL}")
+    if result['errors']:
+        print(f"  {result['errors']} entries could not be read")
+
+    print(f"\n{Fore.YELLOW}Largest directories:{Style.RESET_ALL}")
+    for item in result['top_directories']:
+        print(f"  {format_bytes(item['bytes']):>10}  {item['path']}")
+    print(f"\n{Fore.YELLOW}Largest files:{Style.RESET_ALL}")
+    for item in result['top_files']:
+        print(f"  {format_bytes(item['bytes']):>10}  {item['path']}")
+    print()
+
+_scanner: Optional[DirectoryScanner] = None
+_scanner_lock = threading.Lock()
+
+def get_directory_scanner() -> DirectoryScanner:
+    """Return the process-wide scanner, configured from performance.dir_scan."""
+    global _scanner
+    with _scanner_lock:
+        if _scanner is None:
+            _scanner = DirectoryScanner(
+                workers=int(get_setting('performance.dir_scan.workers', 8)),
+                cache_max_age=float(get_setting('performance.dir_scan.cache_max_age_seconds', 3600)),
+                max_cached_dirs=int(get_setting('performance.dir_scan.max_cached_dirs', 2_000_000)),
+                timeout=float(get_setting('performance.dir_scan.timeout_seconds', 60)),
+            )
+        return _scanner
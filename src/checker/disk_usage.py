@@ -0,0 +1,141 @@
+"""
+Disk Usage
+Byte and inode usage for every real mount, read concurrently so one hung mount can't stall a check
+"""
+import fnmatch
+import os
+import threading
+from concurrent.futures import Future, wait
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+from src.core.config import get_setting
+
+# Virtual, in-memory and image filesystems that never fill up with user data
+PSEUDO_FILESYSTEMS = frozenset({
+    'autofs', 'binfmt_misc', 'bpf', 'cgroup', 'cgroup2', 'configfs', 'debugfs', 'devfs',
+    'devpts', 'devtmpfs', 'efivarfs', 'fuse.gvfsd-fuse', 'fuse.lxcfs', 'fuse.portal',
+    'fuse.snapfuse', 'fusectl', 'hugetlbfs', 'iso9660', 'mqueue', 'nsfs', 'overlay', 'proc',
+    'pstore', 'ramfs', 'rpc_pipefs', 'securityfs', 'squashfs', 'sysfs', 'tmpfs', 'tracefs',
+})
+
+def list_mounts() -> List[Dict[str, str]]:
+    """Real mounts (device, mountpoint, fstype), skipping pseudo filesystems and repeated mountpoints.
+
+    Lists all partitions rather than psutil's physical-only view, so network
+    mounts (NFS, SMB) are included.
+    """
+    mounts = []
+    seen = set()
+    for partition in psutil.disk_partitions(all=True):
+        fstype = partition.fstype.lower()
+        if not fstype or partition.mountpoint in seen:
+            continue
+        # A container's root is an overlay; other overlays are per-container layers
+        if fstype in PSEUDO_FILESYSTEMS and not (fstype == 'overlay' and partition.mountpoint == '/'):
+            continue
+        # Windows lists empty card readers and optical drives as 'removable'/'cdrom'
+        if 'cdrom' in partition.opts:
+            continue
+        seen.add(partition.mountpoint)
+        mounts.append({'device': partition.device, 'mountpoint': partition.mountpoint, 'fstype': partition.fstype})
+    return mounts
+
+def _usage(mountpoint: str) -> Dict[str, Any]:
+    usage = psutil.disk_usage(mountpoint)
+    result = {'total': usage.total, 'used': usage.used, 'free': usage.free, 'percent': usage.percent}
+    if hasattr(os, 'statvfs'):
+        st = os.statvfs(mountpoint)
+        # Filesystems without a fixed inode table (btrfs, zfs, ...) report 0 inodes
+        if st.f_files:
+            used = st.f_files - st.f_ffree
+            result.update(
+                inodes_total=st.f_files,
+                inodes_used=used,
+                inodes_percent=round(100.0 * used / st.f_files, 1),
+            )
+    return result
+
+class DiskUsageReader:
+    """Read usage for many mounts at once, each call bounded by ``timeout``.
+
+    A stat() on a hung network mount blocks in the kernel and the thread
+    can't be interrupted. Such a mount is reported with ``error: timeout``
+    and is not queried again until its stuck call returns, so repeated
+    checks don't pile up blocked threads.
+
+    Each mount is read on its own daemon thread rather than from a shared
+    pool, so mounts that are still stuck can't use up the workers that
+    healthy mounts need, and a hung stat() doesn't hold up interpreter exit.
+    At most one thread per mount is blocked at a time.
+    """
+
+    def __init__(self, timeout: float = 2.0):
+        self.timeout = timeout
+        self._stuck: Dict[str, Any] = {}  # Mountpoint -> future still blocked from an earlier read
+        self._lock = threading.Lock()
+
+    def read(self, mounts: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, Any]]:
+        """Mount descriptions from ``list_mounts`` merged with their usage, or an ``error``."""
+        mounts = list_mounts() if mounts is None else mounts
+        futures = {}
+        results = {}
+        with self._lock:
+            for mount in mounts:
+                mountpoint = mount['mountpoint']
+                stuck = self._stuck.get(mountpoint)
+                if stuck is not None and not stuck.done():
+                    results[mountpoint] = dict(mount, error='timeout')
+                    continue
+                self._stuck.pop(mountpoint, None)
+                futures[mountpoint] = self._start(mountpoint)
+
+        wait(list(futures.values()), timeout=self.timeout)
+        for mount in mounts:
+            mountpoint = mount['mountpoint']
+            future = futures.get(mountpoint)
+            if future is None:
+                continue
+            if not future.done():
+                with self._lock:
+                    self._stuck[mountpoint] = future
+                results[mountpoint] = dict(mount, error='timeout')
+            elif future.exception() is not None:
+                results[mountpoint] = dict(mount, error=str(future.exception()))
+            else:
+                results[mountpoint] = dict(mount, **future.result())
+        return [results[mount['mountpoint']] for mount in mounts]
+
+    @staticmethod
+    def _start(mountpoint: str) -> Future:
+        future: Future = Future()
+
+        def run():
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(_usage(mountpoint))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f'disk-usage {mountpoint}', daemon=True).start()
+        return future
+
+def mount_thresholds(mountpoint: str, overrides: List[Dict[str, Any]],
+                     defaults: Dict[str, Any]) -> Dict[str, Any]:
+    """Thresholds for a mount: the first ``overrides`` entry whose ``pattern`` matches, over ``defaults``."""
+    for entry in overrides or []:
+        if fnmatch.fnmatch(mountpoint, str(entry.get('pattern', ''))):
+            return dict(defaults, **{key: value for key, value in entry.items() if key != 'pattern'})
+    return dict(defaults)
+
+_reader: Optional[DiskUsageReader] = None
+_reader_lock = threading.Lock()
+
+def get_disk_usage_reader() -> DiskUsageReader:
+    """Return the process-wide reader, with its timeout from performance.disk_usage_timeout_seconds."""
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            _reader = DiskUsageReader(timeout=float(get_setting('performance.disk_usage_timeout_seconds', 2.0)))
+        return _reader
@@ -0,0 +1,72 @@
+"""
+dpkg Status Reader
+Parses /var/lib/dpkg/status directly instead of spawning `dpkg -l`
+"""
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DPKG_STATUS_PATH = '/var/lib/dpkg/status'
+
+# Only these fields are kept; everything else in a stanza is skipped
+_FIELDS = {
+    'Package': 'name',
+    'Version': 'version',
+    'Architecture': 'architecture',
+    'Status': 'status',
+}
+
+def iter_dpkg_status(path: str = DPKG_STATUS_PATH) -> Iterator[Dict[str, str]]:
+    """Stream package records (name, version, architecture, status) from a status file."""
+    record: Dict[str, str] = {}
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if line == '\n':
+                if 'name' in record:
+                    yield record
+                record = {}
+                continue
+            # Continuation lines (descriptions, conffiles) start with whitespace
+            if line[0] in ' \t':
+                continue
+            key, sep, value = line.partition(':')
+            if sep and key in _FIELDS:
+                record[_FIELDS[key]] = value.strip()
+    if 'name' in record:
+        yield record
+
+def is_installed(record: Dict[str, str]) -> bool:
+    """Whether a record's Status is 'install ok installed' (the `ii` in dpkg -l)."""
+    return record.get('status', '').endswith(' installed')
+
+class DpkgStatusReader:
+    """Read installed packages, re-parsing only when the status file changes."""
+
+    def __init__(self, path: str = DPKG_STATUS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._key: Optional[Tuple[int, int, int]] = None
+        self._packages: List[Dict[str, str]] = []
+
+    def available(self) -> bool:
+        """Whether the status file exists on this host."""
+        return os.path.isfile(self.path)
+
+    def installed_packages(self) -> List[Dict[str, str]]:
+        """Installed package records. Costs one stat() while the file is unchanged."""
+        st = os.stat(self.path)
+        # dpkg replaces the file on every install/remove, so inode or mtime changes
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if key != self._key:
+                self._packages = [r for r in iter_dpkg_status(self.path) if is_installed(r)]
+                self._key = key
+            return self._packages
+
+_readers: Dict[str, DpkgStatusReader] = {}
+
+def get_dpkg_reader(path: str = DPKG_STATUS_PATH) -> DpkgStatusReader:
+    """Return the shared reader for a status file so its cache survives across checks."""
+    if path not in _readers:
+        _readers[path] = DpkgStatusReader(path)
+    return _readers[path]
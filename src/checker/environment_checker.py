@@ -1,78 +1,333 @@
-import psutil
-import platform
 import time
-from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from functools import partial
+from typing import Dict, List, Any, Optional
 from pathlib import Path
 
+from src.core.metrics import get_metrics
+from src.core.package_backends import get_package_backends
+from src.core.result_cache import ResultSnapshot, get_result_cache, cache_ttl
+from src.checker.dpkg_status import get_dpkg_reader
+from src.checker.software_inventory import get_software_inventory
+from src.checker.environment_snapshot import get_snapshot_collector, thaw
+
+class SectionSelectionError(ValueError):
+    """A section selection that is empty or names sections that don't exist."""
+
 class EnvironmentChecker:
     """Check and analyze the computer environment."""
     
+    # Report sections in display order, mapped to the method computing each one
+    SECTIONS = {
+        'system': 'check_system',
+        'resources': 'check_resources',
+        'software': 'check_installed_software',
+        'network': 'check_network',
+        'security': 'check_security',
+        'development': 'check_development_tools',
+    }
+    
+    # Snapshot facts each section reads; a refresh re-collects these
+    SECTION_FACTS = {
+        'system': ['hostname', 'boot_time'],
+        'resources': ['cpu', 'memory', 'disk', 'mounts'],
+        'software': [],
+        'network': ['net_interfaces', 'connections'],
+        'security': ['firewall'],
+        'development': ['dev_tools'],
+    }
+    
     def __init__(self, platform_info: Dict[str, Any], logger):
         self.platform_info = platform_info
         self.logger = logger
         self.os = platform_info['os']
+        self.facts = get_snapshot_collector(self.os, logger)
     
-    def check_all(self) -> Dict[str, Any]:
-        """Perform all environment checks."""
+    def check_all(self, concurrent: bool = False, max_workers: int = None,
+                  section_timeout: float = 30.0, since: Optional[str] = None,
+                  sections: Optional[List[str]] = None, use_cache: bool = False,
+                  refresh: bool = False, snapshot: Optional[ResultSnapshot] = None) -> Dict[str, Any]:
+        """Perform all environment checks.
+        
+        With ``concurrent=True`` the sections run on a bounded thread pool and
+        each one gets ``section_timeout`` seconds from submission; a section that misses its
+        deadline is returned as ``{'partial': True, ...}`` instead of holding
+        up the report. Wall time per section is reported under ``timings``.
+        ``since`` is a software snapshot id to report the inventory delta against.
+        ``sections`` limits the check to the named sections; the others are
+        never computed and are absent from the result.
+        
+        With ``use_cache=True`` each section is served from the shared result
+        cache while younger than its TTL, and concurrent identical checks share
+        one computation; ``cache_age`` reports each section's age in seconds.
+        ``refresh`` forces recomputation. A ``snapshot`` pins each section to
+        its first result, so callers sharing it see the same data.
+        """
         self.logger.info("Starting environment check...")
         
-        results = {
-            'system': self.check_system(),
-            'resources': self.check_resources(),
-            'software': self.check_installed_software(),
-            'network': self.check_network(),
-            'security': self.check_security(),
-            'development': self.check_development_tools(),
-        }
+        selected = self.select_sections(sections)
+        section_args = {'software': {'since': since}}
+        cache_ages = {}
+        if refresh:
+            self._invalidate_facts(selected)
+        if use_cache:
+            run = partial(self._run_cached_section, refresh=refresh, cache_ages=cache_ages, snapshot=snapshot)
+        else:
+            run = self._run_section
+        if concurrent:
+            results = self._run_sections_concurrently(selected, max_workers, section_timeout, section_args, run)
+        else:
+            results = {'timings': {}}
+            for section in selected:
+                data, elapsed = run(section, section_args.get(section))
+                results[section] = data
+                results['timings'][section] = round(elapsed, 3)
+        if use_cache:
+            results['cache_age'] = {s: cache_ages[s] for s in selected if s in cache_ages}
         
         self.logger.info("Environment check completed")
         return results
     
+    @classmethod
+    def select_sections(cls, sections: Optional[List[str]] = None) -> List[str]:
+        """Validate a section selection and return it in report order. None selects every section."""
+        if sections is None:
+            return list(cls.SECTIONS)
+        if not sections:
+            raise SectionSelectionError(
+                f"No sections selected. Valid sections: {', '.join(cls.SECTIONS)}"
+            )
+        unknown = set(sections) - set(cls.SECTIONS)
+        if unknown:
+            raise SectionSelectionError(
+                f"Unknown section(s): {', '.join(sorted(unknown))}. "
+                f"Valid sections: {', '.join(cls.SECTIONS)}"
+            )
+        return [section for section in cls.SECTIONS if section in sections]
+    
+    @classmethod
+    def sections_from_flags(cls, include_software: bool = True, include_network: bool = True,
+                            include_security: bool = True) -> List[str]:
+        """Translate the include_* request flags into a section selection."""
+        excluded = set()
+        if not include_software:
+            excluded.add('software')
+        if not include_network:
+            excluded.add('network')
+        if not include_security:
+            excluded.add('security')
+        return [section for section in cls.SECTIONS if section not in excluded]
+    
+    def _invalidate_facts(self, selected: List[str]):
+        """Make the selected sections re-read the host instead of reusing cached facts."""
+        self.facts.invalidate(fact for section in selected for fact in self.SECTION_FACTS[section])
+    
+    def _run_section(self, section: str, kwargs: Optional[Dict[str, Any]] = None):
+        """Run a single section, returning its data and wall time."""
+        start = time.perf_counter()
+        try:
+            data = getattr(self, self.SECTIONS[section])(**(kwargs or {}))
+        except Exception as e:
+            self.logger.warning(f"Section '{section}' failed: {e}")
+            data = {'partial': True, 'error': str(e)}
+        elapsed = time.perf_counter() - start
+        get_metrics().check_duration.observe(elapsed, section=section)
+        return data, elapsed
+    
+    def _run_cached_section(self, section: str, kwargs: Optional[Dict[str, Any]] = None,
+                            refresh: bool = False, cache_ages: Optional[Dict[str, float]] = None,
+                            snapshot: Optional[ResultSnapshot] = None):
+        """Run a section through the shared result cache, recording its age.
+        
+        Only the default form of a section is cached. Arguments such as
+        ``since`` come from the client, and caching them would add an entry
+        per distinct value, so such runs are computed every time.
+        """
+        start = time.perf_counter()
+        args = {name: value for name, value in (kwargs or {}).items() if value is not None}
+        key = ('check', section, tuple(sorted(args.items())))
+        
+        def cached():
+            if args:
+                return self._run_section(section, kwargs)[0], 0.0
+            return get_result_cache().get_or_compute(
+                key,
+                lambda: self._run_section(section, kwargs)[0],
+                ttl=cache_ttl(section),
+                refresh=refresh,
+                cacheable=lambda value: not value.get('partial'),
+            )
+        
+        data, age = snapshot.get_or_compute(key, cached) if snapshot is not None else cached()
+        if cache_ages is not None:
+            cache_ages[section] = round(age, 3)
+        return data, time.perf_counter() - start
+    
+    def _run_sections_concurrently(self, selected: List[str], max_workers: int, section_timeout: float,
+                                   section_args: Dict[str, Dict[str, Any]], run) -> Dict[str, Any]:
+        """Run the selected sections on a thread pool with a deadline per section."""
+        finished = {}
+        timings = {}
+        for section, data, elapsed in self._iter_sections_concurrently(
+                selected, max_workers, section_timeout, section_args, run):
+            finished[section] = data
+            timings[section] = round(elapsed, 3)
+        
+        results = {section: finished[section] for section in selected}
+        results['timings'] = {section: timings[section] for section in selected}
+        return results
+    
+    def _iter_sections_concurrently(self, selected: List[str], max_workers: int, section_timeout: float,
+                                    section_args: Dict[str, Dict[str, Any]], run):
+        """Yield ``(section, data, elapsed)`` as each section finishes.
+        
+        Sections still running at the deadline are yielded last, as partial.
+        """
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers or max(len(selected), 1),
+            thread_name_prefix='env-check'
+        )
+        try:
+            submitted = time.perf_counter()
+            futures = {
+                executor.submit(run, section, section_args.get(section)): section
+                for section in selected
+            }
+            remaining = dict(futures)
+            try:
+                for future in as_completed(futures, timeout=section_timeout):
+                    del remaining[future]
+                    data, elapsed = future.result()
+                    yield futures[future], data, elapsed
+            except FuturesTimeout:
+                pass
+            
+            for future, section in remaining.items():
+                if future.done():
+                    data, elapsed = future.result()
+                    yield section, data, elapsed
+                    continue
+                future.cancel()
+                self.logger.warning(f"Section '{section}' timed out after {section_timeout}s")
+                yield section, {
+                    'partial': True,
+                    'error': f'Timed out after {section_timeout}s',
+                }, time.perf_counter() - submitted
+        finally:
+            # Don't wait for stragglers; their results are already marked partial
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def iter_check(self, max_workers: int = None, section_timeout: float = 30.0,
+                   since: Optional[str] = None, sections: Optional[List[str]] = None,
+                   use_cache: bool = False, refresh: bool = False,
+                   snapshot: Optional[ResultSnapshot] = None):
+        """Run the check concurrently, yielding each section as soon as it finishes.
+        
+        Yields ``{'type': 'section', 'section', 'data', 'elapsed'}`` records in
+        completion order (plus ``cache_age`` with ``use_cache``), then one
+        ``{'type': 'summary', ...}`` record with the section order, timings,
+        cache ages, the names of partial sections and the total wall time.
+        Arguments are as for :meth:`check_all`. Unknown section names raise
+        ``SectionSelectionError`` on the first iteration.
+        """
+        selected = self.select_sections(sections)
+        section_args = {'software': {'since': since}}
+        cache_ages = {}
+        if refresh:
+            self._invalidate_facts(selected)
+        if use_cache:
+            run = partial(self._run_cached_section, refresh=refresh, cache_ages=cache_ages, snapshot=snapshot)
+        else:
+            run = self._run_section
+        
+        self.logger.info("Starting environment check...")
+        start = time.perf_counter()
+        timings = {}
+        partial_sections = []
+        for section, data, elapsed in self._iter_sections_concurrently(
+                selected, max_workers, section_timeout, section_args, run):
+            timings[section] = round(elapsed, 3)
+            if data.get('partial'):
+                partial_sections.append(section)
+            record = {'type': 'section', 'section': section, 'data': data, 'elapsed': timings[section]}
+            if section in cache_ages:
+                record['cache_age'] = cache_ages[section]
+            yield record
+        
+        summary = {
+            'type': 'summary',
+            'sections': selected,
+            'timings': {section: timings[section] for section in selected},
+            'partial': partial_sections,
+            'elapsed': round(time.perf_counter() - start, 3),
+        }
+        if use_cache:
+            summary['cache_age'] = {s: cache_ages[s] for s in selected if s in cache_ages}
+        self.logger.info("Environment check completed")
+        yield summary
+    
     def check_system(self) -> Dict[str, Any]:
         """Check system information."""
         self.logger.debug("Checking system information...")
         
+        facts = self.facts.collect(self.SECTION_FACTS['system'])
+        boot_time = facts.get('boot_time')
+        
         return {
             'os': self.platform_info.get('os', 'unknown'),
             'version': self.platform_info.get('version', 'unknown'),
             'release': self.platform_info.get('release', 'unknown'),
             'architecture': self.platform_info.get('architecture', 'unknown'),
-            'hostname': platform.node(),
-            'uptime_days': (time.time() - psutil.boot_time()) / 86400 if psutil.boot_time() else 0,
+            'hostname': facts.get('hostname', 'unknown'),
+            'uptime_days': (time.time() - boot_time) / 86400 if boot_time else 0,
         }
     
     def check_resources(self) -> Dict[str, Any]:
         """Check system resources."""
         self.logger.debug("Checking system resources...")
         
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        facts = self.facts.collect(self.SECTION_FACTS['resources'])
+        cpu = facts['cpu']
+        memory = facts['memory']
+        disk = facts['disk']
         
         return {
-            'cpu_count': psutil.cpu_count(),
-            'cpu_percent': psutil.cpu_percent(interval=1),
+            'cpu_count': cpu['count'],
+            'cpu_percent': cpu['percent'],
+            'cpu_percent_per_core': list(cpu['per_core']),
+            'cpu_load': thaw(cpu['load']),
             'memory_total_gb': memory.total / (1024**3),
             'memory_available_gb': memory.available / (1024**3),
             'memory_percent': memory.percent,
             'disk_total_gb': disk.total / (1024**3),
             'disk_free_gb': disk.free / (1024**3),
             'disk_percent': disk.percent,
+            # Every real mount, with inode usage where the filesystem has an inode table
+            'disks': thaw(facts.get('mounts', ())),
         }
     
-    def check_installed_software(self) -> Dict[str, List[str]]:
-        """Check installed software."""
+    def check_installed_software(self, since: Optional[str] = None) -> Dict[str, Any]:
+        """Check installed software.
+        
+        The inventory is persisted as a snapshot; the result carries its
+        ``snapshot_id`` and a ``delta`` (added/removed/changed) against the
+        previous snapshot, or against ``since`` when given, in which case the
+        full ``installed`` list is omitted.
+        """
         self.logger.debug("Checking installed software...")
         
         if self.os == 'windows':
-            return self._check_windows_software()
+            packages = self._check_windows_software()
         elif self.os == 'linux':
-            return self._check_linux_software()
+            packages = self._check_linux_software()
         else:
             return {'installed': [], 'error': 'Platform not supported'}
+        
+        return get_software_inventory().record(packages, since=since)
     
-    def _check_windows_software(self) -> Dict[str, List[str]]:
-        """Check installed software on Windows."""
-        installed = []
+    def _check_windows_software(self) -> Dict[str, str]:
+        """Check installed software on Windows. Returns name -> version."""
+        installed = {}
         
         try:
             try:
@@ -101,7 +356,11 @@ class EnvironmentChecker:
                             try:
                                 display_name = winreg.QueryValueEx(subkey_handle, "DisplayName")[0]
                                 if display_name:
-                                    installed.append(display_name)
+                                    try:
+                                        version = winreg.QueryValueEx(subkey_handle, "DisplayVersion")[0]
+                                    except FileNotFoundError:
+                                        version = ''
+                                    installed[display_name] = str(version or '')
                             except FileNotFoundError:
                                 pass
                             
@@ -115,19 +374,18 @@ class EnvironmentChecker:
             self.logger.warning(f"Could not check Windows software via registry: {e}")
             return self._check_windows_software_powershell()
         
-        return {'installed': list(set(installed))}
+        return installed
     
-    def _check_windows_software_powershell(self) -> Dict[str, List[str]]:
-        """Check installed software using PowerShell."""
-        installed = []
+    def _check_windows_software_powershell(self) -> Dict[str, str]:
+        """Check installed software using PowerShell. Returns name -> version."""
+        installed = {}
         
         try:
             import subprocess
             ps_command = """
             Get-ItemProperty HKLM:\\Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\* | 
-            Select-Object DisplayName | 
             Where-Object { $_.DisplayName } | 
-            ForEach-Object { $_.DisplayName }
+            ForEach-Object { "$($_.DisplayName)`t$($_.DisplayVersion)" }
             """
             
             result = subprocess.run(
@@ -138,194 +396,163 @@ class EnvironmentChecker:
             )
             
             if result.returncode == 0:
-                installed = [line.strip() for line in result.stdout.split('\n') if line.strip()]
+                for line in result.stdout.split('\n'):
+                    name, _, version = line.strip().partition('\t')
+                    if name:
+                        installed[name] = version
         except Exception as e:
             self.logger.warning(f"Could not check Windows software via PowerShell: {e}")
         
-        return {'installed': list(set(installed))}
+        return installed
     
-    def _check_linux_software(self) -> Dict[str, List[str]]:
-        """Check installed software on Linux."""
-        installed = []
+    def _check_linux_software(self) -> Dict[str, str]:
+        """Check installed software on Linux. Returns name -> version."""
+        installed = {}
         
         try:
             import subprocess
             
-            # Check dpkg (Debian/Ubuntu)
-            result = subprocess.run(
-                ['dpkg', '-l'],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                for line in result.stdout.split('\n')[5:]:  # Skip header
-                    if line.startswith('ii'):
-                        parts = line.split()
-                        if len(parts) >= 2:
-                            installed.append(parts[1])
+            # Check dpkg (Debian/Ubuntu) by reading its status file directly
+            dpkg_reader = get_dpkg_reader()
+            if dpkg_reader.available():
+                for pkg in dpkg_reader.installed_packages():
+                    installed[pkg['name']] = pkg.get('version', '')
             
             # Check rpm (RedHat/CentOS)
-            result = subprocess.run(
-                ['rpm', '-qa'],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                installed.extend(result.stdout.strip().split('\n'))
+            if get_package_backends().has('rpm'):
+                result = subprocess.run(
+                    ['rpm', '-qa', '--queryformat', '%{NAME}\\t%{VERSION}-%{RELEASE}\\n'],
+                    capture_output=True,
+                    text=True
+                )
+                if result.returncode == 0:
+                    for line in result.stdout.split('\n'):
+                        name, _, version = line.partition('\t')
+                        if name:
+                            installed[name] = version
                 
         except Exception as e:
             self.logger.warning(f"Could not check Linux software: {e}")
         
-        return {'installed': list(set(installed))}
+        return installed
     
     def check_network(self) -> Dict[str, Any]:
         """Check network configuration."""
         self.logger.debug("Checking network configuration...")
         
-        interfaces = {}
-        for interface, addrs in psutil.net_if_addrs().items():
-            interfaces[interface] = [
-                {'family': str(addr.family), 'address': addr.address}
-                for addr in addrs
-            ]
+        facts = self.facts.collect(self.SECTION_FACTS['network'])
+        summary = thaw(facts['connections'])
         
         return {
-            'interfaces': interfaces,
-            'connections': len(psutil.net_connections()),
+            'interfaces': thaw(facts['net_interfaces']),
+            'connections': summary['total'],
+            'connection_summary': summary,
         }
     
     def check_security(self) -> Dict[str, Any]:
         """Check security settings."""
         self.logger.debug("Checking security settings...")
         
+        firewall = self.facts.collect(self.SECTION_FACTS['security']).get('firewall')
+        
         # Basic security checks
-        checks = {
-            'firewall_enabled': None,
+        return {
+            'firewall_enabled': firewall['enabled'] if firewall else None,
             'antivirus_installed': False,
             'updates_pending': None,
         }
-        
-        if self.os == 'windows':
-            checks.update(self._check_windows_security())
-        elif self.os == 'linux':
-            checks.update(self._check_linux_security())
-        
-        return checks
-    
-    def _check_windows_security(self) -> Dict[str, Any]:
-        """Check Windows security settings."""
-        checks = {}
-        
-        try:
-            import subprocess
-            # Check firewall status
-            result = subprocess.run(
-                ['netsh', 'advfirewall', 'show', 'allprofiles', 'state'],
-                capture_output=True,
-                text=True
-            )
-            checks['firewall_enabled'] = 'ON' in result.stdout.upper()
-        except Exception:
-            pass
-        
-        return checks
-    
-    def _check_linux_security(self) -> Dict[str, Any]:
-        """Check Linux security settings."""
-        checks = {}
-        
-        try:
-            import subprocess
-            # Check firewall (ufw/iptables)
-            result = subprocess.run(
-                ['ufw', 'status'],
-                capture_output=True,
-                text=True
-            )
-            checks['firewall_enabled'] = 'active' in result.stdout.lower()
-        except Exception:
-            pass
-        
-        return checks
     
     def check_development_tools(self) -> Dict[str, Any]:
         """Check development tools."""
         self.logger.debug("Checking development tools...")
         
+        # Version commands run concurrently; unchanged binaries come from cache
         tools = {}
-        
-        # Check common development tools
-        common_tools = {
-            'git': 'git --version',
-            'python': 'python --version',
-            'node': 'node --version',
-            'docker': 'docker --version',
-            'java': 'java -version',
-        }
-        
-        for tool, command in common_tools.items():
-            try:
-                import subprocess
-                result = subprocess.run(
-                    command.split(),
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                tools[tool] = {
-                    'installed': result.returncode == 0,
-                    'version': result.stdout.strip() if result.returncode == 0 else None
-                }
-                
-                # Special handling for Docker - check if Docker Desktop is running (Windows)
-                if tool == 'docker' and self.os == 'windows' and result.returncode == 0:
-                    try:
-                        # Check if Docker daemon is accessible
-                        docker_info = subprocess.run(
-                            ['docker', 'info'],
-                            capture_output=True,
-                            text=True,
-                            timeout=5
-                        )
-                        tools[tool]['daemon_running'] = docker_info.returncode == 0
-                        if docker_info.returncode != 0:
-                            tools[tool]['note'] = 'Docker installed but daemon not running. Start Docker Desktop.'
-                    except Exception:
-                        tools[tool]['daemon_running'] = False
-                        tools[tool]['note'] = 'Docker installed but daemon not accessible.'
-                
-            except Exception:
-                tools[tool] = {'installed': False}
-                if tool == 'docker':
-                    tools[tool]['installation_guide'] = 'See DOCKER_INSTALLATION.md for installation instructions'
+        for tool, info in self.facts.collect(self.SECTION_FACTS['development'])['dev_tools'].items():
+            tools[tool] = {'installed': info['installed'], 'version': info['version']}
+            
+            # Special handling for Docker - check if Docker Desktop is running (Windows)
+            if tool == 'docker' and self.os == 'windows' and info['installed']:
+                try:
+                    import subprocess
+                    # Check if Docker daemon is accessible
+                    docker_info = subprocess.run(
+                        [info['path'], 'info'],
+                        capture_output=True,
+                        text=True,
+                        timeout=5
+                    )
+                    tools[tool]['daemon_running'] = docker_info.returncode == 0
+                    if docker_info.returncode != 0:
+                        tools[tool]['note'] = 'Docker installed but daemon not running. Start Docker Desktop.'
+                except Exception:
+                    tools[tool]['daemon_running'] = False
+                    tools[tool]['note'] = 'Docker installed but daemon not accessible.'
+            
+            if tool == 'docker' and not info['installed']:
+                tools[tool]['installation_guide'] = 'See DOCKER_INSTALLATION.md for installation instructions'
         
         return tools
     
     def print_report(self, results: Dict[str, Any]):
         """Print a formatted report of the check results."""
+        self.print_report_header()
+        for section in self.SECTIONS:
+            if section in results:
+                self.print_section(section, results[section])
+        self.print_timings(results.get('timings'))
+    
+    def print_report_header(self):
+        """Print the report banner."""
         from colorama import Fore, Style
         
         print(f"\n{Fore.CYAN}{'='*60}")
         print(f"{Fore.CYAN}ENVIRONMENT CHECK REPORT")
-        print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}\n")
+        print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
+    
+    def print_section(self, section: str, data: Dict[str, Any]):
+        """Print one report section. Sections without a printer are skipped."""
+        printers = {
+            'system': self._print_system,
+            'resources': self._print_resources,
+            'development': self._print_development,
+            'software': self._print_software,
+        }
+        printer = printers.get(section)
+        if printer:
+            printer(data)
+    
+    def _print_system(self, sys_info: Dict[str, Any]):
+        from colorama import Fore, Style
         
-        # System
-        print(f"{Fore.YELLOW}System Information:{Style.RESET_ALL}")
-        sys_info = results['system']
-        print(f"  OS: {sys_info['os']} {sys_info.get('release', '')}")
-        print(f"  Architecture: {sys_info['architecture']}")
-        print(f"  Hostname: {sys_info['hostname']}")
+        print(f"\n{Fore.YELLOW}System Information:{Style.RESET_ALL}")
+        if not self._print_partial(sys_info):
+            print(f"  OS: {sys_info['os']} {sys_info.get('release', '')}")
+            print(f"  Architecture: {sys_info['architecture']}")
+            print(f"  Hostname: {sys_info['hostname']}")
+    
+    def _print_resources(self, res: Dict[str, Any]):
+        from colorama import Fore, Style
         
-        # Resources
         print(f"\n{Fore.YELLOW}System Resources:{Style.RESET_ALL}")
-        res = results['resources']
-        print(f"  CPU: {res['cpu_count']} cores, {res['cpu_percent']:.1f}% usage")
-        print(f"  Memory: {res['memory_available_gb']:.1f} GB / {res['memory_total_gb']:.1f} GB ({res['memory_percent']:.1f}% used)")
-        print(f"  Disk: {res['disk_free_gb']:.1f} GB / {res['disk_total_gb']:.1f} GB ({res['disk_percent']:.1f}% used)")
+        if not self._print_partial(res):
+            print(f"  CPU: {res['cpu_count']} cores, {res['cpu_percent']:.1f}% usage")
+            print(f"  Memory: {res['memory_available_gb']:.1f} GB / {res['memory_total_gb']:.1f} GB ({res['memory_percent']:.1f}% used)")
+            print(f"  Disk: {res['disk_free_gb']:.1f} GB / {res['disk_total_gb']:.1f} GB ({res['disk_percent']:.1f}% used)")
+            for mount in res.get('disks', []):
+                if 'error' in mount:
+                    print(f"    {mount['mountpoint']}: {Fore.RED}{mount['error']}{Style.RESET_ALL}")
+                    continue
+                inodes = f", inodes {mount['inodes_percent']:.1f}%" if 'inodes_percent' in mount else ''
+                print(f"    {mount['mountpoint']} ({mount['fstype']}): {mount['free'] / (1024**3):.1f} GB free, "
+                      f"{mount['percent']:.1f}% used{inodes}")
+    
+    def _print_development(self, dev_tools: Dict[str, Any]):
+        from colorama import Fore, Style
         
-        # Development Tools
         print(f"\n{Fore.YELLOW}Development Tools:{Style.RESET_ALL}")
-        dev_tools = results['development']
+        if self._print_partial(dev_tools):
+            return
         for tool, info in dev_tools.items():
             # Use ASCII-friendly characters for Windows compatibility
             status = f"{Fore.GREEN}[OK]{Style.RESET_ALL}" if info.get('installed') else f"{Fore.RED}[X]{Style.RESET_ALL}"
@@ -344,15 +571,39 @@ class EnvironmentChecker:
                 print(f"    {Fore.YELLOW}Note: {info['note']}{Style.RESET_ALL}")
             if 'installation_guide' in info:
                 print(f"    {Fore.CYAN}Tip: {info['installation_guide']}{Style.RESET_ALL}")
+    
+    def _print_software(self, software_info: Dict[str, Any]):
+        from colorama import Fore, Style
         
-        # Installed Software
         print(f"\n{Fore.YELLOW}Installed Software:{Style.RESET_ALL}")
-        software = results['software'].get('installed', [])
-        print(f"  Found {len(software)} installed applications")
+        if self._print_partial(software_info):
+            return
+        software = software_info.get('installed', [])
+        print(f"  Found {software_info.get('count', len(software))} installed applications")
+        delta = software_info.get('delta')
+        if delta:
+            print(f"  Since snapshot {software_info['delta_base']}: "
+                  f"{len(delta['added'])} added, {len(delta['removed'])} removed, {len(delta['changed'])} changed")
         if software:
             print(f"  Sample: {', '.join(software[:10])}")
             if len(software) > 10:
                 print(f"  ... and {len(software) - 10} more")
+    
+    def print_timings(self, timings: Optional[Dict[str, float]]):
+        """Print per-section wall times."""
+        from colorama import Fore, Style
         
+        if timings:
+            print(f"\n{Fore.YELLOW}Check Timings:{Style.RESET_ALL}")
+            for section, elapsed in timings.items():
+                print(f"  {section}: {elapsed:.2f}s")
         print()
-
+    
+    def _print_partial(self, section: Dict[str, Any]) -> bool:
+        """Print a notice for a partial section. Returns True if it was partial."""
+        from colorama import Fore, Style
+        
+        if not section.get('partial'):
+            return False
+        print(f"  {Fore.YELLOW}[!] Incomplete: {section.get('error', 'unknown error')}{Style.RESET_ALL}")
+        return True
@@ -0,0 +1,223 @@
+"""
+Environment Snapshot
+Collects each host fact once, with its collection time, for the checker, problem solver and dev-info
+"""
+import platform
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import psutil
+
+from src.core.config import get_setting
+from src.core.cpu_sampler import get_cpu_sampler
+from src.core.result_cache import get_result_cache
+from src.checker.disk_usage import get_disk_usage_reader
+from src.checker.net_stats import get_connection_summary
+from src.checker.tool_probe import get_tool_prober
+
+Fact = namedtuple('Fact', 'value collected_at')
+
+def freeze(value: Any) -> Any:
+    """Read-only view of plain data: dicts become mapping proxies, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+def thaw(value: Any) -> Any:
+    """Plain, JSON-serializable copy of a frozen value."""
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple) and not hasattr(value, '_fields'):
+        return [thaw(item) for item in value]
+    return value
+
+class EnvironmentSnapshot:
+    """An immutable set of host facts, each stamped with when it was collected.
+
+    Values are frozen (mapping proxies, tuples, psutil named tuples); use
+    ``thaw`` for a mutable copy. Facts that failed to collect are absent and
+    their error is kept in ``errors``.
+    """
+
+    __slots__ = ('_facts', 'errors')
+
+    def __init__(self, facts: Dict[str, Fact], errors: Optional[Dict[str, str]] = None):
+        self._facts = MappingProxyType(dict(facts))
+        self.errors = MappingProxyType(dict(errors or {}))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._facts
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._facts:
+            raise KeyError(f"Fact '{name}' unavailable: {self.errors.get(name, 'not collected')}")
+        return self._facts[name].value
+
+    def get(self, name: str, default: Any = None) -> Any:
+        fact = self._facts.get(name)
+        return fact.value if fact is not None else default
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._facts)
+
+    def collected_at(self, name: str) -> Optional[float]:
+        """Unix time the fact was collected, or None if absent."""
+        fact = self._facts.get(name)
+        return fact.collected_at if fact is not None else None
+
+    def freshness(self) -> Dict[str, float]:
+        """Age in seconds of every fact."""
+        now = time.time()
+        return {name: round(now - fact.collected_at, 3) for name, fact in self._facts.items()}
+
+class SnapshotCollector:
+    """Collect facts through the shared result cache.
+
+    Each fact is cached for its own TTL and concurrent requests for the same
+    fact share one collection, so the checker sections, the problem solver
+    and dev-info asking at about the same time cost one psutil call or
+    subprocess per fact.
+    """
+
+    def __init__(self, os_name: str, disk_path: str = '/', logger=None):
+        self.os = os_name
+        self.disk_path = disk_path
+        self.logger = logger
+        self._collectors: Dict[str, Callable[[], Any]] = {
+            'hostname': platform.node,
+            'boot_time': psutil.boot_time,
+            'cpu': self._collect_cpu,
+            'memory': psutil.virtual_memory,
+            'swap': psutil.swap_memory,
+            'disk': lambda: psutil.disk_usage(self.disk_path),
+            'mounts': lambda: get_disk_usage_reader().read(),
+            'firewall': self._collect_firewall,
+            'net_interfaces': self._collect_net_interfaces,
+            'connections': get_connection_summary,
+            'dev_tools': lambda: get_tool_prober().probe(),
+        }
+
+    @property
+    def facts(self) -> List[str]:
+        return list(self._collectors)
+
+    def collect(self, facts: Optional[Iterable[str]] = None, refresh: bool = False) -> EnvironmentSnapshot:
+        """Snapshot of the named facts (all when None), reusing cached ones younger than their TTL."""
+        names = list(facts) if facts is not None else self.facts
+        unknown = [name for name in names if name not in self._collectors]
+        if unknown:
+            raise ValueError(f"Unknown fact(s): {', '.join(unknown)}")
+
+        collected = {}
+        errors = {}
+        cache = get_result_cache()
+        for name in names:
+            try:
+                value, age = cache.get_or_compute(
+                    ('fact', name),
+                    lambda name=name: freeze(self._collectors[name]()),
+                    ttl=fact_ttl(name),
+                    refresh=refresh,
+                )
+                collected[name] = Fact(value, time.time() - age)
+            except Exception as e:
+                errors[name] = str(e)
+                if self.logger:
+                    self.logger.warning(f"Could not collect {name}: {e}")
+        return EnvironmentSnapshot(collected, errors)
+
+    def invalidate(self, facts: Iterable[str]):
+        """Drop cached facts so the next collection reads the host again."""
+        cache = get_result_cache()
+        for name in facts:
+            cache.invalidate(('fact', name))
+
+    def freshness(self, facts: Optional[Iterable[str]] = None) -> Dict[str, Optional[float]]:
+        """Age of each cached fact without collecting anything; None if never collected."""
+        cache = get_result_cache()
+        ages = {}
+        for name in (facts if facts is not None else self.facts):
+            cached = cache.peek(('fact', name))
+            ages[name] = round(cached[1], 3) if cached is not None else None
+        return ages
+
+    def _collect_cpu(self) -> Dict[str, Any]:
+        # Read the background sampler when it is running (API server); otherwise
+        # fall back to a blocking one-second sample (CLI)
+        sampler = get_cpu_sampler()
+        if sampler.running and sampler.has_samples():
+            return {
+                'count': psutil.cpu_count(),
+                'percent': sampler.latest()['cpu_percent'],
+                'per_core': sampler.per_core_averages(window=1),
+                'load': sampler.averages(),
+            }
+        per_core = psutil.cpu_percent(interval=1, percpu=True)
+        percent = round(sum(per_core) / len(per_core), 1) if per_core else 0.0
+        return {
+            'count': psutil.cpu_count(),
+            'percent': percent,
+            'per_core': per_core,
+            'load': {'1s': percent, '10s': None, '60s': None},
+        }
+
+    def _collect_firewall(self) -> Optional[Dict[str, Any]]:
+        """Firewall state: ``enabled`` if any profile is on, ``all_enabled`` if every one is."""
+        if self.os == 'windows':
+            result = subprocess.run(
+                ['netsh', 'advfirewall', 'show', 'allprofiles', 'state'],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            states = [line.split()[-1].upper() for line in result.stdout.splitlines()
+                      if line.strip().upper().startswith('STATE')]
+        elif self.os == 'linux':
+            try:
+                result = subprocess.run(['ufw', 'status'], capture_output=True, text=True, timeout=10)
+            except FileNotFoundError:
+                return None
+            # "Status: active" / "Status: inactive"
+            states = ['ON' if line.split(':', 1)[1].strip().lower() == 'active' else 'OFF'
+                      for line in result.stdout.splitlines() if line.lower().startswith('status:')]
+        else:
+            return None
+        if not states:
+            return None
+        return {
+            'enabled': 'ON' in states,
+            'all_enabled': all(state == 'ON' for state in states),
+            'states': states,
+        }
+
+    @staticmethod
+    def _collect_net_interfaces() -> Dict[str, List[Dict[str, str]]]:
+        return {
+            interface: [{'family': str(addr.family), 'address': addr.address} for addr in addrs]
+            for interface, addrs in psutil.net_if_addrs().items()
+        }
+
+def fact_ttl(name: str) -> float:
+    """TTL for a cached fact, from performance.fact_ttl_seconds.<name>; 0 (always re-read) if unset."""
+    return float(get_setting(f'performance.fact_ttl_seconds.{name}', 0))
+
+_collectors: Dict[str, SnapshotCollector] = {}
+_collectors_lock = threading.Lock()
+
+def get_snapshot_collector(os_name: str, logger=None) -> SnapshotCollector:
+    """Return the process-wide collector for this platform."""
+    with _collectors_lock:
+        if os_name not in _collectors:
+            _collectors[os_name] = SnapshotCollector(
+                os_name,
+                disk_path=get_setting('performance.snapshot_disk_path', '/'),
+                logger=logger,
+            )
+        return _collectors[os_name]
@@ -0,0 +1,131 @@
+"""
+Connection Statistics
+Summarizes sockets from /proc/net without building a psutil object per connection
+"""
+import os
+import socket
+from collections import Counter
+from typing import Dict, Any
+
+import psutil
+
+PROC_NET_DIR = '/proc/net'
+
+# Kernel TCP state codes (include/net/tcp_states.h)
+TCP_STATES = {
+    '01': 'ESTABLISHED',
+    '02': 'SYN_SENT',
+    '03': 'SYN_RECV',
+    '04': 'FIN_WAIT1',
+    '05': 'FIN_WAIT2',
+    '06': 'TIME_WAIT',
+    '07': 'CLOSE',
+    '08': 'CLOSE_WAIT',
+    '09': 'LAST_ACK',
+    '0A': 'LISTEN',
+    '0B': 'CLOSING',
+    '0C': 'NEW_SYN_RECV',
+}
+
+TCP_LISTEN = '0A'
+UDP_UNCONNECTED = '07'
+
+def _read_table(path: str):
+    """Yield (local_port, state) for each row of a /proc/net socket table."""
+    with open(path, 'r') as f:
+        f.readline()  # Header
+        data = f.read()
+    for line in data.splitlines():
+        # "sl local_address rem_address st ..." - only the first four fields matter
+        fields = line.split(None, 4)
+        if len(fields) < 4:
+            continue
+        local = fields[1]
+        yield int(local[local.rindex(':') + 1:], 16), fields[3]
+
+def proc_net_available(proc_net_dir: str = PROC_NET_DIR) -> bool:
+    """Whether the /proc/net socket tables can be read on this host."""
+    return os.path.isfile(os.path.join(proc_net_dir, 'tcp'))
+
+def connection_summary(proc_net_dir: str = PROC_NET_DIR) -> Dict[str, Any]:
+    """Count sockets per TCP state and per listening port.
+
+    Reads tcp, tcp6, udp and udp6 in bulk. Tables that are missing (e.g. IPv6
+    disabled) are skipped.
+    """
+    tcp_states = Counter()
+    tcp_listening = Counter()
+    udp_total = 0
+    udp_bound = Counter()
+
+    for name in ('tcp', 'tcp6'):
+        try:
+            for port, state in _read_table(os.path.join(proc_net_dir, name)):
+                tcp_states[state] += 1
+                if state == TCP_LISTEN:
+                    tcp_listening[port] += 1
+        except OSError:
+            continue
+
+    for name in ('udp', 'udp6'):
+        try:
+            for port, state in _read_table(os.path.join(proc_net_dir, name)):
+                udp_total += 1
+                if state == UDP_UNCONNECTED:
+                    udp_bound[port] += 1
+        except OSError:
+            continue
+
+    tcp_total = sum(tcp_states.values())
+    return {
+        'total': tcp_total + udp_total,
+        'tcp': {
+            'total': tcp_total,
+            'states': {TCP_STATES.get(code, code): count for code, count in sorted(tcp_states.items())},
+            'listening_ports': dict(sorted(tcp_listening.items())),
+        },
+        'udp': {
+            'total': udp_total,
+            'bound_ports': dict(sorted(udp_bound.items())),
+        },
+        'source': 'procfs',
+    }
+
+def psutil_connection_summary() -> Dict[str, Any]:
+    """Same summary built from psutil.net_connections(), for platforms without /proc/net."""
+    tcp_states = Counter()
+    tcp_listening = Counter()
+    udp_total = 0
+    udp_bound = Counter()
+
+    for conn in psutil.net_connections(kind='inet'):
+        port = conn.laddr.port if conn.laddr else 0
+        if conn.type == socket.SOCK_STREAM:
+            tcp_states[conn.status] += 1
+            if conn.status == psutil.CONN_LISTEN:
+                tcp_listening[port] += 1
+        else:
+            udp_total += 1
+            if not conn.raddr:
+                udp_bound[port] += 1
+
+    tcp_total = sum(tcp_states.values())
+    return {
+        'total': tcp_total + udp_total,
+        'tcp': {
+            'total': tcp_total,
+            'states': dict(sorted(tcp_states.items())),
+            'listening_ports': dict(sorted(tcp_listening.items())),
+        },
+        'udp': {
+            'total': udp_total,
+            'bound_ports': dict(sorted(udp_bound.items())),
+        },
+        'source': 'psutil',
+    }
+
+def get_connection_summary() -> Dict[str, Any]:
+    """Connection summary from /proc/net when available, psutil otherwise."""
+    if proc_net_available():
+        return connection_summary()
+    return psutil_connection_summary()
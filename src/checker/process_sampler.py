@@ -0,0 +1,152 @@
+"""
+Process Sampler
+Top processes by memory or CPU from one pass over the process table, with CPU measured between samples
+"""
+import heapq
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import psutil
+
+from src.core.config import get_setting
+
+SORT_KEYS = ('memory', 'cpu')
+
+# (rss, cpu_percent or None, pid, process)
+_Record = Tuple[int, Optional[float], int, psutil.Process]
+
+class ProcessSampler:
+    """Rank processes by resident memory or by CPU use since the previous sample.
+
+    Each sample reads only CPU times, start time and memory for every
+    process, inside ``oneshot()`` so on Linux that is /proc/<pid>/stat plus
+    statm. Names and users are looked up only for the processes returned.
+    CPU percent is the change in a process's CPU time since the previous
+    sample (100 = one full core), keyed by pid and start time so a reused pid
+    isn't charged another process's time. The top N are picked with a heap,
+    not by sorting the whole table.
+
+    A sample younger than ``max_age`` seconds is reused, so several clients
+    polling every few seconds share one pass. The first CPU ranking has no
+    earlier sample to compare with, so it samples twice ``prime_seconds``
+    apart.
+    """
+
+    def __init__(self, max_age: float = 2.0, prime_seconds: float = 0.5):
+        self.max_age = max_age
+        self.prime_seconds = prime_seconds
+        self._records: List[_Record] = []
+        self._cpu_times: Dict[int, Tuple[float, float]] = {}  # pid -> (create_time, cpu seconds)
+        self._sampled_at: Optional[float] = None  # time.monotonic() of the last sample
+        self._interval: Optional[float] = None  # Seconds the last sample's CPU percents cover
+        self._denied = 0
+        self._cost_ms = 0.0
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """Read the process table once and compute CPU deltas against the previous read."""
+        start = time.perf_counter()
+        now = time.monotonic()
+        wall = time.time()
+        previous = self._cpu_times
+        since = now - self._sampled_at if self._sampled_at is not None else None
+        records: List[_Record] = []
+        cpu_times: Dict[int, Tuple[float, float]] = {}
+        denied = 0
+        for proc in psutil.process_iter():
+            try:
+                with proc.oneshot():
+                    times = proc.cpu_times()
+                    created = proc.create_time()
+                    rss = proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                continue
+            except psutil.AccessDenied:
+                denied += 1
+                continue
+
+            cpu = times.user + times.system
+            cpu_times[proc.pid] = (created, cpu)
+            percent = None
+            if since:
+                before = previous.get(proc.pid)
+                if before is not None and before[0] == created:
+                    percent = round(max(cpu - before[1], 0.0) / since * 100, 1)
+                elif created >= wall - since:
+                    # Started after the previous sample, so all its CPU time is new
+                    percent = round(cpu / since * 100, 1)
+            records.append((rss, percent, proc.pid, proc))
+
+        self._records = records
+        self._cpu_times = cpu_times
+        self._sampled_at = now
+        self._interval = since
+        self._denied = denied
+        self._cost_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    def top(self, n: int = 10, sort: str = 'memory', refresh: bool = False) -> Dict[str, Any]:
+        """The ``n`` processes using the most memory or CPU.
+
+        Returns ``processes`` (pid, name, username, rss_bytes, memory_percent,
+        cpu_percent), the ``process_count``, processes skipped as
+        ``access_denied``, the ``cpu_interval`` the CPU figures cover, the
+        sample's ``age`` and what it cost (``sample_ms``).
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort} (expected one of {', '.join(SORT_KEYS)})")
+        with self._lock:
+            if refresh or self._sampled_at is None or time.monotonic() - self._sampled_at > self.max_age:
+                self.sample()
+            if sort == 'cpu' and not self._interval:
+                time.sleep(self.prime_seconds)
+                self.sample()
+            records = self._records
+            result = {
+                'sort': sort,
+                'process_count': len(records),
+                'access_denied': self._denied,
+                'cpu_interval': round(self._interval, 3) if self._interval else None,
+                'age': round(time.monotonic() - self._sampled_at, 3),
+                'sample_ms': self._cost_ms,
+            }
+
+        if sort == 'memory':
+            winners = heapq.nlargest(n, records, key=lambda record: record[0])
+        else:
+            winners = heapq.nlargest(n, records, key=lambda record: record[1] or 0.0)
+        memory_total = psutil.virtual_memory().total
+        processes = []
+        for rss, percent, pid, proc in winners:
+            try:
+                with proc.oneshot():
+                    name = proc.name()
+                    username = proc.username()
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                continue
+            except psutil.AccessDenied:
+                name, username = None, None
+            processes.append({
+                'pid': pid,
+                'name': name,
+                'username': username,
+                'rss_bytes': rss,
+                'memory_percent': round(100.0 * rss / memory_total, 1) if memory_total else None,
+                'cpu_percent': percent,
+            })
+        result['processes'] = processes
+        return result
+
+_sampler: Optional[ProcessSampler] = None
+_sampler_lock = threading.Lock()
+
+def get_process_sampler() -> ProcessSampler:
+    """Return the process-wide sampler, configured from performance.process_sampler."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = ProcessSampler(
+                max_age=float(get_setting('performance.process_sampler.max_age_seconds', 2.0)),
+                prime_seconds=float(get_setting('performance.process_sampler.prime_seconds', 0.5)),
+            )
+        return _sampler
@@ -0,0 +1,152 @@
+"""
+Software Inventory Snapshots
+Persists installed-software lists under data/ and reports add/remove/version deltas
+"""
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from src.core.config import get_setting
+
+class SoftwareInventory:
+    """Store compact inventory snapshots and diff new inventories against them.
+
+    A snapshot is a gzip'd, sorted ``name<TAB>version`` listing named after a
+    hash of its content, so an unchanged inventory maps to the same id and is
+    never written twice. ``latest`` holds the id of the newest snapshot.
+    """
+
+    def __init__(self, snapshot_dir: str = 'data/inventory', keep_snapshots: int = 20):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.keep_snapshots = keep_snapshots
+        self._lock = threading.Lock()
+        # Small LRU of parsed snapshots; the current and delta base are usually all that's hit
+        self._loaded: 'OrderedDict[str, Dict[str, str]]' = OrderedDict()
+        self._max_loaded = 4
+
+    def record(self, packages: Dict[str, str], since: Optional[str] = None) -> Dict[str, Any]:
+        """Persist ``packages`` and return the snapshot id plus a delta.
+
+        Without ``since`` the delta is against the previous snapshot and the
+        full ``installed`` list is included. With a known ``since`` id only the
+        delta against that snapshot is returned.
+        """
+        with self._lock:
+            previous_id = self._read_latest()
+            snapshot_id = self._write(packages)
+
+            base_id = since or previous_id
+            base = self._load(base_id) if base_id else None
+
+            result = {
+                'snapshot_id': snapshot_id,
+                'previous_snapshot_id': previous_id,
+                'count': len(packages),
+                'delta_base': base_id if base is not None else None,
+                'delta': self.diff(base, packages) if base is not None else None,
+            }
+            if since is None or base is None:
+                result['installed'] = sorted(packages)
+            if since is not None and base is None:
+                result['since_unknown'] = True
+            return result
+
+    @staticmethod
+    def diff(old: Dict[str, str], new: Dict[str, str]) -> Dict[str, Any]:
+        """Added, removed and version-changed packages between two inventories."""
+        return {
+            'added': {name: new[name] for name in new.keys() - old.keys()},
+            'removed': sorted(old.keys() - new.keys()),
+            'changed': {
+                name: {'from': old[name], 'to': new[name]}
+                for name in new.keys() & old.keys()
+                if old[name] != new[name]
+            },
+        }
+
+    def _encode(self, packages: Dict[str, str]) -> bytes:
+        """Serialize an inventory as sorted tab-separated lines."""
+        lines = (f"{name}\t{packages[name] or ''}\n" for name in sorted(packages))
+        return ''.join(lines).encode('utf-8')
+
+    def _path(self, snapshot_id: str) -> Path:
+        return self.snapshot_dir / f"{snapshot_id}.tsv.gz"
+
+    def _write(self, packages: Dict[str, str]) -> str:
+        """Write a snapshot if it is new and point ``latest`` at it."""
+        content = self._encode(packages)
+        snapshot_id = hashlib.sha1(content).hexdigest()[:12]
+        self._remember(snapshot_id, dict(packages))
+
+        path = self._path(snapshot_id)
+        try:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            if not path.exists():
+                tmp = path.with_suffix('.tmp')
+                # mtime=0 keeps the compressed bytes deterministic
+                with gzip.GzipFile(tmp, 'wb', mtime=0) as f:
+                    f.write(content)
+                os.replace(tmp, path)
+                self._prune()
+            # Rewrite latest even when the snapshot exists, so it tracks reverts
+            latest_tmp = self.snapshot_dir / 'latest.tmp'
+            latest_tmp.write_text(snapshot_id)
+            os.replace(latest_tmp, self.snapshot_dir / 'latest')
+            # Touch so pruning keeps recently seen snapshots
+            os.utime(path)
+        except OSError:
+            # Persistence is best effort; the in-memory copy still serves deltas
+            pass
+        return snapshot_id
+
+    def _read_latest(self) -> Optional[str]:
+        try:
+            return (self.snapshot_dir / 'latest').read_text().strip() or None
+        except OSError:
+            return None
+
+    def _load(self, snapshot_id: str) -> Optional[Dict[str, str]]:
+        """Load a snapshot by id, or None if it doesn't exist."""
+        if snapshot_id in self._loaded:
+            self._loaded.move_to_end(snapshot_id)
+            return self._loaded[snapshot_id]
+        # Ids are hex digests; refuse anything else so it can't escape the directory
+        if not all(c in '0123456789abcdef' for c in snapshot_id):
+            return None
+        try:
+            with gzip.open(self._path(snapshot_id), 'rt', encoding='utf-8') as f:
+                packages = dict(line.rstrip('\n').split('\t', 1) for line in f if line.strip())
+        except OSError:
+            return None
+        self._remember(snapshot_id, packages)
+        return packages
+
+    def _remember(self, snapshot_id: str, packages: Dict[str, str]):
+        """Cache a parsed snapshot, evicting the least recently used."""
+        self._loaded[snapshot_id] = packages
+        self._loaded.move_to_end(snapshot_id)
+        while len(self._loaded) > self._max_loaded:
+            self._loaded.popitem(last=False)
+
+    def _prune(self):
+        """Keep only the newest ``keep_snapshots`` snapshot files."""
+        snapshots = sorted(self.snapshot_dir.glob('*.tsv.gz'), key=lambda p: p.stat().st_mtime, reverse=True)
+        for path in snapshots[self.keep_snapshots:]:
+            path.unlink(missing_ok=True)
+            self._loaded.pop(path.name.split('.')[0], None)
+
+_inventory: Optional[SoftwareInventory] = None
+
+def get_software_inventory() -> SoftwareInventory:
+    """Return the process-wide inventory configured from the inventory settings."""
+    global _inventory
+    if _inventory is None:
+        _inventory = SoftwareInventory(
+            snapshot_dir=get_setting('inventory.snapshot_dir', 'data/inventory'),
+            keep_snapshots=int(get_setting('inventory.keep_snapshots', 20)),
+        )
+    return _inventory
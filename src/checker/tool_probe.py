@@ -0,0 +1,149 @@
+"""
+Development Tool Probing
+Resolves tools on PATH and runs their version commands concurrently, caching versions by binary identity
+"""
+import asyncio
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from src.core.config import get_setting
+
+# Tool name -> arguments printing its version
+COMMON_TOOLS = {
+    'git': ['--version'],
+    'python': ['--version'],
+    'node': ['--version'],
+    'docker': ['--version'],
+    'java': ['-version'],
+}
+
+def run_coroutine_sync(coro):
+    """Run a coroutine to completion from synchronous code.
+
+    Uses asyncio.run() directly, or a helper thread when the caller is already
+    inside a running event loop (e.g. a FastAPI handler).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+class ToolProber:
+    """Probe development tool versions, exec'ing each binary only when it changes.
+
+    Versions are cached on disk keyed on (resolved path, size, mtime), so an
+    unchanged tool costs a PATH lookup and a stat() instead of a subprocess.
+    """
+
+    def __init__(self, cache_path: str = 'data/tool_versions.json', timeout: float = 5.0):
+        self.cache_path = Path(cache_path)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._cache: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def probe(self, tools: Dict[str, List[str]] = COMMON_TOOLS) -> Dict[str, Dict[str, Any]]:
+        """Return {'installed': bool, 'version': str|None, 'path': str|None} per tool."""
+        with self._lock:
+            cache = self._load_cache()
+            results = {}
+            pending = {}
+
+            for tool, args in tools.items():
+                path = shutil.which(tool)
+                if not path:
+                    results[tool] = {'installed': False, 'version': None, 'path': None}
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    results[tool] = {'installed': False, 'version': None, 'path': None}
+                    continue
+                identity = {'path': path, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+                cached = cache.get(tool)
+                if cached and all(cached.get(k) == v for k, v in identity.items()):
+                    results[tool] = {'installed': cached['installed'], 'version': cached['version'], 'path': path}
+                else:
+                    pending[tool] = (identity, args)
+
+            if pending:
+                probed = run_coroutine_sync(self._probe_all(pending))
+                for tool, (identity, _) in pending.items():
+                    installed, version = probed[tool]
+                    results[tool] = {'installed': installed, 'version': version, 'path': identity['path']}
+                    # Timeouts are not cached; a slow first start shouldn't stick
+                    if installed is not None:
+                        cache[tool] = dict(identity, installed=installed, version=version)
+                    else:
+                        results[tool]['installed'] = False
+                self._save_cache(cache)
+
+            # Preserve the caller's tool order
+            return {tool: results[tool] for tool in tools}
+
+    async def _probe_all(self, pending: Dict[str, Any]) -> Dict[str, Any]:
+        """Run all pending version commands concurrently."""
+        tools = list(pending)
+        outcomes = await asyncio.gather(
+            *(self._probe_one(identity['path'], args) for identity, args in pending.values())
+        )
+        return dict(zip(tools, outcomes))
+
+    async def _probe_one(self, path: str, args: List[str]):
+        """Run one version command. Returns (installed, version); installed is None on timeout."""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                path, *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError:
+            return False, None
+
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return None, None
+
+        if process.returncode != 0:
+            return False, None
+        # Some tools (java -version) print their version on stderr
+        output = stdout.decode(errors='replace').strip() or stderr.decode(errors='replace').strip()
+        return True, output.splitlines()[0] if output else None
+
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        if self._cache is None:
+            try:
+                with open(self.cache_path, 'r') as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError):
+                self._cache = {}
+        return self._cache
+
+    def _save_cache(self, cache: Dict[str, Dict[str, Any]]):
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(cache, f, indent=2)
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            # The in-memory cache still avoids re-probing for this process
+            pass
+
+_prober: Optional[ToolProber] = None
+
+def get_tool_prober() -> ToolProber:
+    """Return the process-wide tool prober."""
+    global _prober
+    if _prober is None:
+        _prober = ToolProber(cache_path=get_setting('performance.tool_cache_path', 'data/tool_versions.json'))
+    return _prober
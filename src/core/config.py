@@ -0,0 +1,31 @@
+"""
+Configuration Loading
+Reads the YAML configuration shared by the CLI, REST and MCP layers
+"""
+import yaml
+from pathlib import Path
+from typing import Dict, Any
+
+DEFAULT_CONFIG_PATH = 'config/default.yaml'
+
+_config_cache: Dict[str, Dict[str, Any]] = {}
+
+def load_config(config_path: str = DEFAULT_CONFIG_PATH) -> Dict[str, Any]:
+    """Load a configuration file once per process. Missing files yield {}."""
+    if config_path not in _config_cache:
+        config_file = Path(config_path)
+        config = {}
+        if config_file.exists():
+            with open(config_file, 'r') as f:
+                config = yaml.safe_load(f) or {}
+        _config_cache[config_path] = config
+    return _config_cache[config_path]
+
+def get_setting(path: str, default: Any = None, config_path: str = DEFAULT_CONFIG_PATH) -> Any:
+    """Look up a dotted setting such as 'performance.cpu_sampler.interval_seconds'."""
+    value: Any = load_config(config_path)
+    for key in path.split('.'):
+        if not isinstance(value, dict) or value.get(key) is None:
+            return default
+        value = value[key]
+    return value
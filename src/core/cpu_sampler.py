@@ -0,0 +1,139 @@
+"""
+Background CPU Sampler
+Keeps rolling CPU and per-core utilization so checks never block on cpu_percent(interval=1)
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+import psutil
+
+from src.core.config import get_setting
+
+class CPUSampler:
+    """Sample CPU utilization on a background thread into a fixed-size ring buffer.
+
+    Started with a ``source`` (the ResourceHistory recorder), it runs no
+    thread of its own and records the CPU figures of the source's samples.
+    """
+
+    WINDOWS = (1, 10, 60)  # Seconds reported by averages()
+
+    def __init__(self, interval: float = 1.0, retention_seconds: float = 60.0):
+        self.interval = interval
+        self.retention_seconds = retention_seconds
+        # One extra slot so the longest window is always fully covered
+        self._samples = deque(maxlen=int(retention_seconds / interval) + 1)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._source = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the sampling thread, or the source feeding this sampler, is alive."""
+        if self._source is not None:
+            return self._source.running
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, source=None):
+        """Start sampling, or take samples from ``source``. A no-op while running."""
+        if self._thread is not None or self._source is not None:
+            return
+        if source is not None:
+            self._source = source
+            self.interval = source.interval
+            with self._lock:
+                self._samples = deque(self._samples, maxlen=int(self.retention_seconds / self.interval) + 1)
+            source.add_feed(self.feed)
+            return
+        self._stop_event.clear()
+        # Prime psutil's counters so the first real sample covers one interval
+        psutil.cpu_percent(interval=None)
+        psutil.cpu_percent(interval=None, percpu=True)
+        self._thread = threading.Thread(target=self._run, name='cpu-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop sampling and wait for the thread to exit."""
+        if self._source is not None:
+            self._source.remove_feed(self.feed)
+            self._source = None
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self):
+        """Sampling loop."""
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """Take one sample and append it to the ring buffer."""
+        total = psutil.cpu_percent(interval=None)
+        per_core = psutil.cpu_percent(interval=None, percpu=True)
+        with self._lock:
+            self._samples.append((time.monotonic(), total, per_core))
+
+    def feed(self, timestamp: float, readings: Dict[str, Any]):
+        """Record the CPU figures of a source sample (see ResourceHistory.add_feed)."""
+        if readings.get('cpu_percent') is None:
+            return
+        with self._lock:
+            self._samples.append((time.monotonic(), readings['cpu_percent'], readings['per_core']))
+
+    def has_samples(self) -> bool:
+        """Whether at least one sample has been recorded."""
+        return bool(self._samples)
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Most recent sample, or None before the first one."""
+        with self._lock:
+            if not self._samples:
+                return None
+            timestamp, total, per_core = self._samples[-1]
+        return {
+            'cpu_percent': total,
+            'per_core': list(per_core),
+            'age_seconds': round(time.monotonic() - timestamp, 3),
+        }
+
+    def averages(self) -> Dict[str, Optional[float]]:
+        """Average total utilization over the last 1 s, 10 s and 60 s."""
+        with self._lock:
+            samples = list(self._samples)
+
+        now = time.monotonic()
+        averages = {}
+        for window in self.WINDOWS:
+            # Allow half an interval of jitter so a 1 s window always has a sample
+            values = [total for ts, total, _ in samples if now - ts <= window + self.interval / 2]
+            averages[f'{window}s'] = round(sum(values) / len(values), 1) if values else None
+        return averages
+
+    def per_core_averages(self, window: int = 10) -> List[float]:
+        """Per-core average utilization over the given window in seconds."""
+        with self._lock:
+            samples = list(self._samples)
+
+        now = time.monotonic()
+        recent = [cores for ts, _, cores in samples if now - ts <= window + self.interval / 2]
+        if not recent:
+            return []
+        return [round(sum(core) / len(recent), 1) for core in zip(*recent)]
+
+_sampler: Optional[CPUSampler] = None
+_sampler_lock = threading.Lock()
+
+def get_cpu_sampler() -> CPUSampler:
+    """Return the process-wide sampler, configured from performance.cpu_sampler."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = CPUSampler(
+                interval=float(get_setting('performance.cpu_sampler.interval_seconds', 1.0)),
+                retention_seconds=float(get_setting('performance.cpu_sampler.retention_seconds', 60.0)),
+            )
+        return _sampler
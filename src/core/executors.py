@@ -0,0 +1,40 @@
+"""
+Executor Lanes
+Bounded thread pools that keep blocking probes off the asyncio event loop
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict
+
+from src.core.config import get_setting
+
+# 'cheap' is for quick reads (status, cached results); 'expensive' for full
+# checks, diagnosis, fixes and installs. Sizes are in performance.executor_lanes.
+LANES = ('cheap', 'expensive')
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+def get_executor(lane: str) -> ThreadPoolExecutor:
+    """Return the executor for a lane, sized from performance.executor_lanes."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown executor lane: {lane}")
+    with _executors_lock:
+        if lane not in _executors:
+            workers = int(get_setting(f'performance.executor_lanes.{lane}', 2))
+            _executors[lane] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'lane-{lane}')
+        return _executors[lane]
+
+async def run_in_lane(lane: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking callable on a lane's executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(lane), partial(func, *args, **kwargs))
+
+def shutdown_executors(wait: bool = False):
+    """Shut down all lanes; they are recreated on next use."""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=wait, cancel_futures=True)
+        _executors.clear()
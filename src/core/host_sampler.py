@@ -0,0 +1,130 @@
+"""
+Background Host Sampler
+Keeps the latest memory, disk, network and connection figures so scrapes never probe the host
+"""
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import psutil
+
+from src.core.config import get_setting
+from src.checker.net_stats import get_connection_summary
+
+class HostSampler:
+    """Sample host gauges on a background thread and keep the latest set.
+
+    Started with a ``source`` (the ResourceHistory recorder), it runs no
+    thread of its own. Every ``interval`` seconds it takes memory, swap,
+    disk and network counters from the source's readings and probes only
+    what the source doesn't read (connections, load, boot time).
+    """
+
+    def __init__(self, interval: float = 5.0, disk_path: str = '/'):
+        self.interval = interval
+        self.disk_path = disk_path
+        self._latest: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._source = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the sampling thread, or the source feeding this sampler, is alive."""
+        if self._source is not None:
+            return self._source.running
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, source=None):
+        """Start sampling, or take readings from ``source``. A no-op while running."""
+        if self._thread is not None or self._source is not None:
+            return
+        if source is not None:
+            self._source = source
+            source.add_feed(self.feed)
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='host-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop sampling and wait for the thread to exit."""
+        if self._source is not None:
+            self._source.remove_feed(self.feed)
+            self._source = None
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self):
+        """Sampling loop; the first sample is taken immediately."""
+        while True:
+            self.sample()
+            if self._stop_event.wait(self.interval):
+                break
+
+    def feed(self, timestamp: float, readings: Dict[str, Any]):
+        """Sample from a source's readings once ``interval`` has passed (see ResourceHistory.add_feed)."""
+        with self._lock:
+            due = self._latest is None or timestamp - self._latest['timestamp'] >= self.interval - 0.01
+        if not due:
+            return
+        if self._source is not None and self._source.disk_path != self.disk_path:
+            readings = {name: value for name, value in readings.items() if name != 'disk'}
+        self.sample(readings, timestamp)
+
+    def sample(self, readings: Optional[Dict[str, Any]] = None, timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """Take one sample and make it the latest.
+
+        Groups present in ``readings`` (psutil results read by a source) are
+        used as they are. Each other group is probed independently; a group
+        that fails (e.g. a missing mount) is left out rather than dropping
+        the whole sample.
+        """
+        data: Dict[str, Any] = {'timestamp': timestamp if timestamp is not None else time.time()}
+        probes = {
+            'memory': lambda: psutil.virtual_memory()._asdict(),
+            'swap': lambda: psutil.swap_memory()._asdict(),
+            'disk': lambda: psutil.disk_usage(self.disk_path)._asdict(),
+            'net_io': lambda: psutil.net_io_counters()._asdict(),
+            'connections': get_connection_summary,
+            'load': os.getloadavg,
+            'boot_time': psutil.boot_time,
+        }
+        for name, reading in (readings or {}).items():
+            if name in probes:
+                probes[name] = reading._asdict
+        for name, probe in probes.items():
+            try:
+                data[name] = probe()
+            except (OSError, AttributeError, RuntimeError, psutil.Error):
+                continue
+        with self._lock:
+            self._latest = data
+        return data
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Most recent sample with its age, or None before the first one."""
+        with self._lock:
+            if self._latest is None:
+                return None
+            data = dict(self._latest)
+        data['age_seconds'] = round(time.time() - data['timestamp'], 3)
+        return data
+
+_sampler: Optional[HostSampler] = None
+_sampler_lock = threading.Lock()
+
+def get_host_sampler() -> HostSampler:
+    """Return the process-wide host sampler, configured from performance.host_sampler."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = HostSampler(
+                interval=float(get_setting('performance.host_sampler.interval_seconds', 5.0)),
+                disk_path=get_setting('performance.host_sampler.disk_path', '/'),
+            )
+        return _sampler
@@ -0,0 +1,213 @@
+"""
+Job Manager
+Runs long operations (setup, update, fix) in the background with per-job progress and logs
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.config import get_setting
+
+LOGGER_NAME = 'local_computer_assistant'
+
+class Job:
+    """A unit of background work and its observable state."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+    def __init__(self, kind: str, params: Optional[Dict[str, Any]] = None, max_log_lines: int = 500):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.status = self.QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.progress: Dict[str, Any] = {}
+        self.logs = deque(maxlen=max_log_lines)
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.cancel_event = threading.Event()
+        self.stopped_early = False
+        self.future = None
+
+    def set_progress(self, current: int, total: int, message: str = ''):
+        """Report progress; job bodies call this between steps."""
+        self.progress = {'current': current, 'total': total, 'message': message}
+
+    def cancelled(self) -> bool:
+        """Whether cancellation was requested."""
+        return self.cancel_event.is_set()
+
+    def should_stop(self) -> bool:
+        """Cancellation check for job bodies to poll between steps.
+
+        Once it has returned True the body is taken to have stopped early, and
+        the job ends as cancelled. A body that never saw the request (its last
+        step was already running) ends as succeeded.
+        """
+        if self.cancel_event.is_set():
+            self.stopped_early = True
+        return self.stopped_early
+
+    def log(self, message: str, level: str = 'INFO'):
+        self.logs.append(f"{datetime.now().strftime('%H:%M:%S')} {level} {message}")
+
+    def to_dict(self, include_logs: bool = True) -> Dict[str, Any]:
+        data = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'status': self.status,
+            'cancel_requested': self.cancelled(),
+            'created_at': datetime.fromtimestamp(self.created_at).isoformat(),
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            'finished_at': datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+            'progress': self.progress,
+            'result': self.result,
+            'error': self.error,
+        }
+        if include_logs:
+            data['logs'] = list(self.logs)
+        return data
+
+class _JobLogHandler(logging.Handler):
+    """Copy log records emitted on a job's worker thread into that job's log."""
+
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self.jobs_by_thread: Dict[int, Job] = {}
+
+    def emit(self, record: logging.LogRecord):
+        job = self.jobs_by_thread.get(record.thread)
+        if job is not None:
+            # Console formatters colorize record.levelname in place; use the raw level
+            job.log(record.getMessage(), logging.getLevelName(record.levelno))
+
+class JobManager:
+    """Submit, track, cancel and list background jobs."""
+
+    def __init__(self, max_workers: int = 2, history: int = 100):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._history = history
+        self._log_handler = _JobLogHandler()
+
+    def submit(self, kind: str, func: Callable[[Job], Any], params: Optional[Dict[str, Any]] = None) -> Job:
+        """Queue ``func(job)`` and return the job immediately."""
+        job = Job(kind, params)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(self._run, job, func)
+        return job
+
+    def _run(self, job: Job, func: Callable[[Job], Any]):
+        if job.cancelled():
+            job.status = Job.CANCELLED
+            job.finished_at = time.time()
+            return
+        self._attach_log_handler()
+        job.status = Job.RUNNING
+        job.started_at = time.time()
+        self._log_handler.jobs_by_thread[threading.get_ident()] = job
+        try:
+            job.result = func(job)
+            job.status = Job.CANCELLED if job.stopped_early else Job.SUCCEEDED
+        except Exception as e:
+            job.error = str(e)
+            job.status = Job.FAILED
+            job.log(f"Job failed: {e}", 'ERROR')
+        finally:
+            self._log_handler.jobs_by_thread.pop(threading.get_ident(), None)
+            job.finished_at = time.time()
+
+    def _attach_log_handler(self):
+        # setup_logger() clears handlers, so re-attach if it was called since
+        logger = logging.getLogger(LOGGER_NAME)
+        if self._log_handler not in logger.handlers:
+            logger.addHandler(self._log_handler)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a job. Queued jobs never start; running jobs stop at their next step."""
+        job = self._jobs.get(job_id)
+        if job is None or job.status in Job.FINISHED:
+            return job
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            job.status = Job.CANCELLED
+            job.finished_at = time.time()
+        return job
+
+    def list_jobs(self, status: Optional[str] = None) -> List[Job]:
+        """Jobs newest first, optionally filtered by status."""
+        with self._lock:
+            jobs = list(reversed(self._jobs.values()))
+        return [job for job in jobs if status is None or job.status == status]
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond the history limit."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in Job.FINISHED]
+        for job_id in finished[:max(len(self._jobs) - self._history, 0)]:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        """Cancel queued jobs and stop accepting new work."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+def inherit_job(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap ``func`` so that, run on another thread, its log lines still go to the calling job.
+
+    Returns ``func`` unchanged when the caller isn't running inside a job.
+    """
+    manager = _manager
+    handler = manager._log_handler if manager is not None else None
+    job = handler.jobs_by_thread.get(threading.get_ident()) if handler is not None else None
+    if job is None:
+        return func
+
+    def run(*args, **kwargs):
+        ident = threading.get_ident()
+        handler.jobs_by_thread[ident] = job
+        try:
+            return func(*args, **kwargs)
+        finally:
+            handler.jobs_by_thread.pop(ident, None)
+    return run
+
+def shutdown_job_manager():
+    """Shut down the process-wide job manager; a new one is created on next use."""
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.shutdown()
+            _manager = None
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide job manager, sized from performance.job_workers."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(
+                max_workers=int(get_setting('performance.job_workers', 2)),
+                history=int(get_setting('performance.job_history', 100)),
+            )
+        return _manager
@@ -0,0 +1,419 @@
+"""
+Metric Store
+Memory-mapped, fixed-record columnar files for resource samples: one file per day and resolution
+"""
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.core.config import get_setting
+
+MAGIC = b'CAMETRIC'
+VERSION = 1
+DAY = 86400
+# The header gets a full page so every column starts page-aligned
+HEADER_SIZE = 4096
+# magic, version, resolution (s), day start (Unix s, UTC midnight), slots per column
+_HEADER = struct.Struct('<8sHIqI')
+
+RAW_FIELDS = ('value',)
+ROLLUP_FIELDS = ('min', 'max', 'avg')
+
+NAN = float('nan')
+
+class MetricFile:
+    """One UTC day of samples at one resolution.
+
+    Layout: a header page (struct + JSON listing metrics and fields), then one
+    native-endian float64 column of ``slots`` values per (metric, field), in
+    that order. Slot ``i`` holds the sample for ``day_start + i * resolution``;
+    NaN means no sample. The size is fixed at creation, so appends are
+    in-place writes and reads are slices of the mapping.
+    """
+
+    def __init__(self, path: str, mapping: mmap.mmap, resolution: int, day_start: int,
+                 slots: int, metrics: List[str], fields: List[str]):
+        self.path = path
+        self.resolution = resolution
+        self.day_start = day_start
+        self.slots = slots
+        self.metrics = metrics
+        self.fields = fields
+        self._mmap = mapping
+        # Managed by MetricStore: queries holding this file, and whether it left the LRU
+        self.users = 0
+        self.retired = False
+        self._offsets = {}
+        index = 0
+        for metric in metrics:
+            for field in fields:
+                self._offsets[(metric, field)] = HEADER_SIZE + index * slots * 8
+                index += 1
+
+    @staticmethod
+    def write_file(path: str, resolution: int, day_start: int, metrics: Sequence[str],
+                   fields: Sequence[str], columns: Optional[Dict[Tuple[str, str], array]] = None):
+        """Write a complete file atomically; columns not given are filled with NaN."""
+        slots = DAY // resolution
+        meta = json.dumps({'metrics': list(metrics), 'fields': list(fields), 'byteorder': sys.byteorder})
+        header = _HEADER.pack(MAGIC, VERSION, resolution, day_start, slots) + meta.encode()
+        if len(header) > HEADER_SIZE:
+            raise ValueError("Too many metrics for one metric file header")
+
+        empty = array('d', [NAN]) * slots
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(header.ljust(HEADER_SIZE, b'\0'))
+            for metric in metrics:
+                for field in fields:
+                    f.write((columns or {}).get((metric, field), empty).tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def open(cls, path: str, writable: bool = False) -> 'MetricFile':
+        with open(path, 'r+b' if writable else 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        try:
+            magic, version, resolution, day_start, slots = _HEADER.unpack_from(mapping, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not a metric file: {path}")
+            meta_end = mapping.find(b'\0', _HEADER.size, HEADER_SIZE)
+            meta = json.loads(mapping[_HEADER.size:meta_end if meta_end != -1 else HEADER_SIZE])
+            if meta.get('byteorder') != sys.byteorder:
+                raise ValueError(f"Metric file written on a {meta.get('byteorder')}-endian host: {path}")
+            expected = HEADER_SIZE + len(meta['metrics']) * len(meta['fields']) * slots * 8
+            if len(mapping) < expected:
+                raise ValueError(f"Truncated metric file: {path}")
+        except Exception:
+            mapping.close()
+            raise
+        return cls(path, mapping, resolution, day_start, slots, meta['metrics'], meta['fields'])
+
+    def column(self, metric: str, field: str = 'value') -> Optional[memoryview]:
+        """Zero-copy float64 view of one column, or None if the file lacks it.
+
+        The mapping can't be closed while a view exists; release() it when done.
+        """
+        offset = self._offsets.get((metric, field))
+        if offset is None:
+            return None
+        return memoryview(self._mmap)[offset:offset + self.slots * 8].cast('d')
+
+    def write(self, slot: int, values: Dict[str, Optional[float]], field: str = 'value'):
+        """Store one sample per metric at ``slot``; metrics the file lacks are ignored."""
+        for metric, value in values.items():
+            offset = self._offsets.get((metric, field))
+            if offset is not None and value is not None:
+                struct.pack_into('d', self._mmap, offset + slot * 8, value)
+
+    def flush(self):
+        self._mmap.flush()
+
+    def close(self):
+        """Unmap the file. Raises BufferError if a column view is still held."""
+        self._mmap.close()
+
+class MetricStore:
+    """Persist resource samples across restarts, with rollups for long retention.
+
+    Raw samples go to ``<root>/<resolution>s/YYYY-MM-DD.bin``. Once a UTC day
+    is complete, compaction rolls it up into each coarser resolution (min, max
+    and avg per bucket) and deletes files past their retention. Nothing is
+    loaded at startup; files are mapped on demand, so resident memory is
+    only the pages being touched.
+    """
+
+    def __init__(self, root: str = 'data/metrics', metrics: Sequence[str] = (),
+                 resolution: int = 1, raw_retention_days: float = 3,
+                 rollups: Iterable[Tuple[int, float]] = ((60, 35), (3600, 400)),
+                 max_open_files: int = 8):
+        self.root = root
+        self.metrics = list(metrics)
+        self.resolution = int(resolution)
+        self.raw_retention_days = raw_retention_days
+        self.rollups = sorted((int(res), days) for res, days in rollups)
+        for res in [self.resolution] + [res for res, _ in self.rollups]:
+            if res <= 0 or DAY % res or res % self.resolution:
+                raise ValueError(f"Resolution {res}s must divide a day and be a multiple of {self.resolution}s")
+        self.max_open_files = max_open_files
+        self._writer: Optional[MetricFile] = None
+        self._readers: 'OrderedDict[str, MetricFile]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+
+    @property
+    def retention_seconds(self) -> float:
+        """Longest retention across raw data and rollups."""
+        return max([self.raw_retention_days] + [days for _, days in self.rollups]) * DAY
+
+    def path(self, resolution: int, day_start: int) -> str:
+        day = datetime.fromtimestamp(day_start, tz=timezone.utc).strftime('%Y-%m-%d')
+        return os.path.join(self.root, f'{resolution}s', f'{day}.bin')
+
+    def append(self, timestamp: float, values: Dict[str, Optional[float]]):
+        """Write one raw sample in place into the current day's file."""
+        day_start = int(timestamp // DAY) * DAY
+        with self._lock:
+            if self._writer is None or self._writer.day_start != day_start:
+                self._open_writer(day_start)
+                # First write after startup or a new day: roll up what is complete
+                self.compact_in_background()
+            slot = int((timestamp - day_start) // self.resolution)
+            self._writer.write(min(slot, self._writer.slots - 1), values)
+
+    def _open_writer(self, day_start: int):
+        if self._writer is not None:
+            self._writer.flush()
+            self._writer.close()
+            self._writer = None
+        path = self.path(self.resolution, day_start)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            MetricFile.write_file(path, self.resolution, day_start, self.metrics, RAW_FIELDS)
+        self._writer = MetricFile.open(path, writable=True)
+
+    def close(self):
+        """Flush the writer and unmap every open file."""
+        with self._lock:
+            if self._writer is not None:
+                self._writer.flush()
+                self._writer.close()
+                self._writer = None
+            for reader in self._readers.values():
+                self._retire(reader)
+            self._readers.clear()
+
+    def _acquire(self, path: str) -> Optional[MetricFile]:
+        """Read-only mapping of a file from a small LRU of open files, held until _release().
+
+        A file evicted or forgotten while held is closed by the last _release().
+        """
+        with self._lock:
+            reader = self._readers.get(path)
+            if reader is not None:
+                self._readers.move_to_end(path)
+                reader.users += 1
+                return reader
+        if not os.path.exists(path):
+            return None
+        try:
+            opened = MetricFile.open(path)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            reader = self._readers.get(path)
+            if reader is None:
+                reader = self._readers[path] = opened
+            else:
+                # Another query opened it meanwhile
+                self._readers.move_to_end(path)
+                opened.close()
+            reader.users += 1
+            while len(self._readers) > self.max_open_files:
+                self._retire(self._readers.popitem(last=False)[1])
+        return reader
+
+    def _release(self, reader: MetricFile):
+        with self._lock:
+            reader.users -= 1
+            if reader.retired and not reader.users:
+                reader.close()
+
+    @staticmethod
+    def _retire(reader: MetricFile):
+        """Close a reader that left the LRU now, or when its last user releases it. Needs _lock."""
+        reader.retired = True
+        if not reader.users:
+            reader.close()
+
+    def _forget(self, path: str):
+        with self._lock:
+            reader = self._readers.pop(path, None)
+            if reader is not None:
+                self._retire(reader)
+
+    def _day_file(self, day_start: int, step: float) -> Optional[MetricFile]:
+        """Coarsest file for a day that is still at least as fine as ``step``, else the finest one.
+
+        The file is acquired; the caller must _release() it.
+        """
+        resolutions = [self.resolution] + [res for res, _ in self.rollups]
+        fitting = [res for res in resolutions if res <= step]
+        order = sorted(fitting, reverse=True) + sorted(res for res in resolutions if res > step)
+        for res in order:
+            reader = self._acquire(self.path(res, day_start))
+            if reader is not None:
+                return reader
+        return None
+
+    def query(self, metric: str, start: float, end: float, step: float) -> List[Dict[str, Any]]:
+        """Min/max/avg per ``step`` bucket between ``start`` and ``end``, like ResourceHistory.query.
+
+        Each day is read from the coarsest stored resolution no coarser than
+        ``step``, through zero-copy views of the mapping. For rollups the
+        bucket average is the mean of the stored averages.
+        """
+        if metric not in self.metrics:
+            raise ValueError(f"Unknown metric '{metric}'. Available: {', '.join(self.metrics)}")
+
+        points: List[Dict[str, Any]] = []
+        bucket_start = None
+        bucket_end = -math.inf
+        low = high = total = 0.0
+        n = 0
+        day_start = int(start // DAY) * DAY
+        while day_start <= end:
+            reader = self._day_file(day_start, step)
+            if reader is not None:
+                views = []
+                try:
+                    if metric in reader.metrics:
+                        res = reader.resolution
+                        if reader.fields == list(RAW_FIELDS):
+                            views = [reader.column(metric)]
+                            mins = maxs = avgs = views[0]
+                        else:
+                            views = [reader.column(metric, field) for field in ROLLUP_FIELDS]
+                            mins, maxs, avgs = views
+                        first = max(math.ceil((start - day_start) / res), 0)
+                        last = min(math.floor((end - day_start) / res) + 1, reader.slots)
+                        for i in range(first, last):
+                            avg = avgs[i]
+                            if avg != avg:  # NaN: no sample
+                                continue
+                            t = day_start + i * res
+                            if t >= bucket_end:
+                                if n:
+                                    points.append({'t': bucket_start, 'min': low, 'max': high,
+                                                   'avg': round(total / n, 3)})
+                                bucket_start = math.floor(t / step) * step
+                                bucket_end = bucket_start + step
+                                low, high, total, n = mins[i], maxs[i], 0.0, 0
+                            if mins[i] < low:
+                                low = mins[i]
+                            if maxs[i] > high:
+                                high = maxs[i]
+                            total += avg
+                            n += 1
+                finally:
+                    # Views pin the mapping; drop them before the file may be closed
+                    for view in views:
+                        view.release()
+                    mins = maxs = avgs = None
+                    self._release(reader)
+            day_start += DAY
+        if n:
+            points.append({'t': bucket_start, 'min': low, 'max': high, 'avg': round(total / n, 3)})
+        return points
+
+    def compact_in_background(self):
+        threading.Thread(target=self.compact, name='metric-compaction', daemon=True).start()
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Roll up completed raw days and delete files past retention.
+
+        Safe to call repeatedly; a rollup that already exists is left alone.
+        Returns counts of rollups written and files removed.
+        """
+        if not self._compact_lock.acquire(blocking=False):
+            return {'rolled_up': 0, 'removed': 0}
+        try:
+            now = time.time() if now is None else now
+            today = int(now // DAY) * DAY
+            rolled_up = removed = 0
+
+            for day_start in self._days(self.resolution):
+                if day_start >= today:
+                    continue
+                for res, _ in self.rollups:
+                    if not os.path.exists(self.path(res, day_start)):
+                        self._roll_up(day_start, res)
+                        rolled_up += 1
+
+            for res, days in [(self.resolution, self.raw_retention_days)] + self.rollups:
+                for day_start in self._days(res):
+                    if day_start + DAY <= now - days * DAY:
+                        path = self.path(res, day_start)
+                        self._forget(path)
+                        try:
+                            os.remove(path)
+                            removed += 1
+                        except OSError:
+                            continue
+            return {'rolled_up': rolled_up, 'removed': removed}
+        finally:
+            self._compact_lock.release()
+
+    def _days(self, resolution: int) -> List[int]:
+        """Day starts with a file at this resolution, oldest first."""
+        directory = os.path.join(self.root, f'{resolution}s')
+        days = []
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return days
+        for name in names:
+            if not name.endswith('.bin'):
+                continue
+            try:
+                day = datetime.strptime(name[:-4], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            except ValueError:
+                continue
+            days.append(int(day.timestamp()))
+        return sorted(days)
+
+    def _roll_up(self, day_start: int, resolution: int):
+        source = MetricFile.open(self.path(self.resolution, day_start))
+        try:
+            factor = resolution // source.resolution
+            slots = DAY // resolution
+            columns = {}
+            for metric in source.metrics:
+                mins = array('d', [NAN]) * slots
+                maxs = array('d', [NAN]) * slots
+                avgs = array('d', [NAN]) * slots
+                with source.column(metric) as values:
+                    for bucket in range(slots):
+                        present = [v for v in values[bucket * factor:(bucket + 1) * factor] if v == v]
+                        if present:
+                            mins[bucket] = min(present)
+                            maxs[bucket] = max(present)
+                            avgs[bucket] = sum(present) / len(present)
+                columns[(metric, 'min')] = mins
+                columns[(metric, 'max')] = maxs
+                columns[(metric, 'avg')] = avgs
+            path = self.path(resolution, day_start)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            MetricFile.write_file(path, resolution, day_start, source.metrics, ROLLUP_FIELDS, columns)
+        finally:
+            source.close()
+
+_store: Optional[MetricStore] = None
+_store_lock = threading.Lock()
+
+def get_metric_store(metrics: Sequence[str]) -> Optional[MetricStore]:
+    """Return the process-wide store from performance.metric_store, or None when disabled."""
+    global _store
+    with _store_lock:
+        if _store is None and get_setting('performance.metric_store.enabled', True):
+            rollups = get_setting('performance.metric_store.rollups', None) or [
+                {'resolution_seconds': 60, 'retention_days': 35},
+                {'resolution_seconds': 3600, 'retention_days': 400},
+            ]
+            _store = MetricStore(
+                root=get_setting('performance.metric_store.path', 'data/metrics'),
+                metrics=metrics,
+                resolution=int(get_setting('performance.metric_store.resolution_seconds', 1)),
+                raw_retention_days=float(get_setting('performance.metric_store.raw_retention_days', 3)),
+                rollups=[(r['resolution_seconds'], r['retention_days']) for r in rollups],
+            )
+        return _store
@@ -0,0 +1,300 @@
+"""
+Metrics
+Assistant counters and histograms, and the OpenMetrics text exposition served at /metrics
+"""
+import bisect
+import os
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# Upper bounds in seconds; covers cached reads (ms) through full checks (tens of s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names: Iterable[str], values: Iterable[Any], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self, lines: List[str]):
+        with self._lock:
+            values = sorted(self._values.items())
+        lines.append(f'# TYPE {self.name} counter')
+        lines.append(f'# HELP {self.name} {self.help_text}')
+        for key, value in values:
+            lines.append(f'{self.name}_total{_labels(self.label_names, key)} {_number(value)}')
+
+class Histogram:
+    """Cumulative-bucket histogram with labels."""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self, lines: List[str]):
+        with self._lock:
+            series = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        lines.append(f'# TYPE {self.name} histogram')
+        lines.append(f'# UNIT {self.name} seconds')
+        lines.append(f'# HELP {self.name} {self.help_text}')
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = ('le', _number(bound))
+                lines.append(f'{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, key)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, key)} {_number(total)}')
+
+class Gauges:
+    """A metric family read from elsewhere at render time.
+
+    ``counter=True`` exposes values that only grow (e.g. kernel byte counts)
+    as a counter rather than a gauge.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                 unit: Optional[str] = None, counter: bool = False):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.unit = unit
+        self.counter = counter
+        self.samples: List[Tuple[Tuple[Any, ...], float]] = []
+
+    def add(self, value: Optional[float], *label_values):
+        if value is not None:
+            self.samples.append((label_values, value))
+        return self
+
+    def render(self, lines: List[str]):
+        if not self.samples:
+            return
+        lines.append(f'# TYPE {self.name} {"counter" if self.counter else "gauge"}')
+        if self.unit:
+            lines.append(f'# UNIT {self.name} {self.unit}')
+        lines.append(f'# HELP {self.name} {self.help_text}')
+        sample_name = f'{self.name}_total' if self.counter else self.name
+        for label_values, value in self.samples:
+            lines.append(f'{sample_name}{_labels(self.label_names, label_values)} {_number(value)}')
+
+class MetricsRegistry:
+    """The assistant's own instrumentation."""
+
+    def __init__(self):
+        self.request_duration = Histogram(
+            'compassist_http_request_duration_seconds',
+            'HTTP request latency until response headers are sent.',
+            ('method', 'route', 'status'),
+        )
+        self.mcp_duration = Histogram(
+            'compassist_mcp_request_duration_seconds',
+            'MCP JSON-RPC method latency.',
+            ('method',),
+        )
+        self.check_duration = Histogram(
+            'compassist_check_section_duration_seconds',
+            'Wall time of computed (not cached) environment check sections.',
+            ('section',),
+        )
+        self.subprocesses = Counter(
+            'compassist_subprocesses',
+            'Subprocesses started by the assistant, by program.',
+            ('program',),
+        )
+
+    def render(self) -> str:
+        """OpenMetrics text for assistant, cache, job and host metrics.
+
+        Host figures come from the background samplers only; nothing here
+        touches psutil or spawns a process, so a scrape is always cheap.
+        """
+        lines: List[str] = []
+        for metric in (self.request_duration, self.mcp_duration, self.check_duration, self.subprocesses):
+            metric.render(lines)
+        for family in _cache_gauges() + _job_gauges() + _issue_gauges() + _host_gauges():
+            family.render(lines)
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+def _cache_gauges() -> List[Gauges]:
+    from src.core.result_cache import get_result_cache
+    stats = get_result_cache().stats()
+    lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+    served = stats['hits'] + stats['coalesced']
+    return [
+        Gauges('compassist_result_cache_lookups', 'Result cache lookups by outcome.', ('outcome',), counter=True)
+        .add(stats['hits'], 'hit').add(stats['misses'], 'miss').add(stats['coalesced'], 'coalesced'),
+        Gauges('compassist_result_cache_hit_ratio',
+               'Share of lookups served without a new computation (hits and coalesced waits).')
+        .add(round(served / lookups, 4) if lookups else None),
+        Gauges('compassist_result_cache_entries', 'Entries held in the result cache.').add(stats['entries']),
+    ]
+
+def _job_gauges() -> List[Gauges]:
+    from src.core.jobs import Job, get_job_manager
+    jobs = get_job_manager().list_jobs()
+    family = Gauges('compassist_jobs', 'Background jobs by status.', ('status',))
+    for status in (Job.QUEUED, Job.RUNNING) + Job.FINISHED:
+        family.add(sum(1 for job in jobs if job.status == status), status)
+    return [family]
+
+def _issue_gauges() -> List[Gauges]:
+    """Issues from the last cached diagnosis; absent until /diagnose has run."""
+    from src.core.result_cache import get_result_cache
+    cached = get_result_cache().peek('diagnose')
+    if cached is None:
+        return []
+    diagnosis, age = cached
+    counts: Dict[Tuple[str, str], int] = {}
+    for issue in diagnosis.issues:
+        key = (issue.get('category', 'unknown'), issue.get('severity', 'unknown'))
+        counts[key] = counts.get(key, 0) + 1
+    family = Gauges('compassist_issues', 'Issues found by the last diagnosis.', ('category', 'severity'))
+    for (category, severity), count in sorted(counts.items()):
+        family.add(count, category, severity)
+    return [
+        family,
+        Gauges('compassist_diagnosis_age_seconds', 'Age of the last diagnosis.', unit='seconds').add(round(age, 3)),
+    ]
+
+def _host_gauges() -> List[Gauges]:
+    from src.core.cpu_sampler import get_cpu_sampler
+    from src.core.host_sampler import get_host_sampler
+    families: List[Gauges] = []
+
+    cpu_sampler = get_cpu_sampler()
+    latest_cpu = cpu_sampler.latest() if cpu_sampler.running else None
+    if latest_cpu is not None:
+        cpu = Gauges('compassist_host_cpu_utilization_percent', 'CPU utilization averaged over a window.', ('window',))
+        for window, value in cpu_sampler.averages().items():
+            cpu.add(value, window)
+        per_core = Gauges('compassist_host_cpu_core_utilization_percent',
+                          'Per-core CPU utilization in the latest sample.', ('core',))
+        for core, value in enumerate(latest_cpu['per_core']):
+            per_core.add(value, core)
+        families += [cpu, per_core]
+
+    host_sampler = get_host_sampler()
+    host = host_sampler.latest() if host_sampler.running else None
+    if host is None:
+        return families
+
+    families.append(Gauges('compassist_host_sample_age_seconds', 'Age of the latest host sample.',
+                           unit='seconds').add(host['age_seconds']))
+    if 'memory' in host:
+        memory = Gauges('compassist_host_memory_bytes', 'Physical memory.', ('state',), unit='bytes')
+        for state in ('total', 'available', 'used'):
+            memory.add(host['memory'].get(state), state)
+        families += [memory, Gauges('compassist_host_memory_used_percent', 'Physical memory in use.')
+                     .add(host['memory'].get('percent'))]
+    if 'swap' in host:
+        swap = Gauges('compassist_host_swap_bytes', 'Swap space.', ('state',), unit='bytes')
+        for state in ('total', 'used', 'free'):
+            swap.add(host['swap'].get(state), state)
+        families.append(swap)
+    if 'disk' in host:
+        disk = Gauges('compassist_host_disk_bytes', 'Disk space on the sampled mount.', ('mount', 'state'), unit='bytes')
+        for state in ('total', 'used', 'free'):
+            disk.add(host['disk'].get(state), host_sampler.disk_path, state)
+        families += [disk, Gauges('compassist_host_disk_used_percent', 'Disk space in use.', ('mount',))
+                     .add(host['disk'].get('percent'), host_sampler.disk_path)]
+    if 'net_io' in host:
+        net = Gauges('compassist_host_network_bytes', 'Network bytes since boot.', ('direction',),
+                     unit='bytes', counter=True)
+        net.add(host['net_io'].get('bytes_sent'), 'sent').add(host['net_io'].get('bytes_recv'), 'received')
+        errors = Gauges('compassist_host_network_errors', 'Network errors and drops since boot.', ('kind',),
+                        counter=True)
+        for kind in ('errin', 'errout', 'dropin', 'dropout'):
+            errors.add(host['net_io'].get(kind), kind)
+        families += [net, errors]
+    if 'connections' in host:
+        summary = host['connections']
+        tcp = Gauges('compassist_host_tcp_connections', 'TCP sockets by state.', ('state',))
+        for state, count in summary['tcp']['states'].items():
+            tcp.add(count, state)
+        families += [tcp, Gauges('compassist_host_udp_sockets', 'UDP sockets.').add(summary['udp']['total'])]
+    if 'load' in host:
+        load = Gauges('compassist_host_load_average', 'System load average.', ('window',))
+        for window, value in zip(('1m', '5m', '15m'), host['load']):
+            load.add(value, window)
+        families.append(load)
+    if 'boot_time' in host:
+        families.append(Gauges('compassist_host_boot_time_seconds', 'Boot time as a Unix timestamp.',
+                               unit='seconds').add(host['boot_time']))
+    return families
+
+def _audit_subprocess(event: str, args: Tuple[Any, ...]):
+    """Audit hook counting subprocess launches, including asyncio and os.system ones."""
+    # Exceptions raised here would abort the launch being audited
+    try:
+        if event == 'subprocess.Popen':
+            executable, argv = args[0], args[1]
+            if not executable:
+                if isinstance(argv, (list, tuple)):
+                    executable = argv[0] if argv else ''
+                else:
+                    executable = str(argv).split()[0] if str(argv).strip() else ''
+            _metrics.subprocesses.inc(program=os.path.basename(os.fsdecode(executable)))
+        elif event == 'os.system':
+            _metrics.subprocesses.inc(program='os.system')
+    except Exception:
+        pass
+
+_metrics = MetricsRegistry()
+_audit_installed = False
+_audit_lock = threading.Lock()
+
+def install_subprocess_counter():
+    """Count subprocesses via a sys audit hook. Hooks can't be removed, so this installs once."""
+    global _audit_installed
+    with _audit_lock:
+        if not _audit_installed:
+            sys.addaudithook(_audit_subprocess)
+            _audit_installed = True
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide metrics registry."""
+    return _metrics
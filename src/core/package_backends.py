@@ -0,0 +1,72 @@
+"""
+Package Backend Discovery
+Resolves which package managers exist on this host once per process, via PATH lookup only
+"""
+import os
+import shutil
+import threading
+from typing import Dict, Optional, Tuple
+
+# Every package manager any component may ask about
+KNOWN_BACKENDS = ('dpkg', 'rpm', 'apt', 'yum', 'dnf', 'winget', 'choco')
+
+# Installer preference order, matching what SetupManager has always tried
+LINUX_INSTALLERS = ('apt', 'yum', 'dnf')
+WINDOWS_INSTALLERS = ('winget', 'choco')
+
+def _mtime(path: str) -> int:
+    """mtime of a path, or 0 if it cannot be stat'ed."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+class PackageBackends:
+    """Cached lookup of available package managers.
+
+    The cache is keyed on PATH, the mtime of each PATH directory (so a newly
+    installed manager is noticed) and the mtime of each resolved binary.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key: Optional[Tuple] = None
+        self._backends: Dict[str, str] = {}
+
+    def _cache_key(self) -> Tuple:
+        """Cheap fingerprint of everything that can change the lookup result."""
+        path_env = os.environ.get('PATH', '')
+        dirs = tuple(_mtime(d) for d in path_env.split(os.pathsep) if d)
+        binaries = tuple(_mtime(p) for p in self._backends.values())
+        return (path_env, dirs, binaries)
+
+    def available(self) -> Dict[str, str]:
+        """Map of backend name to resolved binary path for every backend on PATH."""
+        with self._lock:
+            key = self._cache_key()
+            if key != self._key:
+                resolved = {name: shutil.which(name) for name in KNOWN_BACKENDS}
+                self._backends = {name: path for name, path in resolved.items() if path}
+                # Re-key against the freshly resolved binaries
+                self._key = self._cache_key()
+            return dict(self._backends)
+
+    def has(self, name: str) -> bool:
+        """Whether a backend is available."""
+        return name in self.available()
+
+    def linux_installer(self) -> Optional[str]:
+        """Preferred Linux package manager for installs, or None."""
+        backends = self.available()
+        return next((name for name in LINUX_INSTALLERS if name in backends), None)
+
+    def windows_installer(self) -> Optional[str]:
+        """Preferred Windows package manager for installs, or None."""
+        backends = self.available()
+        return next((name for name in WINDOWS_INSTALLERS if name in backends), None)
+
+_backends = PackageBackends()
+
+def get_package_backends() -> PackageBackends:
+    """Return the process-wide backend discovery cache."""
+    return _backends
@@ -0,0 +1,364 @@
+"""
+Resource History
+Fixed-interval CPU, memory, disk and network samples in preallocated ring-buffer arrays
+"""
+import math
+import re
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+from src.core.config import get_setting
+from src.core.metric_store import get_metric_store
+
+NAN = float('nan')
+
+# Upper bound on points per query, so a tiny step over a long window can't blow up a response
+MAX_POINTS = 10000
+DEFAULT_POINTS = 300
+
+_DURATION = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$')
+_DURATION_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+def parse_duration(value: Any) -> float:
+    """Seconds from a number or a string such as ``90``, ``15m``, ``6h`` or ``2d``."""
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        match = _DURATION.match(str(value))
+        if not match:
+            raise ValueError(f"Invalid duration: {value!r}")
+        seconds = float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+    if seconds <= 0:
+        raise ValueError(f"Duration must be positive: {value!r}")
+    return seconds
+
+def _total_times(per_cpu):
+    """Sum per-core cpu_times() readings into one of the same type."""
+    return type(per_cpu[0])(*map(sum, zip(*per_cpu)))
+
+class ResourceHistory:
+    """Record resource metrics at a fixed interval into one preallocated array per metric.
+
+    Memory is allocated once, up front: ``8 * (len(METRICS) + 1) * capacity``
+    bytes, where ``capacity = retention_seconds / interval``. Once full, the
+    oldest sample is overwritten. Missing readings are stored as NaN.
+    
+    With a ``store``, every sample is also appended to the memory-mapped
+    MetricStore, and queries the ring can't cover (longer windows, or
+    history from before a restart) are answered from it.
+
+    This is the server's only poller of CPU, memory, swap, disk and network
+    counters: feeds added with ``add_feed`` (the CPU and host samplers)
+    receive the raw readings of every sample instead of polling themselves.
+    """
+
+    METRICS = (
+        'cpu_percent',
+        'memory_percent',
+        'memory_used_bytes',
+        'swap_percent',
+        'disk_percent',
+        'disk_used_bytes',
+        'disk_read_bytes_per_sec',
+        'disk_write_bytes_per_sec',
+        'net_sent_bytes_per_sec',
+        'net_recv_bytes_per_sec',
+    )
+
+    def __init__(self, interval: float = 1.0, retention_seconds: float = 86400.0, disk_path: str = '/',
+                 store=None):
+        self.interval = interval
+        self.store = store
+        self.retention_seconds = retention_seconds
+        self.disk_path = disk_path
+        self.capacity = max(int(retention_seconds / interval), 1)
+        self._timestamps = array('d', [NAN]) * self.capacity
+        self._columns = {metric: array('d', [NAN]) * self.capacity for metric in self.METRICS}
+        self._head = 0  # Next slot to write
+        self._count = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Previous raw counters, for CPU utilization and I/O rates
+        self._last: Optional[Tuple[float, Any, Any, Any]] = None
+        self._listeners: List[Callable[[Dict[str, Optional[float]]], None]] = []
+        self._feeds: List[Callable[[float, Dict[str, Any]], None]] = []
+
+    @property
+    def running(self) -> bool:
+        """Whether the recording thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start recording. Calling start() on a running recorder is a no-op."""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='resource-history', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop recording and wait for the thread to exit."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        if self.store is not None:
+            self.store.close()
+
+    def _run(self):
+        """Recording loop, scheduled against the monotonic clock so it doesn't drift."""
+        next_tick = time.monotonic()
+        while True:
+            try:
+                self.sample()
+            except Exception:
+                pass  # One failed sample must not end the recording
+            next_tick += self.interval
+            if self._stop_event.wait(max(next_tick - time.monotonic(), 0)):
+                break
+
+    def add_listener(self, listener: Callable[[Dict[str, Optional[float]]], None]):
+        """Call ``listener(values)`` with every recorded sample, e.g. to feed threshold rules."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def add_feed(self, feed: Callable[[float, Dict[str, Any]], None]):
+        """Call ``feed(timestamp, readings)`` with every sample's raw readings.
+
+        ``readings`` holds the psutil results ``memory``, ``swap``, ``disk``
+        (for ``disk_path``) and ``net_io`` where they could be read, and
+        ``cpu_percent`` and ``per_core`` from the second sample on.
+        """
+        if feed not in self._feeds:
+            self._feeds.append(feed)
+
+    def remove_feed(self, feed: Callable[[float, Dict[str, Any]], None]):
+        if feed in self._feeds:
+            self._feeds.remove(feed)
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the sample arrays (fixed at construction)."""
+        return self._timestamps.itemsize * self.capacity * (len(self.METRICS) + 1)
+
+    def sample(self):
+        """Read the host counters once and record a sample."""
+        now = time.time()
+        values: Dict[str, float] = {}
+        readings: Dict[str, Any] = {}
+
+        cpu_times = psutil.cpu_times(percpu=True)
+        try:
+            disk_io = psutil.disk_io_counters()
+        except (OSError, RuntimeError):
+            disk_io = None
+        try:
+            net_io = psutil.net_io_counters()
+        except (OSError, RuntimeError):
+            net_io = None
+
+        memory = readings['memory'] = psutil.virtual_memory()
+        values['memory_percent'] = memory.percent
+        values['memory_used_bytes'] = memory.used
+        try:
+            readings['swap'] = psutil.swap_memory()
+            values['swap_percent'] = readings['swap'].percent
+        except (OSError, RuntimeError):
+            pass
+        try:
+            disk = readings['disk'] = psutil.disk_usage(self.disk_path)
+            values['disk_percent'] = disk.percent
+            values['disk_used_bytes'] = disk.used
+        except OSError:
+            pass
+        if net_io is not None:
+            readings['net_io'] = net_io
+
+        if self._last is not None:
+            last_time, last_cpu, last_disk, last_net = self._last
+            elapsed = now - last_time
+            values['cpu_percent'] = self._cpu_percent(_total_times(last_cpu), _total_times(cpu_times))
+            if values['cpu_percent'] is not None:
+                readings['cpu_percent'] = values['cpu_percent']
+                readings['per_core'] = [self._cpu_percent(before, after) or 0.0
+                                        for before, after in zip(last_cpu, cpu_times)]
+            if elapsed > 0:
+                if disk_io is not None and last_disk is not None:
+                    values['disk_read_bytes_per_sec'] = max(disk_io.read_bytes - last_disk.read_bytes, 0) / elapsed
+                    values['disk_write_bytes_per_sec'] = max(disk_io.write_bytes - last_disk.write_bytes, 0) / elapsed
+                if net_io is not None and last_net is not None:
+                    values['net_sent_bytes_per_sec'] = max(net_io.bytes_sent - last_net.bytes_sent, 0) / elapsed
+                    values['net_recv_bytes_per_sec'] = max(net_io.bytes_recv - last_net.bytes_recv, 0) / elapsed
+        self._last = (now, cpu_times, disk_io, net_io)
+        self.record(now, values)
+        for feed in self._feeds:
+            try:
+                feed(now, readings)
+            except Exception:
+                continue
+
+    @staticmethod
+    def _cpu_percent(before, after) -> Optional[float]:
+        """Busy share between two cpu_times() readings. Independent of psutil.cpu_percent()'s shared state."""
+        idle_fields = ('idle', 'iowait')
+        total = sum(after) - sum(before)
+        if total <= 0:
+            return None
+        idle = sum(getattr(after, f, 0) - getattr(before, f, 0) for f in idle_fields)
+        return round(min(max(100.0 * (total - idle) / total, 0.0), 100.0), 1)
+
+    def record(self, timestamp: float, values: Dict[str, Optional[float]]):
+        """Append one sample; metrics absent from ``values`` are stored as NaN."""
+        with self._lock:
+            slot = self._head
+            self._timestamps[slot] = timestamp
+            for metric, column in self._columns.items():
+                value = values.get(metric)
+                column[slot] = NAN if value is None else float(value)
+            self._head = (slot + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+        if self.store is not None:
+            self.store.append(timestamp, values)
+        for listener in self._listeners:
+            try:
+                listener(values)
+            except Exception:
+                continue
+
+    def _copy_since(self, metric: str, start: float) -> Tuple[array, array]:
+        """Copy (timestamps, values) for samples at or after ``start``, oldest first."""
+        with self._lock:
+            count = self._count
+            first = (self._head - count) % self.capacity
+
+            # Binary search over the logical (chronological) order of the ring
+            lo, hi = 0, count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._timestamps[(first + mid) % self.capacity] < start:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            begin = (first + lo) % self.capacity
+            length = count - lo
+
+            column = self._columns[metric]
+            end = begin + length
+            if end <= self.capacity:
+                return self._timestamps[begin:end], column[begin:end]
+            wrap = end - self.capacity
+            return (self._timestamps[begin:] + self._timestamps[:wrap],
+                    column[begin:] + column[:wrap])
+
+    def query(self, metric: str, window: Any = 3600, step: Any = None,
+              now: Optional[float] = None) -> Dict[str, Any]:
+        """Downsample the last ``window`` seconds of ``metric`` into ``step``-second buckets.
+
+        Buckets are aligned to multiples of ``step`` since the epoch, so
+        repeated polls return stable boundaries. Each point carries the bucket
+        start ``t`` and the ``min``, ``max`` and ``avg`` of its samples; empty
+        buckets are omitted. ``step`` defaults to about ``DEFAULT_POINTS`` points
+        and is never finer than the sampling interval.
+        """
+        if metric not in self._columns:
+            raise ValueError(f"Unknown metric '{metric}'. Available: {', '.join(self.METRICS)}")
+        retention = max(self.retention_seconds, self.store.retention_seconds if self.store else 0)
+        window = min(parse_duration(window), retention)
+        step = parse_duration(step) if step is not None else window / DEFAULT_POINTS
+        step = max(step, self.interval)
+        if window / step > MAX_POINTS:
+            raise ValueError(f"window/step would return more than {MAX_POINTS} points")
+
+        now = time.time() if now is None else now
+        result = {
+            'metric': metric,
+            'window': window,
+            'step': step,
+            'interval': self.interval,
+        }
+        if self.store is not None and self._oldest_timestamp() > now - window + self.interval:
+            result['points'] = self.store.query(metric, now - window, now, step)
+            result['source'] = 'store'
+            return result
+
+        timestamps, values = self._copy_since(metric, now - window)
+
+        points: List[Dict[str, Any]] = []
+        bucket_start = None
+        bucket_end = -math.inf
+        low = high = total = 0.0
+        n = 0
+        for timestamp, value in zip(timestamps, values):
+            if value != value:  # NaN: no reading
+                continue
+            if timestamp >= bucket_end:
+                if n:
+                    points.append({'t': bucket_start, 'min': low, 'max': high, 'avg': round(total / n, 3)})
+                bucket_start = math.floor(timestamp / step) * step
+                bucket_end = bucket_start + step
+                low = high = value
+                total = 0.0
+                n = 0
+            if value < low:
+                low = value
+            elif value > high:
+                high = value
+            total += value
+            n += 1
+        if n:
+            points.append({'t': bucket_start, 'min': low, 'max': high, 'avg': round(total / n, 3)})
+
+        result['points'] = points
+        result['source'] = 'memory'
+        return result
+
+    def _oldest_timestamp(self) -> float:
+        """Time of the oldest sample in the ring, or +inf when it is empty."""
+        with self._lock:
+            if not self._count:
+                return math.inf
+            return self._timestamps[(self._head - self._count) % self.capacity]
+
+    def info(self) -> Dict[str, Any]:
+        """Recorder configuration and fill level."""
+        with self._lock:
+            count = self._count
+            oldest = self._timestamps[(self._head - count) % self.capacity] if count else None
+        info = {
+            'metrics': list(self.METRICS),
+            'interval': self.interval,
+            'retention_seconds': self.retention_seconds,
+            'capacity': self.capacity,
+            'samples': count,
+            'oldest': oldest,
+            'memory_bytes': self.memory_bytes(),
+            'running': self.running,
+        }
+        if self.store is not None:
+            info['store'] = {
+                'path': self.store.root,
+                'resolution': self.store.resolution,
+                'retention_seconds': self.store.retention_seconds,
+                'rollups': [{'resolution': res, 'retention_days': days} for res, days in self.store.rollups],
+            }
+        return info
+
+_history: Optional[ResourceHistory] = None
+_history_lock = threading.Lock()
+
+def get_resource_history() -> ResourceHistory:
+    """Return the process-wide recorder, configured from performance.history."""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = ResourceHistory(
+                interval=float(get_setting('performance.history.interval_seconds', 1.0)),
+                retention_seconds=float(get_setting('performance.history.retention_seconds', 86400)),
+                disk_path=get_setting('performance.history.disk_path', '/'),
+                store=get_metric_store(ResourceHistory.METRICS),
+            )
+        return _history
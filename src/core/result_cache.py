@@ -0,0 +1,129 @@
+"""
+Result Cache
+TTL cache with single-flight deduplication for expensive probes
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src.core.config import get_setting
+
+class _Flight:
+    """A computation in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.timestamp = 0.0
+
+class ResultCache:
+    """Cache results for a TTL and coalesce concurrent identical computations.
+
+    While a key is being computed, other callers asking for the same key wait
+    for that computation instead of starting their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], ttl: float,
+                       refresh: bool = False,
+                       cacheable: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, float]:
+        """Return ``(value, age_seconds)`` for ``key``, computing it if needed.
+
+        ``refresh`` skips the cached value (but still joins an in-flight
+        computation, which is fresh by definition). Values rejected by
+        ``cacheable`` are returned but not stored.
+        """
+        with self._lock:
+            if not refresh:
+                entry = self._entries.get(key)
+                if entry is not None and time.monotonic() - entry[0] <= ttl:
+                    self.hits += 1
+                    return entry[1], time.monotonic() - entry[0]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, time.monotonic() - flight.timestamp
+
+        try:
+            flight.value = compute()
+            flight.timestamp = time.monotonic()
+            if cacheable is None or cacheable(flight.value):
+                with self._lock:
+                    self._entries[key] = (flight.timestamp, flight.value)
+            return flight.value, 0.0
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def peek(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """``(value, age_seconds)`` of the stored entry, ignoring TTL, or None. Never computes."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry[1], time.monotonic() - entry[0]
+    
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one cached key, or everything when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and coalesced-wait counters."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'entries': len(self._entries),
+            }
+
+class ResultSnapshot:
+    """Pin results for the lifetime of one unit of work, such as an MCP batch.
+
+    The first computation of a key is kept and returned to every later lookup
+    (concurrent lookups wait for it), so all members see one consistent view
+    instead of each re-probing.
+    """
+
+    def __init__(self):
+        self._cache = ResultCache()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        value, _ = self._cache.get_or_compute(key, compute, ttl=float('inf'))
+        return value
+
+def cache_ttl(name: str) -> float:
+    """TTL for a cached result, from performance.cache_ttl_seconds.<name>; 0 (never reused) if unset."""
+    return float(get_setting(f'performance.cache_ttl_seconds.{name}', 0))
+
+_cache = ResultCache()
+
+def get_result_cache() -> ResultCache:
+    """Return the process-wide result cache."""
+    return _cache
@@ -0,0 +1,126 @@
+"""
+Runtime Context
+Process-wide, lazily built platform info, logger and service objects shared by the REST and MCP layers
+"""
+import threading
+from typing import Any, Dict, Optional
+
+class RuntimeContext:
+    """Build expensive shared state on first use, once per process.
+
+    Importing the API modules no longer detects the platform or configures
+    logging; the first request (or the server lifespan) does.
+    """
+
+    def __init__(self, verbose: bool = False):
+        self.verbose = verbose
+        self._lock = threading.RLock()
+        self._platform_info: Optional[Dict[str, Any]] = None
+        self._logger = None
+        self._checker = None
+        self._solver = None
+        self._dev_info = None
+
+    @property
+    def platform_info(self) -> Dict[str, Any]:
+        if self._platform_info is None:
+            with self._lock:
+                if self._platform_info is None:
+                    from src.core.platform import PlatformDetector
+                    self._platform_info = PlatformDetector().detect()
+        return self._platform_info
+
+    @property
+    def logger(self):
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    from src.core.logger import setup_logger
+                    self._logger = setup_logger(verbose=self.verbose)
+        return self._logger
+
+    @property
+    def checker(self):
+        """Shared EnvironmentChecker (stateless apart from platform info and logger)."""
+        if self._checker is None:
+            with self._lock:
+                if self._checker is None:
+                    from src.checker.environment_checker import EnvironmentChecker
+                    self._checker = EnvironmentChecker(self.platform_info, self.logger)
+        return self._checker
+
+    @property
+    def solver(self):
+        """Shared ProblemSolver."""
+        if self._solver is None:
+            with self._lock:
+                if self._solver is None:
+                    from src.troubleshooting.problem_solver import ProblemSolver
+                    self._solver = ProblemSolver(self.platform_info, self.logger)
+        return self._solver
+
+    @property
+    def dev_info(self):
+        """Shared DevelopmentInfoProvider."""
+        if self._dev_info is None:
+            with self._lock:
+                if self._dev_info is None:
+                    from src.api.dev_info import DevelopmentInfoProvider
+                    self._dev_info = DevelopmentInfoProvider(self.platform_info, self.logger)
+        return self._dev_info
+
+    @property
+    def result_cache(self):
+        from src.core.result_cache import get_result_cache
+        return get_result_cache()
+
+    @property
+    def job_manager(self):
+        from src.core.jobs import get_job_manager
+        return get_job_manager()
+
+    @property
+    def cpu_sampler(self):
+        from src.core.cpu_sampler import get_cpu_sampler
+        return get_cpu_sampler()
+
+    @property
+    def host_sampler(self):
+        from src.core.host_sampler import get_host_sampler
+        return get_host_sampler()
+
+    @property
+    def resource_history(self):
+        from src.core.resource_history import get_resource_history
+        return get_resource_history()
+
+    @property
+    def rule_engine(self):
+        from src.troubleshooting.rules import get_rule_engine
+        return get_rule_engine()
+
+    @property
+    def process_sampler(self):
+        from src.checker.process_sampler import get_process_sampler
+        return get_process_sampler()
+
+    @property
+    def dir_scanner(self):
+        from src.checker.dir_scanner import get_directory_scanner
+        return get_directory_scanner()
+
+    @property
+    def metrics(self):
+        from src.core.metrics import get_metrics
+        return get_metrics()
+
+_runtime: Optional[RuntimeContext] = None
+_runtime_lock = threading.Lock()
+
+def get_runtime() -> RuntimeContext:
+    """Return the process-wide runtime context."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = RuntimeContext()
+        return _runtime
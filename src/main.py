@@ -1,3 +1,4 @@
+import os
 import sys
 import platform
 from pathlib import Path
@@ -8,6 +9,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from src.core.logger import setup_logger
 from src.core.platform import PlatformDetector
 from src.checker.environment_checker import EnvironmentChecker
+from src.checker.dir_scanner import get_directory_scanner, print_scan
 from src.setup.setup_manager import SetupManager
 from src.update.update_manager import UpdateManager
 from src.troubleshooting.problem_solver import ProblemSolver
@@ -21,7 +23,7 @@ def main():
     )
     parser.add_argument(
         'command',
-        choices=['check', 'setup', 'update', 'diagnose', 'fix'],
+        choices=['check', 'setup', 'update', 'diagnose', 'fix', 'disk-usage'],
         help='Command to execute'
     )
     parser.add_argument(
@@ -35,9 +37,35 @@ def main():
         default='config/default.yaml',
         help='Configuration file path'
     )
+    parser.add_argument(
+        '--sections',
+        type=str,
+        default=None,
+        help=f"Comma-separated sections for 'check' ({', '.join(EnvironmentChecker.SECTIONS)})"
+    )
+    parser.add_argument(
+        '--path',
+        type=str,
+        default=None,
+        help="Directory for 'disk-usage' (default: / or the system drive)"
+    )
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=20,
+        help="Number of largest directories and files for 'disk-usage'"
+    )
     
     args = parser.parse_args()
     
+    sections = None
+    if args.sections:
+        sections = [s.strip() for s in args.sections.split(',') if s.strip()]
+        try:
+            EnvironmentChecker.select_sections(sections)
+        except ValueError as e:
+            parser.error(f"argument --sections: {e}")
+    
     # Setup logger
     logger = setup_logger(verbose=args.verbose)
     
@@ -50,8 +78,13 @@ def main():
     try:
         if args.command == 'check':
             checker = EnvironmentChecker(platform_info, logger)
-            results = checker.check_all()
-            checker.print_report(results)
+            # Print each section as soon as it finishes
+            checker.print_report_header()
+            for record in checker.iter_check(sections=sections):
+                if record['type'] == 'section':
+                    checker.print_section(record['section'], record['data'])
+                else:
+                    checker.print_timings(record['timings'])
             
         elif args.command == 'setup':
             manager = SetupManager(platform_info, logger)
@@ -71,6 +104,10 @@ def main():
             issues = solver.detect_issues()
             solver.fix_issues(issues)
             
+        elif args.command == 'disk-usage':
+            path = args.path or os.path.abspath(os.sep)
+            print_scan(get_directory_scanner().scan(path, top=args.top))
+            
     except Exception as e:
         logger.error(f"Error executing command '{args.command}': {e}", exc_info=True)
         sys.exit(1)
@@ -2,11 +2,12 @@ import yaml
 import subprocess
 import requests
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable, Optional
 from pathlib import Path
 from urllib.parse import urlparse
 
 from src.setup.environment_setup import EnvironmentSetup
+from src.core.package_backends import get_package_backends
 
 class SetupManager:
     """Manage software setup and configuration."""
@@ -16,8 +17,15 @@ class SetupManager:
         self.logger = logger
         self.os = platform_info['os']
     
-    def setup_from_config(self, config_path: str):
-        """Setup system from configuration file."""
+    def setup_from_config(self, config_path: str,
+                          progress: Optional[Callable[[int, int, str], None]] = None,
+                          should_stop: Optional[Callable[[], bool]] = None):
+        """Setup system from configuration file.
+        
+        ``progress(current, total, message)`` is called before each package and
+        ``should_stop()`` is checked between packages so background jobs can
+        report progress and be cancelled.
+        """
         config_file = Path(config_path)
         
         if not config_file.exists():
@@ -34,7 +42,13 @@ class SetupManager:
             packages = config['software'].get('packages', [])
             
             # Handle new format with package dictionaries
-            for package in packages:
+            for index, package in enumerate(packages):
+                if should_stop and should_stop():
+                    self.logger.warning("Setup cancelled")
+                    return
+                if progress:
+                    name = package.get('name', '') if isinstance(package, dict) else package
+                    progress(index, len(packages), f"Installing {name}")
                 if isinstance(package, dict):
                     # New format with detailed info
                     self._install_package(package)
@@ -183,30 +197,18 @@ class SetupManager:
     
     def _install_windows_software(self, software_config: Dict[str, Any]):
         """Install software on Windows."""
-        # Check for winget, chocolatey, or manual installation
-        import subprocess
-        
-        # Try winget first (Windows 10/11)
-        try:
-            result = subprocess.run(['winget', '--version'], capture_output=True)
-            if result.returncode == 0:
-                self.logger.info("Using winget for installation")
-                for package in software_config.get('packages', []):
-                    self._install_with_winget(package)
-                return
-        except Exception:
-            pass
-        
-        # Try chocolatey
-        try:
-            result = subprocess.run(['choco', '--version'], capture_output=True)
-            if result.returncode == 0:
-                self.logger.info("Using Chocolatey for installation")
-                for package in software_config.get('packages', []):
-                    self._install_with_chocolatey(package)
-                return
-        except Exception:
-            pass
+        # Prefer winget (Windows 10/11), then Chocolatey
+        installer = get_package_backends().windows_installer()
+        if installer == 'winget':
+            self.logger.info("Using winget for installation")
+            for package in software_config.get('packages', []):
+                self._install_with_winget(package)
+            return
+        if installer == 'choco':
+            self.logger.info("Using Chocolatey for installation")
+            for package in software_config.get('packages', []):
+                self._install_with_chocolatey(package)
+            return
         
         self.logger.warning("No package manager found. Manual installation required.")
     
@@ -232,23 +234,8 @@ class SetupManager:
     
     def _install_linux_software(self, software_config: Dict[str, Any]):
         """Install software on Linux."""
-        import subprocess
-        
         # Detect package manager
-        package_manager = None
-        try:
-            subprocess.run(['apt', '--version'], capture_output=True, check=True)
-            package_manager = 'apt'
-        except Exception:
-            try:
-                subprocess.run(['yum', '--version'], capture_output=True, check=True)
-                package_manager = 'yum'
-            except Exception:
-                try:
-                    subprocess.run(['dnf', '--version'], capture_output=True, check=True)
-                    package_manager = 'dnf'
-                except Exception:
-                    pass
+        package_manager = get_package_backends().linux_installer()
         
         if not package_manager:
             self.logger.error("No supported package manager found")
@@ -0,0 +1,82 @@
+"""
+Diagnosis Store
+Keeps recent diagnoses so fixes can refer to detected issues by id instead of detecting again
+"""
+import itertools
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.core.config import get_setting
+
+_UNSAFE = re.compile(r'[^A-Za-z0-9_./-]+')
+
+def make_issue_id(category: str, check: str, subject: Any) -> str:
+    """Deterministic issue id, e.g. ``disk:disk_space:/var/lib/docker``.
+
+    The same problem found by the same check gets the same id in every
+    diagnosis, so a client can fix by id across diagnose calls.
+    """
+    return ':'.join(_UNSAFE.sub('_', str(part)).strip('_') or '_' for part in (category, check, subject))
+
+class Diagnosis:
+    """The issues one detection run found. Immutable once stored."""
+
+    __slots__ = ('id', 'version', 'created_at', 'issues')
+
+    def __init__(self, version: int, issues: List[Dict[str, Any]]):
+        self.id = uuid.uuid4().hex
+        self.version = version
+        self.created_at = time.time()
+        self.issues = tuple(issues)
+
+    def select(self, issue_ids: Optional[Iterable[str]] = None) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """``(issues, unknown_ids)`` for the requested ids; all issues when ``issue_ids`` is empty."""
+        if not issue_ids:
+            return list(self.issues), []
+        by_id = {issue['id']: issue for issue in self.issues}
+        wanted = list(dict.fromkeys(issue_ids))
+        return [by_id[i] for i in wanted if i in by_id], [i for i in wanted if i not in by_id]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'diagnosis_id': self.id,
+            'version': self.version,
+            'created_at': datetime.fromtimestamp(self.created_at).isoformat(),
+            'issues': list(self.issues),
+        }
+
+class DiagnosisStore:
+    """The last ``history`` diagnoses, each with a store-wide increasing version."""
+
+    def __init__(self, history: int = 50):
+        self._diagnoses: 'OrderedDict[str, Diagnosis]' = OrderedDict()
+        self._versions = itertools.count(1)
+        self._lock = threading.Lock()
+        self._history = max(int(history), 1)
+
+    def save(self, issues: List[Dict[str, Any]]) -> Diagnosis:
+        with self._lock:
+            diagnosis = Diagnosis(next(self._versions), issues)
+            self._diagnoses[diagnosis.id] = diagnosis
+            while len(self._diagnoses) > self._history:
+                self._diagnoses.popitem(last=False)
+        return diagnosis
+
+    def get(self, diagnosis_id: str) -> Optional[Diagnosis]:
+        return self._diagnoses.get(diagnosis_id)
+
+_store: Optional[DiagnosisStore] = None
+_store_lock = threading.Lock()
+
+def get_diagnosis_store() -> DiagnosisStore:
+    """Return the process-wide store, sized from performance.diagnosis_history."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DiagnosisStore(history=int(get_setting('performance.diagnosis_history', 50)))
+        return _store
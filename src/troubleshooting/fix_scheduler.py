@@ -0,0 +1,255 @@
+"""
+Fix Scheduler
+Runs fixes as a dependency graph on a worker pool, with resource locks, timeouts and per-fix results
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# _blocked_reason() result for a task that can start later in the same run
+_WAITING = 'waiting'
+
+class Fix:
+    """A fix method and how it may be scheduled.
+
+    ``depends_on`` names fixes that must finish successfully first when they
+    are part of the same run. Fixes sharing a name in ``locks`` (e.g.
+    ``package_manager``, ``firewall``) never run at the same time. An
+    ``idempotent`` fix runs once per run however many issues ask for it;
+    otherwise it runs once per issue. ``func(issue, timeout)`` should pass
+    ``timeout`` on to any subprocess it starts.
+    """
+
+    __slots__ = ('name', 'func', 'depends_on', 'locks', 'idempotent', 'timeout')
+
+    def __init__(self, name: str, func: Callable[[Dict[str, Any], float], Any],
+                 depends_on: Tuple[str, ...] = (), locks: Tuple[str, ...] = (),
+                 idempotent: bool = True, timeout: float = 60.0):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.locks = frozenset(locks)
+        self.idempotent = idempotent
+        self.timeout = timeout
+
+class FixTask:
+    """One scheduled application of a fix to one or more issues."""
+
+    __slots__ = ('key', 'fix', 'issues', 'waits_for', 'status', 'error', 'started', 'finished', 'output')
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    TIMEOUT = 'timeout'
+    SKIPPED = 'skipped'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, key: str, fix: Optional[Fix], issues: List[Dict[str, Any]]):
+        self.key = key
+        self.fix = fix
+        self.issues = issues
+        self.waits_for: List['FixTask'] = []
+        self.status = self.PENDING
+        self.error: Optional[str] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.output: Any = None  # Whatever the fix returned, e.g. cleanup candidates
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        result = {
+            'fix': self.key,
+            'issue_ids': [issue.get('id') for issue in self.issues],
+            'status': self.status,
+            'started': round(self.started - origin, 3) if self.started is not None else None,
+            'duration': round(self.finished - self.started, 3)
+                        if self.started is not None and self.finished is not None else None,
+        }
+        if self.error:
+            result['error'] = self.error
+        if self.output is not None:
+            result['output'] = self.output
+        return result
+
+class FixScheduler:
+    """Plan fixes into a DAG and run independent ones concurrently.
+
+    A fix starts once everything it depends on has succeeded and none of its
+    locks is held, so total time tracks the longest dependency chain rather
+    than the sum of all fixes. A fix that overruns its timeout is reported
+    as ``timeout`` straight away; its worker thread can't be killed, so its
+    locks stay held and fixes needing them are skipped instead of waiting.
+    """
+
+    def __init__(self, fixes: Dict[str, Fix], max_workers: int = 4, logger=None):
+        self.fixes = fixes
+        self.max_workers = max(int(max_workers), 1)
+        self.logger = logger
+
+    def plan(self, issues: List[Dict[str, Any]]) -> List[FixTask]:
+        """Tasks for the issues' fixes in detection order, with dependency edges resolved.
+
+        Raises ValueError if the dependencies among the planned fixes form a cycle.
+        """
+        tasks: List[FixTask] = []
+        by_key: Dict[str, FixTask] = {}
+        for issue in issues:
+            name = issue.get('fix')
+            if not name:
+                continue
+            fix = self.fixes.get(name)
+            if fix is not None and fix.idempotent and name in by_key:
+                by_key[name].issues.append(issue)
+                continue
+            key = name if fix is None or fix.idempotent else f"{name}#{issue.get('id', len(tasks))}"
+            task = FixTask(key, fix, [issue])
+            tasks.append(task)
+            by_key.setdefault(name, task)
+
+        by_name: Dict[str, List[FixTask]] = {}
+        for task in tasks:
+            if task.fix is not None:
+                by_name.setdefault(task.fix.name, []).append(task)
+        for task in tasks:
+            if task.fix is not None:
+                for dependency in task.fix.depends_on:
+                    task.waits_for.extend(by_name.get(dependency, []))
+        self._check_acyclic(tasks)
+        return tasks
+
+    @staticmethod
+    def _check_acyclic(tasks: List[FixTask]):
+        remaining = {id(task): len(task.waits_for) for task in tasks}
+        dependents: Dict[int, List[FixTask]] = {}
+        for task in tasks:
+            for dependency in task.waits_for:
+                dependents.setdefault(id(dependency), []).append(task)
+        ready = [task for task in tasks if not task.waits_for]
+        seen = 0
+        while ready:
+            task = ready.pop()
+            seen += 1
+            for dependent in dependents.get(id(task), []):
+                remaining[id(dependent)] -= 1
+                if not remaining[id(dependent)]:
+                    ready.append(dependent)
+        if seen != len(tasks):
+            cyclic = sorted(task.key for task in tasks if remaining[id(task)])
+            raise ValueError(f"Fix dependencies form a cycle: {', '.join(cyclic)}")
+
+    def run(self, issues: List[Dict[str, Any]],
+            progress: Optional[Callable[[int, int, str], None]] = None,
+            should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """Apply the fixes for ``issues`` and return per-fix results and the elapsed time."""
+        tasks = self.plan(issues)
+        origin = time.time()
+        held: Dict[str, FixTask] = {}  # Lock name -> task holding it
+        running: Dict[Any, Tuple[FixTask, float]] = {}  # Future -> (task, deadline), incl. overrunning ones
+
+        def settle(task: FixTask, status: str, error: Optional[str] = None):
+            task.status = status
+            task.error = error
+            task.finished = time.time()
+            if progress:
+                progress(sum(t.status not in (FixTask.PENDING, FixTask.RUNNING) for t in tasks), len(tasks), task.key)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='fix')
+        try:
+            while True:
+                stopping = should_stop is not None and should_stop()
+                for task in tasks:
+                    if task.status != FixTask.PENDING:
+                        continue
+                    reason = self._blocked_reason(task, held)
+                    if stopping:
+                        settle(task, FixTask.CANCELLED, 'Cancelled before start')
+                    elif reason is None:
+                        if len(running) < self.max_workers:
+                            self._start(task, executor, held, running)
+                    elif reason is not _WAITING:
+                        settle(task, FixTask.SKIPPED, reason)
+
+                live = [deadline for task, deadline in running.values() if task.status == FixTask.RUNNING]
+                if not live:
+                    # Whatever is still pending waits on fixes that overran their timeout
+                    self._skip_blocked(tasks, held, settle)
+                    break
+
+                finished, _ = wait(list(running), timeout=max(min(live) - time.time(), 0),
+                                   return_when=FIRST_COMPLETED)
+                now = time.time()
+                for future, (task, deadline) in list(running.items()):
+                    if future in finished:
+                        del running[future]
+                        self._release(task, held)
+                        if task.status == FixTask.RUNNING:
+                            error = future.exception()
+                            if error is None:
+                                task.output = future.result()
+                            if error is not None and self.logger:
+                                self.logger.error(f"Fix {task.key} failed: {error}")
+                            settle(task, FixTask.SUCCEEDED if error is None else FixTask.FAILED,
+                                   str(error) if error is not None else None)
+                    elif task.status == FixTask.RUNNING and now >= deadline:
+                        # Report the overrun now; its locks stay held until the thread returns
+                        if self.logger:
+                            self.logger.error(f"Fix {task.key} timed out after {task.fix.timeout}s")
+                        settle(task, FixTask.TIMEOUT, f"Exceeded {task.fix.timeout}s")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return {
+            'results': [task.to_dict(origin) for task in tasks],
+            'elapsed': round(time.time() - origin, 3),
+        }
+
+    def _skip_blocked(self, tasks: List[FixTask], held: Dict[str, FixTask], settle: Callable):
+        """Skip every pending task, with the most specific reason available."""
+        pending = [task for task in tasks if task.status == FixTask.PENDING]
+        while pending:
+            for task in pending:
+                reason = self._blocked_reason(task, held)
+                if reason is not None and reason is not _WAITING:
+                    settle(task, FixTask.SKIPPED, reason)
+            still_pending = [task for task in pending if task.status == FixTask.PENDING]
+            if len(still_pending) == len(pending):
+                # Startable, but every worker is stuck in a timed-out fix
+                for task in still_pending:
+                    settle(task, FixTask.SKIPPED, 'Blocked by timed-out fixes')
+                break
+            pending = still_pending
+
+    @staticmethod
+    def _blocked_reason(task: FixTask, held: Dict[str, FixTask]) -> Optional[str]:
+        """None if the task can start, _WAITING if it must wait, otherwise why it never will."""
+        if task.fix is None:
+            return f"Unknown fix method: {task.key}"
+        for dependency in task.waits_for:
+            if dependency.status in (FixTask.FAILED, FixTask.TIMEOUT, FixTask.SKIPPED, FixTask.CANCELLED):
+                return f"Dependency {dependency.key} {dependency.status}"
+            if dependency.status != FixTask.SUCCEEDED:
+                return _WAITING
+        for lock in task.fix.locks:
+            holder = held.get(lock)
+            if holder is not None:
+                if holder.status == FixTask.TIMEOUT:
+                    return f"Lock '{lock}' held by timed-out fix {holder.key}"
+                return _WAITING
+        return None
+
+    def _start(self, task: FixTask, executor: ThreadPoolExecutor, held: Dict[str, FixTask],
+               running: Dict[Any, Tuple[FixTask, float]]):
+        for lock in task.fix.locks:
+            held[lock] = task
+        task.status = FixTask.RUNNING
+        task.started = time.time()
+        if self.logger:
+            self.logger.info(f"Applying fix: {task.key}")
+        future = executor.submit(task.fix.func, task.issues[0], task.fix.timeout)
+        running[future] = (task, task.started + task.fix.timeout)
+
+    @staticmethod
+    def _release(task: FixTask, held: Dict[str, FixTask]):
+        for lock in task.fix.locks:
+            if held.get(lock) is task:
+                del held[lock]
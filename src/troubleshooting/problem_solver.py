@@ -1,6 +1,29 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable, Optional, Set
 from colorama import Fore, Style
 
+from src.checker.connectivity import get_connectivity_probe
+from src.checker.dir_scanner import format_bytes, get_directory_scanner
+from src.checker.disk_usage import mount_thresholds
+from src.checker.environment_snapshot import get_snapshot_collector
+from src.checker.process_sampler import get_process_sampler
+from src.core.config import get_setting
+from src.core.jobs import inherit_job
+from src.troubleshooting.diagnoses import Diagnosis, get_diagnosis_store, make_issue_id
+from src.troubleshooting.fix_scheduler import Fix, FixScheduler
+from src.troubleshooting.rules import LEVELS, Rule, get_rule_engine
+
+# How recently the recorder must have fed the rule engine for its state to be used
+RULE_FRESHNESS_SECONDS = 10
+
+# Issue checks answered by _check_disks rather than the rule engine
+DISK_CHECKS = {'disk_space', 'inode', 'mount'}
+DISK_THRESHOLD_KEYS = ('disk_space_warning', 'disk_space_critical', 'inode_warning', 'inode_critical')
+# (check, mount usage key, metric, message label)
+DISK_METRICS = (
+    ('disk_space', 'percent', 'disk_percent', 'Disk space'),
+    ('inode', 'inodes_percent', 'inodes_percent', 'Inodes'),
+)
+
 class ProblemSolver:
     """Detect and fix common computer problems."""
     
@@ -8,6 +31,7 @@ class ProblemSolver:
         self.platform_info = platform_info
         self.logger = logger
         self.os = platform_info['os']
+        self.facts = get_snapshot_collector(self.os, logger)
     
     def detect_issues(self) -> List[Dict[str, Any]]:
         """Detect common issues."""
@@ -15,11 +39,11 @@ class ProblemSolver:
         
         issues = []
         
-        # Check disk space
-        issues.extend(self._check_disk_space())
+        # Check disk space and inodes on every mount
+        issues.extend(self._check_disks())
         
-        # Check memory
-        issues.extend(self._check_memory())
+        # Check memory, CPU and other metric thresholds
+        issues.extend(self._check_thresholds())
         
         # Check network connectivity
         issues.extend(self._check_network_connectivity())
@@ -29,94 +53,153 @@ class ProblemSolver:
         
         return issues
     
-    def _check_disk_space(self) -> List[Dict[str, Any]]:
-        """Check disk space issues."""
-        issues = []
+    def diagnose(self) -> Diagnosis:
+        """Detect issues and store them as a diagnosis that fixes can refer to by id."""
+        return get_diagnosis_store().save(self.detect_issues())
+    
+    def revalidate(self, issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Re-run only the checks behind ``issues`` and return the ones still present.
         
-        try:
-            import psutil
-            import os
-            disk = psutil.disk_usage(os.path.expanduser('~'))
-            percent_used = disk.percent
-            
-            if percent_used > 90:
-                issues.append({
-                    'severity': 'high',
-                    'category': 'disk',
-                    'issue': f'Disk space critically low ({percent_used:.1f}% used)',
-                    'fix': 'cleanup_disk',
-                })
-            elif percent_used > 80:
+        Threshold rules are re-evaluated on fresh readings of just their facts,
+        disk issues on a fresh read of the mounts, and connectivity and
+        firewall issues re-run that one probe.
+        """
+        checks = {issue.get('check') for issue in issues}
+        current = []
+        rules = checks - DISK_CHECKS - {'connectivity', 'firewall'}
+        if rules:
+            current.extend(self._check_thresholds(names=rules, refresh=True))
+        if checks & DISK_CHECKS:
+            current.extend(self._check_disks(refresh=True))
+        if 'connectivity' in checks:
+            current.extend(self._check_network_connectivity(refresh=True))
+        if 'firewall' in checks:
+            current.extend(self._check_security_issues(refresh=True))
+        
+        present = {issue['id'] for issue in current}
+        return [issue for issue in issues if issue['id'] in present]
+    
+    def _check_disks(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Check byte and inode usage of every mount against its thresholds.
+        
+        Thresholds come from ``thresholds`` (disk_space_*, inode_*), overridden
+        per mount by the first matching ``thresholds.mounts`` pattern. A mount
+        that didn't answer in time is reported too.
+        """
+        thresholds = get_setting('thresholds', {}) or {}
+        defaults = {key: thresholds[key] for key in DISK_THRESHOLD_KEYS if thresholds.get(key) is not None}
+        mounts = self.facts.collect(['mounts'], refresh=refresh).get('mounts', ())
+        
+        issues = []
+        for mount in mounts:
+            mountpoint = mount['mountpoint']
+            if 'error' in mount:
                 issues.append({
+                    'id': make_issue_id('disk', 'mount', mountpoint),
+                    'check': 'mount',
                     'severity': 'medium',
                     'category': 'disk',
-                    'issue': f'Disk space running low ({percent_used:.1f}% used)',
-                    'fix': 'cleanup_disk',
+                    'issue': f"Mount {mountpoint} did not respond ({mount['error']})",
+                    'fix': None,
+                    'mountpoint': mountpoint,
                 })
-        except Exception as e:
-            self.logger.warning(f"Could not check disk space: {e}")
-        
+                continue
+            limits = mount_thresholds(mountpoint, thresholds.get('mounts'), defaults)
+            for check, key, metric, label in DISK_METRICS:
+                value = mount.get(key)
+                levels = [(level, severity, float(limits[f'{check}_{level}']))
+                          for level, severity in LEVELS if limits.get(f'{check}_{level}') is not None]
+                if value is None or not levels:
+                    continue
+                rule = Rule(
+                    name=check,
+                    metric=metric,
+                    category='disk',
+                    levels=levels,
+                    fix='cleanup_disk',
+                    messages={
+                        'critical': f"{label} critically low on {{subject}} ({{value:.1f}}% used)",
+                        'warning': f"{label} running low on {{subject}} ({{value:.1f}}% used)",
+                    },
+                    subject=mountpoint,
+                )
+                index = rule.evaluate_once(value)
+                if index is not None:
+                    issues.append(dict(rule.issue(index, value), mountpoint=mountpoint))
         return issues
     
-    def _check_memory(self) -> List[Dict[str, Any]]:
-        """Check memory issues."""
-        issues = []
+    def _check_thresholds(self, names: Optional[Set[str]] = None, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Check metric thresholds (memory, CPU, ...) with the configured rules.
         
-        try:
-            import psutil
-            memory = psutil.virtual_memory()
-            
-            if memory.percent > 90:
-                issues.append({
-                    'severity': 'high',
-                    'category': 'memory',
-                    'issue': f'Memory usage critically high ({memory.percent:.1f}%)',
-                    'fix': 'free_memory',
-                })
-        except Exception as e:
-            self.logger.warning(f"Could not check memory: {e}")
+        When the resource recorder is feeding the rule engine (API server), this
+        reads its current state, including sustain and hysteresis. Otherwise one
+        snapshot is taken and every rule (or just ``names``) is evaluated against
+        it directly.
+        """
+        engine = get_rule_engine()
+        if engine.fresh(max_age=RULE_FRESHNESS_SECONDS):
+            return engine.active_issues(names)
+        return engine.evaluate(self._metric_snapshot(refresh=refresh), names)
+    
+    def _metric_snapshot(self, refresh: bool = False) -> Dict[str, Optional[float]]:
+        """Metrics the rules refer to, read from the shared environment snapshot.
         
-        return issues
+        CPU is only included when the background sampler can supply it, so
+        diagnosis never blocks on a one-second CPU sample.
+        """
+        from src.core.cpu_sampler import get_cpu_sampler
+        
+        names = ['memory', 'swap', 'disk']
+        sampler = get_cpu_sampler()
+        if sampler.running and sampler.has_samples():
+            names.append('cpu')
+        facts = self.facts.collect(names, refresh=refresh)
+        
+        snapshot: Dict[str, Optional[float]] = {}
+        if 'disk' in facts:
+            snapshot['disk_percent'] = facts['disk'].percent
+        if 'memory' in facts:
+            snapshot['memory_percent'] = facts['memory'].percent
+        if 'swap' in facts:
+            snapshot['swap_percent'] = facts['swap'].percent
+        if 'cpu' in facts:
+            snapshot['cpu_percent'] = facts['cpu']['percent']
+        return snapshot
     
-    def _check_network_connectivity(self) -> List[Dict[str, Any]]:
-        """Check network connectivity."""
+    def _check_network_connectivity(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Check network connectivity against the configured targets (cached briefly)."""
         issues = []
         
-        try:
-            import socket
-            socket.create_connection(("8.8.8.8", 53), timeout=3)
-        except OSError:
+        result = get_connectivity_probe().check(refresh=refresh)
+        if not result['online']:
             issues.append({
+                'id': make_issue_id('network', 'connectivity', 'internet'),
+                'check': 'connectivity',
                 'severity': 'high',
                 'category': 'network',
                 'issue': 'No internet connectivity detected',
                 'fix': 'check_network',
+                'targets': result['targets'],
             })
         
         return issues
     
-    def _check_security_issues(self) -> List[Dict[str, Any]]:
+    def _check_security_issues(self, refresh: bool = False) -> List[Dict[str, Any]]:
         """Check security issues."""
         issues = []
         
-        # Check if firewall is enabled (platform-specific)
+        # Firewall state comes from the shared snapshot (also used by the checker)
         if self.os == 'windows':
-            try:
-                import subprocess
-                result = subprocess.run(
-                    ['netsh', 'advfirewall', 'show', 'allprofiles', 'state'],
-                    capture_output=True,
-                    text=True
-                )
-                if 'OFF' in result.stdout.upper():
-                    issues.append({
-                        'severity': 'medium',
-                        'category': 'security',
-                        'issue': 'Windows Firewall is disabled',
-                        'fix': 'enable_firewall',
-                    })
-            except Exception:
-                pass
+            firewall = self.facts.collect(['firewall'], refresh=refresh).get('firewall')
+            if firewall and not firewall['all_enabled']:
+                issues.append({
+                    'id': make_issue_id('security', 'firewall', self.os),
+                    'check': 'firewall',
+                    'severity': 'medium',
+                    'category': 'security',
+                    'issue': 'Windows Firewall is disabled',
+                    'fix': 'enable_firewall',
+                })
         
         return issues
     
@@ -143,55 +226,117 @@ class ProblemSolver:
         
         print()
     
-    def fix_issues(self, issues: List[Dict[str, Any]]):
-        """Fix detected issues."""
+    def fix_issues(self, issues: List[Dict[str, Any]],
+                   progress: Optional[Callable[[int, int, str], None]] = None,
+                   should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """Fix detected issues and return the result of each fix.
+        
+        Fixes run on a worker pool: independent ones concurrently, ones that
+        share a lock one at a time, dependent ones in order, each with its own
+        timeout. ``progress`` and ``should_stop`` let background jobs report
+        progress and stop starting new fixes.
+        """
         self.logger.info(f"Attempting to fix {len(issues)} issues...")
         
-        for issue in issues:
-            fix_method = issue.get('fix')
-            if fix_method:
-                self._apply_fix(fix_method, issue)
-    
-    def _apply_fix(self, fix_method: str, issue: Dict[str, Any]):
-        """Apply a fix method."""
-        self.logger.info(f"Applying fix: {fix_method}")
-        
-        fixes = {
-            'cleanup_disk': self._fix_disk_space,
-            'free_memory': self._fix_memory,
-            'check_network': self._fix_network,
-            'enable_firewall': self._fix_firewall,
+        fixes = self._fixes()
+        for fix in fixes.values():
+            # Fixes run on pool threads; keep their log lines in the calling job's log
+            fix.func = inherit_job(fix.func)
+        scheduler = FixScheduler(
+            fixes,
+            max_workers=int(get_setting('performance.fix_workers', 4)),
+            logger=self.logger,
+        )
+        outcome = scheduler.run(issues, progress=progress, should_stop=should_stop)
+        if should_stop and should_stop():
+            self.logger.warning("Fixing cancelled")
+        return outcome
+    
+    def fix_diagnosis(self, diagnosis: Diagnosis, issue_ids: Optional[List[str]] = None,
+                      revalidate: bool = False, auto_fix: bool = True,
+                      progress: Optional[Callable[[int, int, str], None]] = None,
+                      should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """Fix issues of a stored diagnosis (all, or ``issue_ids``) without detecting again.
+        
+        With ``revalidate``, the targeted issues are re-checked first and the
+        ones that have gone away are skipped.
+        """
+        issues, unknown = diagnosis.select(issue_ids)
+        resolved = []
+        if revalidate and issues:
+            still_present = self.revalidate(issues)
+            present_ids = {issue['id'] for issue in still_present}
+            resolved = [issue['id'] for issue in issues if issue['id'] not in present_ids]
+            issues = still_present
+        
+        outcome = {'results': [], 'elapsed': 0.0}
+        if auto_fix:
+            outcome = self.fix_issues(issues, progress=progress, should_stop=should_stop)
+        fixed = [issue_id for result in outcome['results'] if result['status'] == 'succeeded'
+                 for issue_id in result['issue_ids']]
+        return {
+            "diagnosis_id": diagnosis.id,
+            "issues_fixed": len(fixed),
+            "fixed": fixed,
+            "resolved": resolved,
+            "unknown_ids": unknown,
+            "results": outcome['results'],
+            "elapsed": outcome['elapsed'],
         }
+    
+    def _fixes(self) -> Dict[str, Fix]:
+        """Available fixes and how they may be scheduled."""
+        def timeout(name: str) -> float:
+            return float(get_setting(f'performance.fix_timeout_seconds.{name}', 60.0))
         
-        fix_func = fixes.get(fix_method)
-        if fix_func:
-            fix_func(issue)
-        else:
-            self.logger.warning(f"Unknown fix method: {fix_method}")
+        return {
+            # Once per issue: each low mount gets its own cleanup
+            'cleanup_disk': Fix('cleanup_disk', self._fix_disk_space, locks=('disk',), idempotent=False,
+                                timeout=timeout('cleanup_disk')),
+            'free_memory': Fix('free_memory', self._fix_memory, timeout=timeout('free_memory')),
+            'check_network': Fix('check_network', self._fix_network, locks=('network',),
+                                 timeout=timeout('check_network')),
+            'enable_firewall': Fix('enable_firewall', self._fix_firewall, locks=('firewall',),
+                                   timeout=timeout('enable_firewall')),
+        }
     
-    def _fix_disk_space(self, issue: Dict[str, Any]):
+    def _fix_disk_space(self, issue: Dict[str, Any], timeout: Optional[float] = None):
         """Fix disk space issues."""
         self.logger.info("Running disk cleanup...")
         
         if self.os == 'windows':
-            try:
-                import subprocess
-                # Run Windows disk cleanup
-                subprocess.run(['cleanmgr', '/d', 'C:'], check=False)
-                self.logger.info("Disk cleanup initiated")
-            except Exception as e:
-                self.logger.error(f"Failed to run disk cleanup: {e}")
+            import subprocess
+            # Run Windows disk cleanup on the issue's drive
+            drive = (issue.get('mountpoint') or 'C:')[:2]
+            subprocess.run(['cleanmgr', '/d', drive], check=False, timeout=timeout)
+            self.logger.info("Disk cleanup initiated")
         else:
+            # Nothing is deleted automatically; point at what is taking the space
+            mountpoint = issue.get('mountpoint') or '/'
+            scan = get_directory_scanner().scan(mountpoint, top=10, timeout=timeout)
+            self.logger.info(f"Largest directories on {mountpoint}:")
+            for item in scan['top_directories']:
+                self.logger.info(f"  {format_bytes(item['bytes']):>10}  {item['path']}")
+            self.logger.info("Largest files:")
+            for item in scan['top_files']:
+                self.logger.info(f"  {format_bytes(item['bytes']):>10}  {item['path']}")
             self.logger.info("Manual disk cleanup recommended")
+            return scan
     
-    def _fix_memory(self, issue: Dict[str, Any]):
+    def _fix_memory(self, issue: Dict[str, Any], timeout: Optional[float] = None):
         """Fix memory issues."""
+        # Nothing is killed automatically; name the processes holding the memory
+        top = get_process_sampler().top(10, sort='memory')
+        self.logger.info("Largest processes by memory:")
+        for proc in top['processes']:
+            self.logger.info(f"  {format_bytes(proc['rss_bytes']):>10}  {proc['name']} (pid {proc['pid']})")
         self.logger.info("Memory cleanup suggestions:")
         self.logger.info("  - Close unnecessary applications")
         self.logger.info("  - Restart the system if needed")
         self.logger.info("  - Check for memory leaks in running processes")
+        return top
     
-    def _fix_network(self, issue: Dict[str, Any]):
+    def _fix_network(self, issue: Dict[str, Any], timeout: Optional[float] = None):
         """Fix network issues."""
         self.logger.info("Network troubleshooting:")
         self.logger.info("  - Check physical connections")
@@ -199,17 +344,14 @@ class ProblemSolver:
         self.logger.info("  - Check DNS settings")
         self.logger.info("  - Contact ISP if problem persists")
     
-    def _fix_firewall(self, issue: Dict[str, Any]):
+    def _fix_firewall(self, issue: Dict[str, Any], timeout: Optional[float] = None):
         """Fix firewall issues."""
         if self.os == 'windows':
             self.logger.info("Enabling Windows Firewall...")
-            try:
-                import subprocess
-                subprocess.run(
-                    ['netsh', 'advfirewall', 'set', 'allprofiles', 'state', 'on'],
-                    check=True
-                )
-                self.logger.info("Windows Firewall enabled")
-            except Exception as e:
-                self.logger.error(f"Failed to enable firewall: {e}")
-
+            import subprocess
+            subprocess.run(
+                ['netsh', 'advfirewall', 'set', 'allprofiles', 'state', 'on'],
+                check=True,
+                timeout=timeout
+            )
+            self.logger.info("Windows Firewall enabled")
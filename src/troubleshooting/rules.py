@@ -0,0 +1,212 @@
+"""
+Threshold Rules
+Compiles threshold rules from config into a per-metric plan and evaluates them against metric snapshots
+"""
+import operator
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.core.config import get_setting
+from src.troubleshooting.diagnoses import make_issue_id
+
+# Levels from most to least severe, with the issue severity each one raises
+LEVELS = (
+    ('critical', 'high'),
+    ('warning', 'medium'),
+)
+
+_OPERATORS = {
+    'above': (operator.gt, 1),
+    'below': (operator.lt, -1),
+}
+
+class Rule:
+    """One compiled rule: a metric, per-level thresholds and the issue it raises.
+
+    A level becomes active once its condition has held for ``sustained``
+    consecutive samples. An active level stays active until the value moves
+    back past its threshold by more than ``hysteresis`` (in metric units),
+    so a value hovering at the threshold doesn't flap.
+    """
+
+    __slots__ = ('name', 'metric', 'category', 'fix', 'compare', 'direction', 'levels',
+                 'messages', 'sustained', 'hysteresis', 'streaks', 'active', 'value',
+                 'least_threshold', 'idle', 'subject')
+
+    def __init__(self, name: str, metric: str, category: str, levels: List[Tuple[str, str, float]],
+                 op: str = 'above', fix: Optional[str] = None, messages: Optional[Dict[str, str]] = None,
+                 sustained: int = 1, hysteresis: float = 0.0, subject: Optional[str] = None):
+        if op not in _OPERATORS:
+            raise ValueError(f"Rule '{name}': op must be one of {', '.join(_OPERATORS)}")
+        if not levels:
+            raise ValueError(f"Rule '{name}': no thresholds configured")
+        self.name = name
+        self.metric = metric
+        self.category = category
+        self.fix = fix
+        self.compare, self.direction = _OPERATORS[op]
+        self.levels = levels  # (level, severity, threshold), most severe first
+        self.messages = messages or {}
+        self.sustained = max(int(sustained), 1)
+        self.hysteresis = float(hysteresis)
+        self.streaks = [0] * len(levels)
+        self.active: Optional[int] = None  # Index into levels
+        self.value: Optional[float] = None
+        self.least_threshold = levels[-1][2]
+        self.idle = True  # Nothing active and no streak running
+        self.subject = subject or metric  # What the issue id names, e.g. a mountpoint
+
+    def observe(self, value: float):
+        """Advance the rule's state by one sample."""
+        self.value = value
+        # Fast path for the common case: healthy and nothing to wind down
+        if self.idle and not self.compare(value, self.least_threshold):
+            return
+        self._step(value)
+
+    def _step(self, value: float):
+        compare = self.compare
+        band = self.hysteresis * self.direction
+        active = None
+        for index, (_, _, threshold) in enumerate(self.levels):
+            if compare(value, threshold):
+                self.streaks[index] += 1
+            else:
+                self.streaks[index] = 0
+            if active is None:
+                if self.streaks[index] >= self.sustained:
+                    active = index
+                elif self.active is not None and self.active <= index and compare(value, threshold - band):
+                    # This level or a more severe one was active; hold it inside the band
+                    active = index
+        self.active = active
+        self.idle = active is None and not any(self.streaks)
+
+    def evaluate_once(self, value: float) -> Optional[int]:
+        """Level index a single reading reaches, ignoring sustain and hysteresis state."""
+        for index, (_, _, threshold) in enumerate(self.levels):
+            if self.compare(value, threshold):
+                return index
+        return None
+
+    def issue(self, index: int, value: float) -> Dict[str, Any]:
+        level, severity, threshold = self.levels[index]
+        template = self.messages.get(level, f"{self.metric} {level} ({{value:.1f}}, threshold {{threshold}})")
+        return {
+            'id': make_issue_id(self.category, self.name, self.subject),
+            'severity': severity,
+            'category': self.category,
+            'issue': template.format(value=value, threshold=threshold, level=level, subject=self.subject),
+            'fix': self.fix,
+            'check': self.name,
+            'rule': self.name,
+            'level': level,
+            'metric': self.metric,
+            'value': value,
+            'threshold': threshold,
+        }
+
+class RuleEngine:
+    """Evaluate compiled rules in one pass over a metric snapshot.
+
+    Rules are grouped by metric at compile time, so a snapshot lookup happens
+    once per metric however many rules read it. ``observe`` feeds a sample
+    to the stateful (sustain/hysteresis) evaluation; ``active_issues`` reads
+    the current result without touching the host.
+    """
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        plan: Dict[str, List[Rule]] = {}
+        for rule in rules:
+            plan.setdefault(rule.metric, []).append(rule)
+        self._plan = list(plan.items())
+        self._lock = threading.Lock()
+        self.last_observed: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, rules_config: Optional[Dict[str, Dict[str, Any]]] = None,
+                    thresholds: Optional[Dict[str, Any]] = None) -> 'RuleEngine':
+        """Compile the ``rules`` config section.
+
+        A rule's ``warning``/``critical`` thresholds default to
+        ``thresholds.<rule>_warning`` and ``thresholds.<rule>_critical``, so
+        the existing threshold settings drive the built-in rules.
+        """
+        if rules_config is None:
+            rules_config = get_setting('rules', {}) or {}
+        if thresholds is None:
+            thresholds = get_setting('thresholds', {}) or {}
+
+        rules = []
+        for name, spec in rules_config.items():
+            if 'metric' not in spec:
+                raise ValueError(f"Rule '{name}': metric is required")
+            levels = []
+            for level, severity in LEVELS:
+                threshold = spec.get(level, thresholds.get(f'{name}_{level}'))
+                if threshold is not None:
+                    levels.append((level, severity, float(threshold)))
+            rules.append(Rule(
+                name=name,
+                metric=spec['metric'],
+                category=spec.get('category', name),
+                levels=levels,
+                op=spec.get('op', 'above'),
+                fix=spec.get('fix'),
+                messages=spec.get('messages'),
+                sustained=spec.get('sustained', 1),
+                hysteresis=spec.get('hysteresis', 0),
+            ))
+        return cls(rules)
+
+    def observe(self, snapshot: Dict[str, Optional[float]]):
+        """Feed one sample of metrics to every rule that reads them."""
+        with self._lock:
+            for metric, rules in self._plan:
+                value = snapshot.get(metric)
+                if value is None or value != value:  # Missing or NaN: keep state
+                    continue
+                for rule in rules:
+                    rule.observe(value)
+            self.last_observed = time.monotonic()
+
+    def fresh(self, max_age: float) -> bool:
+        """Whether samples have been fed within ``max_age`` seconds."""
+        return self.last_observed is not None and time.monotonic() - self.last_observed <= max_age
+
+    def active_issues(self, names: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Issues for every rule with an active level, optionally only the named rules."""
+        names = set(names) if names is not None else None
+        with self._lock:
+            return [rule.issue(rule.active, rule.value) for rule in self.rules
+                    if rule.active is not None and (names is None or rule.name in names)]
+
+    def evaluate(self, snapshot: Dict[str, Optional[float]],
+                 names: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Issues for a single snapshot, without sustain or hysteresis (no history to apply them to)."""
+        names = set(names) if names is not None else None
+        issues = []
+        for metric, rules in self._plan:
+            value = snapshot.get(metric)
+            if value is None or value != value:
+                continue
+            for rule in rules:
+                if names is not None and rule.name not in names:
+                    continue
+                index = rule.evaluate_once(value)
+                if index is not None:
+                    issues.append(rule.issue(index, value))
+        return issues
+
+_engine: Optional[RuleEngine] = None
+_engine_lock = threading.Lock()
+
+def get_rule_engine() -> RuleEngine:
+    """Return the process-wide rule engine, compiled from config on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = RuleEngine.from_config()
+        return _engine
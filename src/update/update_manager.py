@@ -1,7 +1,9 @@
 import subprocess
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable, Optional
 from pathlib import Path
 
+from src.core.package_backends import get_package_backends
+
 class UpdateManager:
     """Manage system and software updates."""
     
@@ -10,14 +12,25 @@ class UpdateManager:
         self.logger = logger
         self.os = platform_info['os']
     
-    def check_and_update(self):
-        """Check for and apply updates."""
+    def check_and_update(self, progress: Optional[Callable[[int, int, str], None]] = None,
+                         should_stop: Optional[Callable[[], bool]] = None):
+        """Check for and apply updates.
+        
+        ``progress(current, total, message)`` is called before each package
+        manager is queried and ``should_stop()`` is checked before each one,
+        so background jobs can report progress and be cancelled.
+        """
         self.logger.info("Checking for updates...")
         
         if self.os == 'windows':
+            if should_stop and should_stop():
+                self.logger.warning("Update check cancelled")
+                return
+            if progress:
+                progress(0, 1, "Checking Windows updates")
             self._check_windows_updates()
         elif self.os == 'linux':
-            self._check_linux_updates()
+            self._check_linux_updates(progress, should_stop)
     
     def _check_windows_updates(self):
         """Check for Windows updates."""
@@ -52,39 +65,59 @@ class UpdateManager:
         except Exception as e:
             self.logger.error(f"Failed to check Windows updates: {e}")
     
-    def _check_linux_updates(self):
+    def _check_linux_updates(self, progress: Optional[Callable[[int, int, str], None]] = None,
+                             should_stop: Optional[Callable[[], bool]] = None):
         """Check for Linux updates."""
         self.logger.info("Checking Linux updates...")
         
+        backends = get_package_backends()
+        rpm_manager = 'yum' if backends.has('yum') else 'dnf' if backends.has('dnf') else None
+        managers = [name for name in ('apt', rpm_manager) if name and backends.has(name)]
+        
+        def step(name: str) -> bool:
+            """Report progress before querying ``name``; False if the check was cancelled."""
+            if should_stop and should_stop():
+                self.logger.warning("Update check cancelled")
+                return False
+            if progress:
+                progress(managers.index(name), len(managers), f"Checking {name} updates")
+            return True
+        
         # Try apt (Debian/Ubuntu)
-        try:
-            result = subprocess.run(
-                ['apt', 'list', '--upgradable'],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                updates = [line for line in result.stdout.split('\n') if '/' in line]
-                if updates:
-                    self.logger.info(f"Found {len(updates)} packages with updates available")
-                else:
-                    self.logger.info("System is up to date")
+        if backends.has('apt'):
+            if not step('apt'):
                 return
-        except Exception:
-            pass
+            try:
+                result = subprocess.run(
+                    ['apt', 'list', '--upgradable'],
+                    capture_output=True,
+                    text=True
+                )
+                if result.returncode == 0:
+                    updates = [line for line in result.stdout.split('\n') if '/' in line]
+                    if updates:
+                        self.logger.info(f"Found {len(updates)} packages with updates available")
+                    else:
+                        self.logger.info("System is up to date")
+                    return
+            except Exception:
+                pass
         
         # Try yum/dnf (RedHat/CentOS)
-        try:
-            result = subprocess.run(
-                ['yum', 'check-update'],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0 or result.returncode == 100:
-                self.logger.info("Update check completed")
-            return
-        except Exception:
-            pass
+        if rpm_manager:
+            if not step(rpm_manager):
+                return
+            try:
+                result = subprocess.run(
+                    [rpm_manager, 'check-update'],
+                    capture_output=True,
+                    text=True
+                )
+                if result.returncode == 0 or result.returncode == 100:
+                    self.logger.info("Update check completed")
+                return
+            except Exception:
+                pass
         
         self.logger.warning("Could not determine update status")
 
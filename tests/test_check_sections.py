@@ -0,0 +1,32 @@
+"""Tests for section selection on the HTTP check endpoints."""
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.server import app
+from src.checker.environment_checker import EnvironmentChecker, SectionSelectionError
+
+@pytest.fixture
+def client():
+    # Not entered as a context manager, so the lifespan samplers don't start
+    return TestClient(app)
+
+def test_select_sections_rejects_empty_list():
+    with pytest.raises(SectionSelectionError):
+        EnvironmentChecker.select_sections([])
+
+def test_select_sections_none_selects_all():
+    assert EnvironmentChecker.select_sections(None) == list(EnvironmentChecker.SECTIONS)
+
+@pytest.mark.parametrize('path', ['/api/v1/check', '/api/v1/check/stream'])
+def test_empty_sections_is_bad_request(client, path):
+    response = client.post(path, json={'sections': []})
+
+    assert response.status_code == 400
+    assert 'No sections selected' in response.json()['detail']
+
+@pytest.mark.parametrize('path', ['/api/v1/check', '/api/v1/check/stream'])
+def test_unknown_section_is_bad_request(client, path):
+    response = client.post(path, json={'sections': ['bogus']})
+
+    assert response.status_code == 400
+    assert 'bogus' in response.json()['detail']
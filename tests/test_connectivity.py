@@ -0,0 +1,95 @@
+"""Tests for the connectivity probe against local listeners."""
+import asyncio
+import socket
+
+import pytest
+
+from src.checker import connectivity
+from src.checker.connectivity import ConnectivityProbe, format_target, parse_target
+
+@pytest.fixture
+def listener():
+    """A 127.0.0.1 socket that accepts connections."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(8)
+    yield f"127.0.0.1:{sock.getsockname()[1]}"
+    sock.close()
+
+@pytest.fixture
+def closed_port():
+    """A port that was just released, so connecting to it is refused."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"127.0.0.1:{port}"
+
+@pytest.fixture
+def silent_target(monkeypatch):
+    """A target whose connection attempt never completes, like dropped SYNs."""
+    target = '192.0.2.1:53'  # TEST-NET-1, never routed
+    open_connection = asyncio.open_connection
+
+    async def fake_open_connection(host, port, **kwargs):
+        if format_target((host, port)) == target:
+            await asyncio.sleep(3600)
+        return await open_connection(host, port, **kwargs)
+
+    monkeypatch.setattr(connectivity.asyncio, 'open_connection', fake_open_connection)
+    return target
+
+def probe(*targets, timeout=0.2):
+    return asyncio.run(ConnectivityProbe(targets=list(targets), timeout=timeout).probe())
+
+def statuses(result):
+    return {entry['target']: entry['status'] for entry in result['targets']}
+
+def test_ok(listener):
+    result = probe(listener)
+
+    assert result['online']
+    assert result['target'] == listener
+    assert result['latency_ms'] is not None
+    assert statuses(result) == {listener: 'ok'}
+
+def test_refused(closed_port):
+    result = probe(closed_port)
+
+    assert not result['online']
+    assert result['target'] is None
+    assert statuses(result) == {closed_port: 'refused'}
+
+def test_timeout(silent_target):
+    result = probe(silent_target, timeout=0.1)
+
+    assert not result['online']
+    assert statuses(result) == {silent_target: 'timeout'}
+    assert result['elapsed_ms'] >= 100
+
+def test_offline_when_every_target_fails(closed_port, silent_target):
+    result = probe(closed_port, silent_target, timeout=0.1)
+
+    assert not result['online']
+    assert statuses(result) == {closed_port: 'refused', silent_target: 'timeout'}
+
+def test_first_success_cancels_the_rest(listener, closed_port, silent_target):
+    result = probe(silent_target, closed_port, listener, timeout=5)
+
+    assert result['online']
+    assert result['target'] == listener
+    # Answered without waiting out the silent target's timeout
+    assert result['elapsed_ms'] < 5000
+    assert statuses(result)[silent_target] == 'cancelled'
+    assert [entry['target'] for entry in result['targets']] == [silent_target, closed_port, listener]
+
+def test_parse_target():
+    assert parse_target('example.com:443') == ('example.com', 443)
+    assert parse_target('[::1]:53') == ('::1', 53)
+    assert parse_target({'host': '10.0.0.1', 'port': '80'}) == ('10.0.0.1', 80)
+    assert format_target(('::1', 53)) == '[::1]:53'
+    with pytest.raises(ValueError):
+        parse_target('no-port')
+
+def test_default_targets():
+    assert ConnectivityProbe(targets=None).targets == [parse_target(t) for t in connectivity.DEFAULT_TARGETS]
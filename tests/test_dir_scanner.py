@@ -0,0 +1,88 @@
+"""Tests for the directory scanner's hard-link handling and listing cache."""
+import os
+
+import pytest
+
+from src.checker import dir_scanner
+from src.checker.dir_scanner import DirectoryScanner
+
+@pytest.fixture(autouse=True)
+def list_small_files(monkeypatch):
+    monkeypatch.setattr(dir_scanner, 'MIN_LISTED_FILE_BYTES', 1)
+
+def write(path, size):
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+
+def test_hard_links_are_counted_once(tmp_path):
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    write(tmp_path / 'a' / 'data', 256 * 1024)
+    os.link(tmp_path / 'a' / 'data', tmp_path / 'b' / 'data')
+
+    result = DirectoryScanner(workers=2).scan(str(tmp_path))
+    single = os.stat(tmp_path / 'a' / 'data').st_blocks * 512
+    dirs = sum(os.stat(path).st_blocks * 512 for path in (tmp_path, tmp_path / 'a', tmp_path / 'b'))
+
+    assert result['files'] == 2
+    assert result['hardlinks_skipped'] == 1
+    assert len(result['top_files']) == 1
+    assert result['top_files'][0]['bytes'] == single
+    assert result['total_bytes'] == dirs + single
+
+def test_truncated_listing_is_relisted_for_a_larger_top(tmp_path):
+    for i in range(15):
+        write(tmp_path / f'file{i}', (i + 1) * 8192)
+    scanner = DirectoryScanner(workers=2)
+
+    first = scanner.scan(str(tmp_path), top=10)
+    larger = scanner.scan(str(tmp_path), top=20)
+    smaller = scanner.scan(str(tmp_path), top=10)
+
+    assert len(first['top_files']) == 10
+    assert first['top_files'][0]['path'] == str(tmp_path / 'file14')
+    assert larger['listed_directories'] == 1
+    assert len(larger['top_files']) == 15
+    assert smaller['cached_directories'] == 1
+    assert len(smaller['top_files']) == 10
+
+def test_only_changed_directories_are_relisted(tmp_path):
+    for name in ('a', 'b', 'c'):
+        (tmp_path / name).mkdir()
+        write(tmp_path / name / 'data', 8192)
+    scanner = DirectoryScanner(workers=2)
+    scanner.scan(str(tmp_path))
+
+    write(tmp_path / 'b' / 'more', 8192)
+    result = scanner.scan(str(tmp_path))
+
+    assert result['listed_directories'] == 1
+    assert result['cached_directories'] == 3
+    assert result['files'] == 4
+
+def test_deleted_directories_are_pruned(tmp_path):
+    for name in ('keep', 'drop'):
+        (tmp_path / name).mkdir()
+        write(tmp_path / name / 'data', 8192)
+    scanner = DirectoryScanner(workers=2)
+    scanner.scan(str(tmp_path))
+    assert str(tmp_path / 'drop') in scanner._cache
+
+    os.remove(tmp_path / 'drop' / 'data')
+    os.rmdir(tmp_path / 'drop')
+    scanner.scan(str(tmp_path))
+
+    assert str(tmp_path / 'drop') not in scanner._cache
+    assert str(tmp_path / 'keep') in scanner._cache
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    for name in ('a', 'b', 'c'):
+        (tmp_path / name).mkdir()
+    scanner = DirectoryScanner(workers=1, max_cached_dirs=2)
+
+    result = scanner.scan(str(tmp_path))
+
+    assert result['directories'] == 4
+    assert len(scanner._cache) == 2
+    # The root is listed first, so it is the first evicted
+    assert str(tmp_path) not in scanner._cache
@@ -0,0 +1,60 @@
+"""Tests for reading mount usage when some mounts hang."""
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.checker import disk_usage
+from src.checker.disk_usage import DiskUsageReader
+
+HUNG = [f'/mnt/hung{i}' for i in range(12)]
+
+@pytest.fixture
+def hung(monkeypatch):
+    event = threading.Event()
+    calls = []
+
+    def usage(mountpoint):
+        calls.append(mountpoint)
+        if mountpoint in HUNG:
+            event.wait(10)
+        return {'total': 100, 'used': 40, 'free': 60, 'percent': 40.0}
+
+    monkeypatch.setattr(disk_usage, '_usage', usage)
+    yield SimpleNamespace(release=event.set, calls=calls)
+    event.set()
+
+def mounts(*mountpoints):
+    return [{'device': mountpoint, 'mountpoint': mountpoint, 'fstype': 'nfs'} for mountpoint in mountpoints]
+
+def test_hung_mounts_dont_starve_healthy_ones(hung):
+    reader = DiskUsageReader(timeout=0.3)
+
+    results = {item['mountpoint']: item for item in reader.read(mounts(*HUNG, '/'))}
+
+    assert results['/']['percent'] == 40.0
+    assert all(results[mountpoint]['error'] == 'timeout' for mountpoint in HUNG)
+
+def test_stuck_mount_is_not_queried_again_until_it_returns(hung):
+    reader = DiskUsageReader(timeout=0.2)
+    reader.read(mounts(HUNG[0], '/'))
+
+    second = reader.read(mounts(HUNG[0], '/'))
+
+    assert second[0]['error'] == 'timeout'
+    assert hung.calls.count(HUNG[0]) == 1
+
+    hung.release()
+    reader._stuck[HUNG[0]].result(timeout=5)
+    third = reader.read(mounts(HUNG[0], '/'))
+
+    assert third[0]['percent'] == 40.0
+    assert hung.calls.count(HUNG[0]) == 2
+
+def test_errors_are_reported_per_mount(monkeypatch):
+    def usage(mountpoint):
+        raise PermissionError(f'denied: {mountpoint}')
+
+    monkeypatch.setattr(disk_usage, '_usage', usage)
+
+    assert DiskUsageReader(timeout=1).read(mounts('/x'))[0]['error'] == 'denied: /x'
@@ -0,0 +1,138 @@
+"""Tests for the dpkg status-file reader, using synthetic status files."""
+import os
+
+import pytest
+
+from src.checker import dpkg_status
+from src.checker.dpkg_status import DpkgStatusReader, is_installed, iter_dpkg_status
+
+STATUS = """\
+Package: bash
+Status: install ok installed
+Priority: required
+Architecture: amd64
+Version: 5.2.15-2+b2
+Description: GNU Bourne Again SHell
+ Bash is an sh-compatible command language interpreter.
+ .
+ Package: not-a-real-field
+Conffiles:
+ /etc/bash.bashrc 89269e1298235f1b12b4c16e4065ad0d
+
+Package: oldlib
+Status: deinstall ok config-files
+Architecture: amd64
+Version: 1.0-1
+
+Package: half
+Status: install reinstreq half-installed
+Architecture: all
+Version: 0.9
+
+Package: zlib1g
+Status: install ok installed
+Architecture: amd64
+Version: 1:1.2.13.dfsg-1"""  # No trailing newline after the last stanza
+
+@pytest.fixture
+def status_file(tmp_path):
+    path = tmp_path / 'status'
+    path.write_text(STATUS)
+    return path
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    calls = []
+    original = dpkg_status.iter_dpkg_status
+
+    def counting(path):
+        calls.append(path)
+        return original(path)
+
+    monkeypatch.setattr(dpkg_status, 'iter_dpkg_status', counting)
+    return calls
+
+def test_parses_every_stanza(status_file):
+    records = list(iter_dpkg_status(str(status_file)))
+
+    assert [r['name'] for r in records] == ['bash', 'oldlib', 'half', 'zlib1g']
+    assert records[0] == {
+        'name': 'bash',
+        'status': 'install ok installed',
+        'architecture': 'amd64',
+        'version': '5.2.15-2+b2',
+    }
+
+def test_skips_continuation_lines(status_file):
+    bash = next(iter_dpkg_status(str(status_file)))
+
+    # The indented "Package:" inside the description must not rename the record
+    assert bash['name'] == 'bash'
+    assert 'description' not in bash
+
+def test_last_stanza_without_trailing_newline(status_file):
+    records = list(iter_dpkg_status(str(status_file)))
+
+    assert records[-1]['name'] == 'zlib1g'
+    assert records[-1]['version'] == '1:1.2.13.dfsg-1'
+
+def test_is_installed(status_file):
+    installed = {r['name']: is_installed(r) for r in iter_dpkg_status(str(status_file))}
+
+    assert installed == {'bash': True, 'oldlib': False, 'half': False, 'zlib1g': True}
+    assert not is_installed({'name': 'nostatus'})
+
+def test_reader_returns_installed_only(status_file):
+    reader = DpkgStatusReader(str(status_file))
+
+    assert reader.available()
+    assert [p['name'] for p in reader.installed_packages()] == ['bash', 'zlib1g']
+
+def test_reader_unavailable(tmp_path):
+    assert not DpkgStatusReader(str(tmp_path / 'missing')).available()
+
+def test_unchanged_file_is_parsed_once(status_file, parse_count):
+    reader = DpkgStatusReader(str(status_file))
+    reader.installed_packages()
+    reader.installed_packages()
+
+    assert len(parse_count) == 1
+
+def test_replaced_file_is_reparsed(status_file, parse_count):
+    reader = DpkgStatusReader(str(status_file))
+    reader.installed_packages()
+    st = os.stat(status_file)
+
+    # dpkg writes status-new and renames it over status: a new inode, same mtime and size
+    replacement = status_file.with_name('status-new')
+    replacement.write_text(STATUS.replace('5.2.15-2+b2', '5.2.15-2+b3'))
+    os.utime(replacement, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(replacement, status_file)
+
+    packages = reader.installed_packages()
+    assert len(parse_count) == 2
+    assert packages[0]['version'] == '5.2.15-2+b3'
+
+def test_mtime_change_is_reparsed(status_file, parse_count):
+    reader = DpkgStatusReader(str(status_file))
+    reader.installed_packages()
+    st = os.stat(status_file)
+
+    os.utime(status_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    reader.installed_packages()
+    assert len(parse_count) == 2
+
+def test_size_change_is_reparsed(status_file, parse_count):
+    reader = DpkgStatusReader(str(status_file))
+    reader.installed_packages()
+    st = os.stat(status_file)
+
+    # Rewritten in place within the same mtime tick
+    with open(status_file, 'a') as f:
+        f.write('\n\nPackage: extra\nStatus: install ok installed\nVersion: 1\n')
+    os.utime(status_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    packages = reader.installed_packages()
+    assert len(parse_count) == 2
+    assert [p['name'] for p in packages] == ['bash', 'zlib1g', 'extra']
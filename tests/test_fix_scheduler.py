@@ -0,0 +1,108 @@
+"""Tests for scheduling fixes by dependencies, locks and timeouts."""
+import threading
+import time
+
+import pytest
+
+from src.troubleshooting.fix_scheduler import Fix, FixScheduler, FixTask
+
+def issues(*names):
+    return [{'id': f'issue-{name}', 'fix': name} for name in names]
+
+def statuses(result):
+    return {item['fix']: item['status'] for item in result['results']}
+
+def errors(result):
+    return {item['fix']: item.get('error') for item in result['results']}
+
+def succeed(issue, timeout):
+    return issue['id']
+
+def test_failed_dependency_skips_dependents():
+    def fail(issue, timeout):
+        raise RuntimeError('apt is broken')
+
+    scheduler = FixScheduler({
+        'repair': Fix('repair', fail),
+        'install': Fix('install', succeed, depends_on=('repair',)),
+        'other': Fix('other', succeed),
+    })
+    result = scheduler.run(issues('install', 'repair', 'other'))
+
+    assert statuses(result) == {'install': FixTask.SKIPPED, 'repair': FixTask.FAILED, 'other': FixTask.SUCCEEDED}
+    assert errors(result)['install'] == 'Dependency repair failed'
+    assert errors(result)['repair'] == 'apt is broken'
+
+def test_shared_lock_serializes_fixes():
+    active = []
+    peak = []
+    guard = threading.Lock()
+
+    def locked(issue, timeout):
+        with guard:
+            active.append(issue['id'])
+            peak.append(len(active))
+        time.sleep(0.05)
+        with guard:
+            active.remove(issue['id'])
+
+    scheduler = FixScheduler({
+        'one': Fix('one', locked, locks=('package_manager',)),
+        'two': Fix('two', locked, locks=('package_manager',)),
+        'three': Fix('three', locked, locks=('package_manager',)),
+    }, max_workers=3)
+    result = scheduler.run(issues('one', 'two', 'three'))
+
+    assert set(statuses(result).values()) == {FixTask.SUCCEEDED}
+    assert max(peak) == 1
+
+def test_overrun_times_out_and_skips_lock_waiters():
+    release = threading.Event()
+
+    def hang(issue, timeout):
+        release.wait(5)
+
+    scheduler = FixScheduler({
+        'slow': Fix('slow', hang, locks=('firewall',), timeout=0.1),
+        'waiter': Fix('waiter', succeed, locks=('firewall',)),
+        'free': Fix('free', succeed),
+    })
+    try:
+        result = scheduler.run(issues('slow', 'waiter', 'free'))
+    finally:
+        release.set()
+
+    assert statuses(result) == {'slow': FixTask.TIMEOUT, 'waiter': FixTask.SKIPPED, 'free': FixTask.SUCCEEDED}
+    assert errors(result)['waiter'] == "Lock 'firewall' held by timed-out fix slow"
+    assert result['elapsed'] < 2
+
+def test_should_stop_cancels_pending_fixes():
+    stop = threading.Event()
+
+    def first(issue, timeout):
+        stop.set()
+
+    scheduler = FixScheduler({
+        'first': Fix('first', first),
+        'second': Fix('second', succeed, depends_on=('first',)),
+    })
+    result = scheduler.run(issues('first', 'second'), should_stop=stop.is_set)
+
+    assert statuses(result) == {'first': FixTask.SUCCEEDED, 'second': FixTask.CANCELLED}
+
+def test_dependency_cycle_is_rejected():
+    scheduler = FixScheduler({
+        'a': Fix('a', succeed, depends_on=('b',)),
+        'b': Fix('b', succeed, depends_on=('a',)),
+        'c': Fix('c', succeed),
+    })
+
+    with pytest.raises(ValueError, match='cycle: a, b'):
+        scheduler.run(issues('a', 'b', 'c'))
+
+def test_non_idempotent_fix_runs_per_issue():
+    scheduler = FixScheduler({'cleanup': Fix('cleanup', succeed, idempotent=False)})
+    result = scheduler.run([{'id': 'root', 'fix': 'cleanup'}, {'id': 'home', 'fix': 'cleanup'}])
+
+    assert [item['output'] for item in result['results']] == ['root', 'home']
+    assert [item['fix'] for item in result['results']] == ['cleanup#root', 'cleanup#home']
@@ -0,0 +1,81 @@
+"""Tests for background job status and cancellation."""
+import threading
+
+import pytest
+
+from src.core.jobs import Job, JobManager
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=1)
+    yield manager
+    manager.shutdown()
+
+def run_with_cancel(manager, body):
+    """Submit ``body(job, started)`` and cancel it once it signals ``started``."""
+    started = threading.Event()
+    release = threading.Event()
+    job = manager.submit('test', lambda job: body(job, started, release))
+    assert started.wait(5)
+    manager.cancel(job.id)
+    release.set()
+    job.future.result(timeout=5)
+    return job
+
+def test_succeeds(manager):
+    job = manager.submit('test', lambda job: {'ok': True})
+    job.future.result(timeout=5)
+
+    assert job.status == Job.SUCCEEDED
+    assert job.result == {'ok': True}
+
+def test_failure_is_recorded(manager):
+    def body(job):
+        raise RuntimeError('boom')
+
+    job = manager.submit('test', body)
+    job.future.result(timeout=5)
+
+    assert job.status == Job.FAILED
+    assert job.error == 'boom'
+
+def test_body_that_stops_early_is_cancelled(manager):
+    def body(job, started, release):
+        done = []
+        for step in range(3):
+            if job.should_stop():
+                break
+            started.set()
+            release.wait(5)
+            done.append(step)
+        return done
+
+    job = run_with_cancel(manager, body)
+
+    assert job.status == Job.CANCELLED
+    assert job.result == [0]
+
+def test_body_that_finishes_despite_cancel_succeeds(manager):
+    # The cancel arrives during the last step, so every step ran
+    def body(job, started, release):
+        started.set()
+        release.wait(5)
+        return 'installed'
+
+    job = run_with_cancel(manager, body)
+
+    assert job.status == Job.SUCCEEDED
+    assert job.to_dict()['cancel_requested']
+
+def test_queued_job_never_starts(manager):
+    release = threading.Event()
+    blocker = manager.submit('block', lambda job: release.wait(5))
+    ran = []
+    queued = manager.submit('test', lambda job: ran.append(True))
+
+    manager.cancel(queued.id)
+    release.set()
+    blocker.future.result(timeout=5)
+
+    assert queued.status == Job.CANCELLED
+    assert ran == []
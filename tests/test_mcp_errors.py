@@ -0,0 +1,43 @@
+"""Tests for JSON-RPC error codes returned by the MCP server."""
+import pytest
+
+from src.api.mcp_server import MCPServer
+
+@pytest.fixture
+def server():
+    return MCPServer()
+
+def call(server, method, params=None):
+    return server.handle_request({'jsonrpc': '2.0', 'id': 7, 'method': method, 'params': params or {}})
+
+def test_unknown_section_is_invalid_params(server):
+    error = call(server, 'mcp.check_environment', {'sections': ['bogus']})['error']
+
+    assert error['code'] == -32602
+    assert 'bogus' in error['data']
+
+def test_unknown_job_is_invalid_params(server):
+    assert call(server, 'mcp.job_status', {'job_id': 'missing'})['error']['code'] == -32602
+    assert call(server, 'mcp.cancel_job', {'job_id': 'missing'})['error']['code'] == -32602
+
+def test_unknown_diagnosis_is_invalid_params(server):
+    assert call(server, 'mcp.fix_issues', {'diagnosis_id': 'missing'})['error']['code'] == -32602
+
+def test_internal_value_error_is_internal_error(server):
+    def broken(params):
+        raise ValueError('mmap closed or invalid')
+
+    server.methods['mcp.list_jobs'] = broken
+    response = call(server, 'mcp.list_jobs')
+
+    assert response['id'] == 7
+    assert response['error']['code'] == -32603
+
+def test_unknown_method(server):
+    assert call(server, 'mcp.nope')['error']['code'] == -32601
+
+def test_empty_section_list_is_invalid_params(server):
+    error = call(server, 'mcp.check_environment', {'sections': []})['error']
+
+    assert error['code'] == -32602
+    assert 'No sections selected' in error['data']
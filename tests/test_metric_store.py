@@ -0,0 +1,148 @@
+"""Tests for the memory-mapped metric store: rollups, queries and concurrent readers."""
+import math
+import os
+import sys
+import threading
+from array import array
+
+import pytest
+
+from src.core.metric_store import DAY, NAN, RAW_FIELDS, MetricFile, MetricStore
+
+DAY0 = 1_700_006_400  # A UTC midnight
+
+def make_store(tmp_path, **kwargs):
+    options = dict(root=str(tmp_path), metrics=['cpu', 'mem'], resolution=60,
+                   raw_retention_days=1000, rollups=[(3600, 1000)])
+    options.update(kwargs)
+    return MetricStore(**options)
+
+def write_raw_day(store, day_start, cpu, mem=None):
+    """Write a raw day file; ``cpu``/``mem`` map slot -> value, other slots are NaN."""
+    slots = DAY // store.resolution
+    columns = {}
+    for metric, values in (('cpu', cpu), ('mem', mem or {})):
+        column = array('d', [NAN]) * slots
+        for slot, value in values.items():
+            column[slot] = value
+        columns[(metric, 'value')] = column
+    path = store.path(store.resolution, day_start)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    MetricFile.write_file(path, store.resolution, day_start, store.metrics, RAW_FIELDS, columns)
+
+def test_append_and_query_raw(tmp_path):
+    store = make_store(tmp_path)
+    for minute in range(5):
+        store.append(DAY0 + minute * 60, {'cpu': float(minute), 'mem': None})
+    store.close()
+
+    points = store.query('cpu', DAY0, DAY0 + 600, step=120)
+    assert points == [
+        {'t': DAY0, 'min': 0.0, 'max': 1.0, 'avg': 0.5},
+        {'t': DAY0 + 120, 'min': 2.0, 'max': 3.0, 'avg': 2.5},
+        {'t': DAY0 + 240, 'min': 4.0, 'max': 4.0, 'avg': 4.0},
+    ]
+    assert store.query('mem', DAY0, DAY0 + 600, step=120) == []
+
+def test_unknown_metric(tmp_path):
+    with pytest.raises(ValueError):
+        make_store(tmp_path).query('disk', DAY0, DAY0 + 60, step=60)
+
+def test_roll_up_min_max_avg(tmp_path):
+    store = make_store(tmp_path)
+    # Hour 0: 60 minutes of 0..59. Hour 1: two samples, the rest missing. Hour 2: nothing
+    cpu = {minute: float(minute) for minute in range(60)}
+    cpu.update({60: 10.0, 75: 30.0})
+    write_raw_day(store, DAY0, cpu, mem={0: 5.0})
+
+    result = store.compact(now=DAY0 + 2 * DAY)
+    assert result == {'rolled_up': 1, 'removed': 0}
+
+    rollup = MetricFile.open(store.path(3600, DAY0))
+    try:
+        assert rollup.fields == ['min', 'max', 'avg']
+        with rollup.column('cpu', 'min') as mins, rollup.column('cpu', 'max') as maxs, \
+                rollup.column('cpu', 'avg') as avgs:
+            assert (mins[0], maxs[0], avgs[0]) == (0.0, 59.0, 29.5)
+            assert (mins[1], maxs[1], avgs[1]) == (10.0, 30.0, 20.0)
+            assert all(math.isnan(v) for v in (mins[2], maxs[2], avgs[2]))
+        with rollup.column('mem', 'avg') as avgs:
+            assert avgs[0] == 5.0
+    finally:
+        rollup.close()
+
+    # Compaction is idempotent
+    assert store.compact(now=DAY0 + 2 * DAY) == {'rolled_up': 0, 'removed': 0}
+
+def test_query_reads_rollup_for_coarse_steps(tmp_path):
+    store = make_store(tmp_path)
+    write_raw_day(store, DAY0, {minute: float(minute) for minute in range(120)})
+    store.compact(now=DAY0 + 2 * DAY)
+
+    # A 2 h step reads the hourly rollup: bucket avg is the mean of the hourly avgs
+    points = store.query('cpu', DAY0, DAY0 + DAY - 1, step=7200)
+    assert points == [{'t': DAY0, 'min': 0.0, 'max': 119.0, 'avg': 59.5}]
+
+    # Once the raw day is gone, fine steps fall back to the rollup
+    store._forget(store.path(60, DAY0))
+    os.remove(store.path(60, DAY0))
+    assert store.query('cpu', DAY0, DAY0 + 7199, step=60) == [
+        {'t': DAY0, 'min': 0.0, 'max': 59.0, 'avg': 29.5},
+        {'t': DAY0 + 3600, 'min': 60.0, 'max': 119.0, 'avg': 89.5},
+    ]
+
+def test_retention_removes_old_files(tmp_path):
+    store = make_store(tmp_path, raw_retention_days=2, rollups=[(3600, 4)])
+    for day in range(4):
+        write_raw_day(store, DAY0 + day * DAY, {0: 1.0})
+    result = store.compact(now=DAY0 + 5 * DAY)
+
+    # Raw days ending at or before now - 2 days, and rollups before now - 4 days, are removed
+    assert store._days(60) == [DAY0 + 3 * DAY]
+    assert store._days(3600) == [DAY0 + day * DAY for day in range(1, 4)]
+    assert result == {'rolled_up': 4, 'removed': 4}
+
+def test_concurrent_queries_with_eviction_and_compaction(tmp_path):
+    store = make_store(tmp_path, max_open_files=2, raw_retention_days=1000, rollups=[(3600, 1000)])
+    days = 10
+    for day in range(days):
+        write_raw_day(store, DAY0 + day * DAY, {slot: float(day) for slot in range(0, 1440, 7)})
+    end = DAY0 + days * DAY - 1
+    expected = store.query('cpu', DAY0, end, step=DAY)
+    assert [p['avg'] for p in expected] == [float(day) for day in range(days)]
+
+    errors = []
+    stop = threading.Event()
+
+    def query():
+        try:
+            for _ in range(200):
+                assert store.query('cpu', DAY0, end, step=DAY) == expected
+        except Exception as e:
+            errors.append(e)
+
+    def churn():
+        # Compaction writes rollups and drops readers while queries hold them
+        while not stop.is_set():
+            store.compact(now=end + DAY)
+            for day in range(days):
+                store._forget(store.path(3600, DAY0 + day * DAY))
+
+    # Switch threads as often as possible so evictions land between lookup and read
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    churner = threading.Thread(target=churn)
+    churner.start()
+    threads = [threading.Thread(target=query) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stop.set()
+    churner.join()
+    sys.setswitchinterval(switch_interval)
+
+    assert errors == []
+    assert len(store._readers) <= 2
+    store.close()
+    assert not store._readers
@@ -0,0 +1,81 @@
+"""Tests for the sustain and hysteresis state of threshold rules."""
+import pytest
+
+from src.troubleshooting.rules import Rule, RuleEngine
+
+def memory_rule(sustained=1, hysteresis=3.0):
+    return Rule('memory', 'memory_percent', 'memory',
+                [('critical', 'high', 90.0), ('warning', 'medium', 80.0)],
+                sustained=sustained, hysteresis=hysteresis)
+
+def levels(rule, values):
+    seen = []
+    for value in values:
+        rule.observe(value)
+        seen.append(rule.levels[rule.active][0] if rule.active is not None else None)
+    return seen
+
+def test_hovering_at_threshold_does_not_flap():
+    rule = memory_rule()
+
+    assert levels(rule, [80.5, 79.5, 80.5, 79.5, 77.5]) == ['warning'] * 5
+    assert levels(rule, [76.9]) == [None]
+    assert rule.idle
+
+def test_flapping_never_sustains():
+    rule = memory_rule(sustained=3, hysteresis=0)
+
+    assert levels(rule, [81, 79, 81, 81, 79, 81]) == [None] * 6
+    assert levels(rule, [81, 81]) == [None, 'warning']
+
+def test_critical_is_held_inside_band():
+    rule = memory_rule()
+
+    assert levels(rule, [91, 88, 87.5, 89.9]) == ['critical'] * 4
+
+def test_critical_steps_down_to_warning():
+    rule = memory_rule(sustained=3)
+
+    assert levels(rule, [91, 91, 91, 85, 85]) == [None, None, 'critical', 'warning', 'warning']
+    assert levels(rule, [76]) == [None]
+
+def test_below_rule_holds_above_threshold():
+    rule = Rule('disk', 'disk_free_percent', 'disk', [('warning', 'medium', 10.0)], op='below', hysteresis=2)
+
+    assert levels(rule, [9, 11.5, 12.1]) == ['warning', 'warning', None]
+
+@pytest.mark.parametrize('gap', [None, float('nan')])
+def test_missing_samples_keep_state(gap):
+    rule = memory_rule(sustained=2)
+    engine = RuleEngine([rule])
+
+    engine.observe({'memory_percent': 95})
+    engine.observe({'memory_percent': gap})
+    engine.observe({})
+    assert rule.active is None
+    assert rule.streaks == [1, 1]
+
+    engine.observe({'memory_percent': 95})
+    engine.observe({'memory_percent': gap})
+
+    assert [issue['level'] for issue in engine.active_issues()] == ['critical']
+    assert engine.active_issues()[0]['value'] == 95
+
+def test_evaluate_ignores_state():
+    rule = memory_rule(sustained=5)
+    engine = RuleEngine([rule])
+
+    issues = engine.evaluate({'memory_percent': 85})
+
+    assert [issue['level'] for issue in issues] == ['warning']
+    assert rule.active is None
+
+def test_from_config_reads_threshold_defaults():
+    engine = RuleEngine.from_config(
+        {'cpu': {'metric': 'cpu_percent', 'sustained': 2}},
+        {'cpu_warning': 70, 'cpu_critical': 95},
+    )
+
+    rule = engine.rules[0]
+    assert rule.levels == [('critical', 'high', 95.0), ('warning', 'medium', 70.0)]
+    assert rule.sustained == 2